@@ -4,16 +4,46 @@ from tkinter import filedialog, messagebox, scrolledtext  # Dialoghi e widget st
 import tkinter as tk
 from tkinter import ttk
 import os
+import time
+import queue
 import datetime
-from scanner.scanner import scan_file, scan_directory  # Funzioni per scannerizzare file/cartelle
-from report.report_generator import generate_txt_report  # Funzione per generare report testuali
-from db.database import salva_scansione, recupera_report, recupera_contenuto_report, elimina_report  # DB
+import itertools
+import threading
+from scanner.scanner import iter_scan_file, iter_scan_directory, iter_directory_files  # Funzioni per scannerizzare file/cartelle
+from scanner.results import ResultStore  # Contenitore compatto dei risultati
+from report.report_generator import write_report, DEFAULT_OUTPUT_DIR  # Report in streaming (txt, jsonl, csv, sarif)
+from scanner.checkpoint import start_scan, iter_scan_checkpointed  # Scansioni salvate a checkpoint
+from db.database import (inizia_scansione, salva_checkpoint, aggiorna_stato_scansione, recupera_risultati_scansione,
+                         copia_scansione, recupera_report_pagina, recupera_scansione, elimina_report, PAGINA_REPORT,
+                         STATO_COMPLETATO, STATO_INTERROTTO, STATO_ESPORTATO, STATI)  # DB
 
 import tkinter.ttk as classic_ttk
 import tkcalendar.dateentry
 tkcalendar.dateentry.ttk.Entry = classic_ttk.Entry  # Patch per usare tkcalendar con ttk.Entry classico
 from tkcalendar import DateEntry                    # Widget calendario per selezione date
 
+# Intervallo (ms) con cui l'interfaccia legge i progressi della scansione in background
+POLL_INTERVAL_MS = 100
+
+# Tempo massimo (s) speso a ogni lettura della coda, per non bloccare l'interfaccia
+DRAIN_BUDGET = 0.05
+
+# Risultati accumulati dal thread di scansione prima di inviarli all'interfaccia
+RESULT_BATCH_SIZE = 500
+
+# Numero massimo di risultati mostrati nell'area di testo e tenuti in memoria: gli altri
+# restano nel database, da cui vengono letti per l'esportazione
+MAX_RENDERED_RESULTS = 20000
+
+# Testo con cui un risultato viene mostrato nelle aree di testo
+def _format_result(item):
+    return (
+        f"📄 File: {item['file']}\n"
+        f"🔢 Riga: {item['line']}\n"
+        f"🔍 Contenuto: {item['content']}\n"
+        f"   → {item['data_type']}: {item['match']}\n\n"
+    )
+
 class PrivacyWatcherGUI:
     def __init__(self, root):
         self.root = root
@@ -22,7 +52,14 @@ class PrivacyWatcherGUI:
         self.root.minsize(800, 600)      # Dimensione minima finestra
 
         self.path = tb.StringVar()  # Variabile stringa per il percorso selezionato
-        self.results = []           # Lista risultati scannerizzazione
+        self.results = ResultStore()  # Risultati mostrati (al massimo MAX_RENDERED_RESULTS)
+        self.scan_id = None           # Scansione nel database con tutti i risultati
+
+        # Stato della scansione eseguita in background
+        self.scan_thread = None            # Thread che esegue la scansione
+        self.scan_queue = queue.Queue()    # Messaggi dal thread di scansione all'interfaccia
+        self.cancel_event = threading.Event()  # Richiesta di annullamento
+        self.scan_stats = {}               # Contatori per barra di avanzamento e velocità
 
         self.create_widgets()       # Costruisce interfaccia grafica
 
@@ -38,10 +75,22 @@ class PrivacyWatcherGUI:
         button_frame = tb.Frame(self.root)
         button_frame.pack(pady=10)
 
-        tb.Button(button_frame, text="Avvia scannerizzazione", command=self.run_scan, bootstyle="success").pack(side='left', padx=5)
+        self.start_button = tb.Button(button_frame, text="Avvia scannerizzazione", command=self.run_scan, bootstyle="success")
+        self.start_button.pack(side='left', padx=5)
+        self.cancel_button = tb.Button(button_frame, text="Annulla", command=self.cancel_scan, bootstyle="warning", state='disabled')
+        self.cancel_button.pack(side='left', padx=5)
         tb.Button(button_frame, text="Esporta Report", command=self.export_report, bootstyle="info").pack(side='left', padx=5)
         tb.Button(button_frame, text="Database", command=self.open_database_window, bootstyle="primary").pack(side='left', padx=5)
 
+        # Barra di avanzamento e contatori (file/s, risultati/s) della scansione in corso
+        progress_frame = tb.Frame(self.root)
+        progress_frame.pack(fill='x', padx=20)
+
+        self.progress = tb.Progressbar(progress_frame, mode='determinate', bootstyle="success")
+        self.progress.pack(fill='x', expand=True)
+        self.status_label = tb.Label(progress_frame, text="")
+        self.status_label.pack(anchor='w', pady=(5, 0))
+
         # Area di testo scrollabile dove mostrare i risultati della scansione
         self.text_area = scrolledtext.ScrolledText(self.root, wrap='word', font=("Courier New", 10))
         self.text_area.pack(fill='both', expand=True, padx=20, pady=10)
@@ -55,6 +104,10 @@ class PrivacyWatcherGUI:
             self.path.set(path)  # Imposta il percorso selezionato nel campo di testo
 
     def run_scan(self):
+        # Una sola scansione alla volta
+        if self.scan_thread is not None and self.scan_thread.is_alive():
+            return
+
         # Pulisce area testo e ottiene percorso da scannerizzare
         self.text_area.delete(1.0, tb.END)
         path = self.path.get()
@@ -63,56 +116,202 @@ class PrivacyWatcherGUI:
             messagebox.showwarning("Attenzione", "Seleziona un file o una directory da scansionare.")
             return
 
-        # Scansiona file o directory a seconda del tipo
-        if os.path.isfile(path):
-            self.results = scan_file(path)
-        elif os.path.isdir(path):
-            self.results = scan_directory(path)
-        else:
+        if not os.path.isfile(path) and not os.path.isdir(path):
             messagebox.showerror("Errore", "Percorso non valido.")
             return
 
-        # Se nessun dato sensibile trovato, lo segnala
-        if not self.results:
-            self.text_area.insert(tb.END, "✅ Nessun dato sensibile rilevato.")
+        # Nuova coda ed evento per ogni scansione: i thread di una scansione
+        # precedente non possono interferire con quella corrente
+        self.results = ResultStore()
+        self.scan_id = None
+        self.scan_queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.scan_stats = {'files': 0, 'total': None, 'findings': 0, 'rendered': 0, 'start': time.monotonic()}
+
+        self.progress.configure(value=0, maximum=1)
+        self.start_button.configure(state='disabled')
+        self.cancel_button.configure(state='normal')
+        self.status_label.configure(text="Scansione in corso...")
+
+        # La scansione gira in un thread separato e comunica con l'interfaccia solo tramite la coda
+        self.scan_thread = threading.Thread(target=self._scan_worker, args=(path, self.scan_queue, self.cancel_event), daemon=True)
+        self.scan_thread.start()
+
+        # Il totale dei file per la barra di avanzamento viene contato in parallelo alla scansione
+        if os.path.isdir(path):
+            threading.Thread(target=self._count_worker, args=(path, self.scan_queue, self.cancel_event), daemon=True).start()
         else:
-            # Altrimenti mostra i dettagli di ogni elemento trovato
-            for item in self.results:
-                self.text_area.insert(tb.END, f"📄 File: {item['file']}\n")
-                self.text_area.insert(tb.END, f"🔢 Riga: {item['line']}\n")
-                self.text_area.insert(tb.END, f"🔍 Contenuto: {item['content']}\n")
-                self.text_area.insert(tb.END, f"   → {item['data_type']}: {item['match']}\n\n")
-
-        # Salva la scansione nel database con nome report basato su timestamp
+            self.scan_queue.put(('total', 1))
+
+        self.root.after(POLL_INTERVAL_MS, self._drain_scan_queue)
+
+    def cancel_scan(self):
+        # Chiede al thread di scansione di fermarsi al prossimo file
+        self.cancel_event.set()
+        self.cancel_button.configure(state='disabled')
+        self.status_label.configure(text="Annullamento in corso...")
+
+    @staticmethod
+    def _count_worker(path, scan_queue, cancel_event):
+        # Conta i file da scansionare (eseguito in un thread, non tocca i widget)
+        total = 0
+        for total, _ in enumerate(iter_directory_files(path), start=1):
+            if cancel_event.is_set():
+                return
+            if total % 1000 == 0:
+                scan_queue.put(('total', total))
+        scan_queue.put(('total', total))
+
+    @staticmethod
+    def _scan_worker(path, scan_queue, cancel_event):
+        # Esegue la scansione (in un thread, non tocca i widget) e invia i risultati a blocchi
         timestamp = datetime.datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
         report_name = f"Report_{timestamp}.txt"
-        salva_scansione(path, self.results, report_name, "Scannerizzato")
+        scan_id = None
+        stato = STATO_INTERROTTO  # Stato salvato se la scansione fallisce
+        try:
+            if os.path.isfile(path):
+                # I risultati vengono salvati nel database a blocchi, man mano che arrivano.
+                # Nessun limite di dimensione: il file viene letto in streaming, e l'annullamento
+                # viene controllato a ogni blocco letto, anche se il file non ha risultati
+                scan_id = inizia_scansione(os.path.abspath(path), report_name)
+                scan_queue.put(('scan', scan_id))
+                batch = []
+                for item in iter_scan_file(path, cancel=cancel_event.is_set):
+                    batch.append(item)
+                    if len(batch) >= RESULT_BATCH_SIZE:
+                        salva_checkpoint(scan_id, [], batch)
+                        scan_queue.put(('results', batch, 0))
+                        batch = []
+                    if cancel_event.is_set():
+                        break
+                # Il file conta come elaborato solo se è stato letto fino in fondo
+                salva_checkpoint(scan_id, [] if cancel_event.is_set() else [os.path.abspath(path)], batch)
+                scan_queue.put(('results', batch, 1))
+            else:
+                # Scansione incrementale su tutti i core: i file invariati riusano i risultati salvati.
+                # I risultati vengono salvati nel database a checkpoint durante la scansione,
+                # che si può riprendere da riga di comando (privacywatcher resume) se si interrompe.
+                # Ogni file elaborato arriva qui, anche senza risultati: l'annullamento viene
+                # controllato file per file e la chiusura della scansione termina i processi
+                scan_id = start_scan(path, report_name, {"workers": 0, "incremental": True})
+                scan_queue.put(('scan', scan_id))
+                scan = iter_scan_checkpointed(scan_id, path, workers=0, incremental=True)
+                try:
+                    for _, file_results in scan:
+                        scan_queue.put(('results', file_results, 1))
+                        if cancel_event.is_set():
+                            break
+                finally:
+                    scan.close()  # Ultimo checkpoint e chiusura del pool di processi
+            stato = STATO_INTERROTTO if cancel_event.is_set() else STATO_COMPLETATO
+            scan_queue.put(('done', stato))
+        except Exception as e:
+            scan_queue.put(('error', str(e)))
+        finally:
+            # Anche dopo un errore la scansione non resta "In corso" nello storico
+            if scan_id is not None:
+                aggiorna_stato_scansione(scan_id, stato)
+
+    def _drain_scan_queue(self):
+        # Legge i messaggi del thread di scansione per al massimo DRAIN_BUDGET secondi
+        # e aggiorna l'interfaccia con un solo inserimento di testo per ciclo
+        stats = self.scan_stats
+        chunks = []
+        finished = None
+        deadline = time.monotonic() + DRAIN_BUDGET
+
+        while finished is None and time.monotonic() < deadline:
+            try:
+                message = self.scan_queue.get_nowait()
+            except queue.Empty:
+                break
+
+            kind = message[0]
+            if kind == 'total':
+                stats['total'] = message[1]
+            elif kind == 'scan':
+                self.scan_id = message[1]
+            elif kind == 'results':
+                _, batch, files_done = message
+                stats['files'] += files_done
+                stats['findings'] += len(batch)
+                # Solo i risultati mostrati restano in memoria: tutti gli altri sono nel database
+                for item in batch:
+                    if stats['rendered'] >= MAX_RENDERED_RESULTS:
+                        break
+                    self.results.append(item)
+                    chunks.append(_format_result(item))
+                    stats['rendered'] += 1
+            else:
+                finished = message
+
+        if chunks:
+            self.text_area.insert(tb.END, "".join(chunks))
+        self._update_scan_status()
+
+        if finished is None:
+            self.root.after(POLL_INTERVAL_MS, self._drain_scan_queue)
+        else:
+            self._finish_scan(finished)
+
+    def _update_scan_status(self):
+        # Aggiorna barra di avanzamento e contatori di velocità
+        stats = self.scan_stats
+        elapsed = max(time.monotonic() - stats['start'], 1e-6)
+        total = stats['total']
+        if total:
+            self.progress.configure(maximum=max(total, stats['files']), value=stats['files'])
+        files_text = f"{stats['files']}/{total}" if total is not None else f"{stats['files']}"
+        self.status_label.configure(
+            text=f"File: {files_text} | Risultati: {stats['findings']} | "
+                 f"{stats['files'] / elapsed:.1f} file/s | {stats['findings'] / elapsed:.1f} risultati/s"
+        )
+
+    def _finish_scan(self, message):
+        # Ripristina i pulsanti e mostra l'esito della scansione
+        self.start_button.configure(state='normal')
+        self.cancel_button.configure(state='disabled')
+
+        if message[0] == 'error':
+            messagebox.showerror("Errore", f"Errore durante la scansione: {message[1]}")
+            return
+
+        # Se nessun dato sensibile trovato, lo segnala
+        if not self.scan_stats['findings']:
+            self.text_area.insert(tb.END, "✅ Nessun dato sensibile rilevato.")
+        elif self.scan_stats['rendered'] < self.scan_stats['findings']:
+            hidden = self.scan_stats['findings'] - self.scan_stats['rendered']
+            self.text_area.insert(tb.END, f"... altri {hidden} risultati non mostrati (usa Esporta Report).\n")
+
+        if message[1] == STATO_INTERROTTO:
+            self.status_label.configure(text=self.status_label.cget("text") + " | Scansione annullata")
 
     def export_report(self):
-        # Esporta i risultati attuali in un file report testuale strutturato
-        if not self.results:
+        # Esporta i risultati dell'ultima scansione in un report (txt, JSON Lines, CSV o SARIF)
+        if self.scan_id is None or not self.scan_stats.get('findings'):
             messagebox.showinfo("Nessun risultato", "Nessun dato da esportare.")
             return
 
-        # Organizza i dati per tipo di dato sensibile
-        structured = {}
-        for item in self.results:
-            dtype = item['data_type']
-            structured.setdefault(dtype, []).append({
-                "file": item['file'],
-                "match": item['match']
-            })
-
-        # Genera nome file con timestamp
+        # Nome proposto con timestamp; il formato segue l'estensione scelta dall'utente
         timestamp = datetime.datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
-        filename = f"Report_{timestamp}.txt"
-        filepath = os.path.join("reports", filename)
+        os.makedirs(DEFAULT_OUTPUT_DIR, exist_ok=True)
+        filepath = filedialog.asksaveasfilename(
+            initialdir=DEFAULT_OUTPUT_DIR,
+            initialfile=f"Report_{timestamp}.txt",
+            defaultextension=".txt",
+            filetypes=[("Testo", "*.txt"), ("JSON Lines", "*.jsonl"), ("CSV", "*.csv"), ("SARIF", "*.sarif"), ("Tutti i file", "*.*")],
+        )
+        if not filepath:
+            return
+        filename = os.path.basename(filepath)
 
-        # Genera file report e salva anche nel database (stato "Esportato")
-        generate_txt_report(structured, self.path.get(), filepath)
-        salva_scansione(self.path.get(), self.results, filename, "Esportato")
+        # Scrive il report in streaming leggendo i risultati dal database e ne salva
+        # una copia (stato STATO_ESPORTATO) con il nome del report
+        write_report(recupera_risultati_scansione(self.scan_id), self.path.get(), filename, output_dir=os.path.dirname(filepath))
+        copia_scansione(self.scan_id, filename, STATO_ESPORTATO)
 
-        messagebox.showinfo("Report generato", f"Report salvato in {filename}")
+        messagebox.showinfo("Report generato", f"Report salvato in {filepath}")
 
     def open_database_window(self):
         # Apre una nuova finestra che mostra lo storico dei report salvati nel database
@@ -121,9 +320,6 @@ class PrivacyWatcherGUI:
             self.db_win.lift()
             return
     
-        # Recupera tutti i report salvati
-        self.records = recupera_report()
-    
         self.db_win = tb.Toplevel(self.root)
         self.db_win.focus_force()
         self.db_win.title("Storico Report")
@@ -135,6 +331,12 @@ class PrivacyWatcherGUI:
     
         self.db_win.protocol("WM_DELETE_WINDOW", on_close)
 
+        # Filtri correnti (applicati in SQL) e stato della paginazione:
+        # i report vengono caricati una pagina alla volta mentre l'utente scorre la lista
+        filtri = {}
+        pagina = {"dopo": None, "finito": False}
+        ricerca_pendente = {"id": None}
+
         # Sezione ricerca e filtro
         top_frame = tb.Frame(self.db_win)
         top_frame.pack(fill="x", padx=10, pady=5)
@@ -145,14 +347,46 @@ class PrivacyWatcherGUI:
         search_entry.pack(side="left", fill="x", expand=True, padx=5)
 
         # Treeview per mostrare i report con colonne per Percorso, Nome, Data, Stato
-        tree = tb.Treeview(self.db_win, columns=("Percorso", "Nome", "Data", "Stato"), show="headings", bootstyle="info")
+        tree_frame = tb.Frame(self.db_win)
+        tree_frame.pack(padx=10, pady=10, fill='both', expand=True)
+        tree = tb.Treeview(tree_frame, columns=("Percorso", "Nome", "Data", "Stato"), show="headings", bootstyle="info")
         for col in ("Percorso", "Nome", "Data", "Stato"):
             tree.heading(col, text=col)
         tree.column("Percorso", width=200)
         tree.column("Nome", width=200)
         tree.column("Data", width=180)
         tree.column("Stato", width=100)
-        tree.pack(padx=10, pady=10, fill='both', expand=True)
+        scrollbar = tb.Scrollbar(tree_frame, orient="vertical", command=tree.yview)
+        scrollbar.pack(side='right', fill='y')
+        tree.pack(side='left', fill='both', expand=True)
+
+        # Carica la pagina successiva dello storico con i filtri correnti
+        def carica_pagina():
+            if pagina["finito"]:
+                return
+            righe = recupera_report_pagina(PAGINA_REPORT, dopo=pagina["dopo"], **filtri)
+            for scan_id, ts, name, stato, percorso in righe:
+                short_path = os.path.basename(percorso or "")
+                tree.insert("", tb.END, iid=str(scan_id), values=(short_path, name, ts, stato))
+            if len(righe) < PAGINA_REPORT:
+                pagina["finito"] = True
+            else:
+                pagina["dopo"] = (righe[-1][1], righe[-1][0])
+
+        # Svuota la lista e ricarica dalla prima pagina (dopo un cambio di filtri)
+        def ricarica():
+            tree.delete(*tree.get_children())
+            pagina["dopo"] = None
+            pagina["finito"] = False
+            carica_pagina()
+
+        # Quando la parte visibile si avvicina al fondo della lista carica altri report
+        def on_scroll(first, last):
+            scrollbar.set(first, last)
+            if float(last) > 0.9:
+                carica_pagina()
+
+        tree.configure(yscrollcommand=on_scroll)
 
         # Doppio click su un record apre una finestra con il contenuto dettagliato del report
         def show_report(event):
@@ -160,10 +394,11 @@ class PrivacyWatcherGUI:
             if not item_id:
                 return
 
-            values = tree.item(item_id, "values")
-            report_name = values[1]
-            results = recupera_contenuto_report(report_name)
-            if results is None:
+            # L'iid della riga è l'id della scansione: i nomi dei report possono ripetersi
+            scan_id = int(item_id)
+            report_name = tree.item(item_id, "values")[1]
+            scan = recupera_scansione(scan_id)
+            if scan is None:
                 messagebox.showerror("Errore", "Report non trovato nel database.")
                 return
 
@@ -174,17 +409,21 @@ class PrivacyWatcherGUI:
             text_area = scrolledtext.ScrolledText(view_win, wrap='word')
             text_area.pack(fill='both', expand=True)
 
-            # Mostra dettagli della scansione in modo leggibile e disabilita l'editing
-            for item in results:
-                text_area.insert(tb.END, f"📄 File: {item['file']}\n")
-                text_area.insert(tb.END, f"🔢 Riga: {item['line']}\n")
-                text_area.insert(tb.END, f"🔍 Contenuto: {item['content']}\n")
-                text_area.insert(tb.END, f"   → {item['data_type']}: {item['match']}\n\n")
+            # Mostra dettagli della scansione in modo leggibile e disabilita l'editing. Come durante
+            # la scansione, al massimo MAX_RENDERED_RESULTS risultati con un solo inserimento di testo
+            results = recupera_risultati_scansione(scan_id)
+            try:
+                text = "".join(_format_result(item) for item in itertools.islice(results, MAX_RENDERED_RESULTS))
+            finally:
+                results.close()
+            if scan["risultati"] > MAX_RENDERED_RESULTS:
+                text += f"… altri {scan['risultati'] - MAX_RENDERED_RESULTS} risultati non mostrati (esporta il report per vederli tutti)\n"
+            text_area.insert(tb.END, text)
             text_area.config(state='disabled')
 
         tree.bind("<Double-1>", show_report)
 
-        # Frame per filtri data inizio/fine (con entry di testo per date)
+        # Frame per filtri data inizio/fine (con entry di testo per date) e stato
         filter_frame = tk.Frame(self.db_win)
         filter_frame.pack(fill='x', padx=10, pady=5)
         
@@ -200,34 +439,31 @@ class PrivacyWatcherGUI:
         end_date = tb.Entry(filter_frame, width=12)
         end_date.pack(side='left', padx=(0, 15))
 
-        # Applica filtro di ricerca per data (con parsing date e controlli)
+        label_stato = tk.Label(filter_frame, text="Stato:")
+        label_stato.pack(side='left', padx=(0, 5))
+
+        stato_var = tb.StringVar(value="Tutti")
+        stato_box = tb.Combobox(filter_frame, textvariable=stato_var, values=("Tutti",) + STATI, state="readonly", width=14)
+        stato_box.pack(side='left', padx=(0, 15))
+
+        # Applica filtro di ricerca per data e stato (con parsing date e controlli);
+        # le date lasciate vuote non limitano l'intervallo
         def apply_date_filter():
-            from datetime import datetime
             try:
-                dt_start = datetime.strptime(start_date.get(), "%m/%d/%y")
-                dt_end = datetime.strptime(end_date.get(), "%m/%d/%y")
+                dt_start = datetime.datetime.strptime(start_date.get(), "%m/%d/%y").date() if start_date.get() else None
+                dt_end = datetime.datetime.strptime(end_date.get(), "%m/%d/%y").date() if end_date.get() else None
             except ValueError:
                 messagebox.showerror("Errore", "Formato data non valido.")
                 return
 
-            if dt_start > dt_end:
+            if dt_start and dt_end and dt_start > dt_end:
                 messagebox.showerror("Errore", "La data di inizio deve essere precedente a quella di fine.")
                 return
 
-            filtered = []
-            for ts, name, stato, percorso in self.records:
-                try:
-                    ts_dt = datetime.strptime(ts, "%Y-%m-%d %H:%M:%S")
-                    if dt_start <= ts_dt <= dt_end:
-                        filtered.append((ts, name, stato, percorso))
-                except ValueError:
-                    continue
-            populate_list(filtered)
-
-        # Ricarica dati da database e aggiorna lista report
-        def aggiorna_dati():
-            self.records = recupera_report()
-            populate_list()
+            filtri["data_inizio"] = dt_start
+            filtri["data_fine"] = dt_end
+            filtri["stato"] = None if stato_var.get() == "Tutti" else stato_var.get()
+            ricarica()
 
         # Elimina report selezionato dopo conferma utente
         def elimina_report_selezionato():
@@ -235,30 +471,33 @@ class PrivacyWatcherGUI:
             if not selected:
                 messagebox.showwarning("Attenzione", "Seleziona un report da eliminare.")
                 return
-            item = tree.item(selected[0])
-            report_name = item['values'][1]
+            # Elimina solo la scansione selezionata (l'iid è il suo id), non quelle con lo stesso nome
+            scan_id = int(selected[0])
+            report_name = tree.item(selected[0], "values")[1]
             conferma = messagebox.askyesno("Conferma eliminazione", f"Vuoi davvero eliminare il report '{report_name}'?")
             if conferma:
-                elimina_report(report_name)
+                elimina_report(scan_id)
                 messagebox.showinfo("Eliminato", f"Il report '{report_name}' è stato eliminato.")
-                aggiorna_dati()
+                ricarica()
 
         # Pulsanti filtro e elimina
         tb.Button(filter_frame, text="Applica filtro", command=apply_date_filter, bootstyle="info").pack(side='left', padx=10)
         tb.Button(self.db_win, text="Elimina report selezionato", command=elimina_report_selezionato, bootstyle="danger").pack(pady=5)
+        stato_box.bind("<<ComboboxSelected>>", lambda event: apply_date_filter())
 
-        # Funzione per popolare la treeview filtrando per testo di ricerca
-        def populate_list(filtered_records=None, filter_text=""):
-            tree.delete(*tree.get_children())
-            data = filtered_records if filtered_records is not None else self.records
-            for ts, name, stato, percorso in data:
-                short_path = os.path.basename(percorso)
-                if filter_text.lower() in f"{short_path} {name} {ts} {stato}".lower():
-                    tree.insert("", tb.END, values=(short_path, name, ts, stato))
-
-        # Aggiorna filtro ricerca testo dinamicamente
-        search_var.trace_add("write", lambda *args: populate_list(filter_text=search_var.get()))
-        populate_list()
+        # Ricerca testuale eseguita nel database, 300 ms dopo l'ultimo tasto premuto
+        def applica_ricerca():
+            ricerca_pendente["id"] = None
+            filtri["testo"] = search_var.get().strip() or None
+            ricarica()
+
+        def on_search(*args):
+            if ricerca_pendente["id"] is not None:
+                self.db_win.after_cancel(ricerca_pendente["id"])
+            ricerca_pendente["id"] = self.db_win.after(300, applica_ricerca)
+
+        search_var.trace_add("write", on_search)
+        ricarica()
 
 
 def launch_gui():
@@ -0,0 +1,360 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import contextlib
+import multiprocessing
+
+try:
+    import resource  # Solo sistemi Unix: picco di memoria residente (RSS)
+except ImportError:
+    resource = None
+
+from benchmark.corpus import genera_corpus, genera_codice_fiscale, genera_iban, genera_carta, genera_telefono, genera_email
+
+# Ripetizioni predefinite di ogni benchmark (si tiene il tempo migliore)
+RIPETIZIONI = 3
+
+# Peggioramento oltre il quale, confrontando con un risultato salvato, si segnala una regressione
+SOGLIA_REGRESSIONE = 0.10
+
+
+def picco_rss_mb():
+    """Picco di memoria residente del processo e dei suoi figli terminati, in MB (None se non disponibile)."""
+    if resource is None:
+        return None
+    picco = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss è in KB su Linux, in byte su macOS
+    return picco / (1024 * 1024) if sys.platform == "darwin" else picco / 1024
+
+def _cronometra(funzione, ripetizioni):
+    """Esegue la funzione più volte e restituisce il tempo migliore in secondi."""
+    migliore = float("inf")
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        funzione()
+        migliore = min(migliore, time.perf_counter() - inizio)
+    return migliore
+
+def _esegui_figlio(coda, benchmark, contesto, ripetizioni):
+    """Corpo del processo figlio: esegue il benchmark e invia tempo e picco di memoria."""
+    try:
+        preparato = benchmark["prepara"](contesto)
+        # L'output dello scanner ([INFO], [FOUND]...) non deve finire nella tabella
+        with contextlib.redirect_stdout(io.StringIO()):
+            secondi = _cronometra(lambda: benchmark["esegui"](preparato), ripetizioni)
+        coda.put((secondi, picco_rss_mb(), None))
+    except Exception as e:
+        coda.put((None, None, repr(e)))
+
+def esegui_benchmark(benchmark, contesto, ripetizioni=RIPETIZIONI):
+    """
+    Esegue un benchmark e ne calcola le metriche.
+
+    Con il metodo di avvio "fork" ogni benchmark gira in un processo figlio, così il
+    picco di RSS misurato riguarda solo quel benchmark; altrimenti gira nel processo corrente.
+
+    Args:
+        benchmark (dict): Voce di BENCHMARKS
+        contesto (dict): Corpus e dati condivisi (vedi prepara_contesto)
+        ripetizioni (int): Numero di ripetizioni (si tiene il tempo migliore)
+
+    Returns:
+        dict: nome, secondi, righe/s, MB/s, operazioni/s, picco RSS in MB ed eventuale errore
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("fork")
+        coda = ctx.Queue()
+        processo = ctx.Process(target=_esegui_figlio, args=(coda, benchmark, contesto, ripetizioni))
+        processo.start()
+        secondi, rss, errore = coda.get()
+        processo.join()
+    else:
+        coda = multiprocessing.Queue()
+        _esegui_figlio(coda, benchmark, contesto, ripetizioni)
+        secondi, rss, errore = coda.get()
+
+    righe, byte, operazioni = benchmark["volume"](contesto)
+    risultato = {"nome": benchmark["nome"], "secondi": secondi, "rss_mb": rss, "errore": errore}
+    if secondi:
+        risultato["righe_s"] = righe / secondi if righe else None
+        risultato["mb_s"] = byte / secondi / (1024 * 1024) if byte else None
+        risultato["op_s"] = operazioni / secondi if operazioni else None
+    return risultato
+
+# --- Preparazione dei dati condivisi ---------------------------------------------
+
+def _campioni_validatori(seed, quanti=2000):
+    """Input per i validatori: metà validi (dal generatore del corpus), metà alterati."""
+    rng = random.Random(seed)
+    def alterato(valore):
+        i = rng.randrange(len(valore))
+        return valore[:i] + rng.choice("0123456789") + valore[i + 1:]
+    campioni = {}
+    sorgenti = {
+        "validate_luhn": lambda: genera_carta(rng).replace(" ", ""),
+        "validate_italian_cf": lambda: genera_codice_fiscale(rng),
+        "validate_iban": lambda: genera_iban(rng),
+        "validate_italian_phone": lambda: genera_telefono(rng),
+        "validate_email": lambda: genera_email(rng),
+        "validate_italian_zip": lambda: f"{rng.randint(0, 99999):05d}",
+        "validate_italian_vat": lambda: "".join(rng.choice("0123456789") for _ in range(11)),
+        "validate_ip_address": lambda: ".".join(str(rng.randint(0, 300)) for _ in range(4)),
+    }
+    for nome, sorgente in sorgenti.items():
+        valori = [sorgente() for _ in range(quanti)]
+        campioni[nome] = [v if i % 2 == 0 else alterato(v) for i, v in enumerate(valori)]
+    return campioni
+
+def prepara_contesto(cartella, n_file, righe_per_file, densita, seed):
+    """Genera il corpus nella cartella e raccoglie i dati usati dai benchmark."""
+    corpus = genera_corpus(os.path.join(cartella, "corpus"), n_file, righe_per_file, densita, seed)
+    righe = []
+    for percorso in corpus["percorsi"]:
+        with open(percorso, "r", encoding="utf-8") as f:
+            righe.extend(f)
+    return {
+        "cartella": cartella,
+        "corpus": corpus,
+        "directory": os.path.join(cartella, "corpus"),
+        "righe": righe,
+        "validatori": _campioni_validatori(seed),
+        # Il benchmark del database lavora su un file separato, mai su data/logs.db
+        "db_path": os.path.join(cartella, "bench.db"),
+    }
+
+def _usa_db_benchmark(contesto):
+    """Punta il modulo database al file del benchmark."""
+    from db import database
+    database.DB_PATH = contesto["db_path"]
+    return database
+
+def _risultati_corpus(contesto):
+    """Risultati della scansione del corpus, per i benchmark del database."""
+    from scanner.scanner import scan_file
+    risultati = []
+    for percorso in contesto["corpus"]["percorsi"]:
+        risultati.extend(scan_file(percorso))
+    return risultati
+
+# --- Benchmark -------------------------------------------------------------------
+
+def _bench_scan_line():
+    from scanner.scanner import scan_line_for_sensitive_data
+    def esegui(righe):
+        for riga in righe:
+            scan_line_for_sensitive_data(riga)
+    return esegui
+
+def _bench_scan_file(use_mmap=False):
+    from scanner.scanner import scan_file
+    def esegui(percorsi):
+        for percorso in percorsi:
+            scan_file(percorso, use_mmap=use_mmap)
+    return esegui
+
+def _bench_scan_directory(workers, incremental=False):
+    def esegui(preparato):
+        from scanner.scanner import scan_directory
+        directory, contesto = preparato
+        _usa_db_benchmark(contesto)
+        scan_directory(directory, workers=workers, incremental=incremental)
+    return esegui
+
+def _bench_validatore(nome):
+    def esegui(valori):
+        from utils import validator
+        funzione = getattr(validator, nome)
+        for valore in valori:
+            funzione(valore)
+    return esegui
+
+def _bench_validatore_batch(nome):
+    def esegui(valori):
+        from utils import validator
+        getattr(validator, nome + "_batch")(valori)
+    return esegui
+
+def _prepara_db_scrittura(contesto):
+    database = _usa_db_benchmark(contesto)
+    return database, _risultati_corpus(contesto)
+
+def _esegui_db_scrittura(preparato):
+    database, risultati = preparato
+    database.salva_scansione("/benchmark", risultati, f"Bench_{time.perf_counter_ns()}.txt", "Scannerizzato")
+
+def _prepara_db_lettura(contesto):
+    database = _usa_db_benchmark(contesto)
+    risultati = _risultati_corpus(contesto)
+    scan_ids = []
+    for i in range(20):
+        nome = f"Bench_lettura_{os.getpid()}_{i}.txt"
+        scan_ids.append(database.salva_scansione("/benchmark", risultati, nome, "Scannerizzato"))
+    return database, scan_ids
+
+def _esegui_db_lettura(preparato):
+    database, scan_ids = preparato
+    for scan_id in scan_ids:
+        for _ in database.recupera_contenuto_report(scan_id):
+            pass
+    # Scorre lo storico a pagine, come la finestra Database della GUI
+    pagina = database.recupera_report_pagina()
+    while pagina:
+        ultima = pagina[-1]
+        pagina = database.recupera_report_pagina(dopo=(ultima[1], ultima[0]))
+
+def _volume_corpus(contesto):
+    return contesto["corpus"]["righe"], contesto["corpus"]["byte"], contesto["corpus"]["file"]
+
+def _volume_findings(contesto, scansioni):
+    # Volume misurato in risultati scritti/letti, stimato dai dati inseriti nel corpus
+    return 0, 0, scansioni * sum(contesto["corpus"]["inseriti"].values())
+
+# Elenco dei benchmark: nome, preparazione (eseguita fuori dal cronometro),
+# funzione misurata e volume di dati elaborato (righe, byte, operazioni)
+BENCHMARKS = [
+    {
+        "nome": "scan_line_for_sensitive_data",
+        "prepara": lambda c: c["righe"],
+        "esegui": lambda righe: _bench_scan_line()(righe),
+        "volume": lambda c: (len(c["righe"]), sum(len(r.encode("utf-8")) for r in c["righe"]), 0),
+    },
+    {
+        "nome": "scan_file",
+        "prepara": lambda c: c["corpus"]["percorsi"],
+        "esegui": lambda percorsi: _bench_scan_file()(percorsi),
+        "volume": _volume_corpus,
+    },
+    {
+        "nome": "scan_file (mmap)",
+        "prepara": lambda c: c["corpus"]["percorsi"],
+        "esegui": lambda percorsi: _bench_scan_file(use_mmap=True)(percorsi),
+        "volume": _volume_corpus,
+    },
+    {
+        "nome": "scan_directory (1 processo)",
+        "prepara": lambda c: (c["directory"], c),
+        "esegui": _bench_scan_directory(1),
+        "volume": _volume_corpus,
+    },
+    {
+        "nome": "scan_directory (tutti i core)",
+        "prepara": lambda c: (c["directory"], c),
+        "esegui": _bench_scan_directory(0),
+        "volume": _volume_corpus,
+    },
+    {
+        "nome": "scan_directory (incrementale)",
+        "prepara": lambda c: (c["directory"], c),
+        "esegui": _bench_scan_directory(1, incremental=True),
+        "volume": _volume_corpus,
+    },
+] + [
+    {
+        "nome": nome,
+        "prepara": (lambda n: lambda c: c["validatori"][n])(nome),
+        "esegui": _bench_validatore(nome),
+        "volume": (lambda n: lambda c: (0, 0, len(c["validatori"][n])))(nome),
+    }
+    for nome in (
+        "validate_luhn", "validate_italian_cf", "validate_iban", "validate_italian_phone",
+        "validate_email", "validate_italian_zip", "validate_italian_vat", "validate_ip_address",
+    )
+] + [
+    {
+        "nome": nome + "_batch",
+        "prepara": (lambda n: lambda c: c["validatori"][n])(nome),
+        "esegui": _bench_validatore_batch(nome),
+        "volume": (lambda n: lambda c: (0, 0, len(c["validatori"][n])))(nome),
+    }
+    for nome in ("validate_luhn", "validate_italian_cf", "validate_iban")
+] + [
+    {
+        "nome": "db: salva_scansione",
+        "prepara": _prepara_db_scrittura,
+        "esegui": _esegui_db_scrittura,
+        "volume": lambda c: _volume_findings(c, 1),
+    },
+    {
+        "nome": "db: lettura report e storico",
+        "prepara": _prepara_db_lettura,
+        "esegui": _esegui_db_lettura,
+        "volume": lambda c: _volume_findings(c, 20),
+    },
+]
+
+# --- Output e confronto ----------------------------------------------------------
+
+def _formatta(valore, larghezza, specifica):
+    return f"{valore:>{larghezza}{specifica}}" if valore is not None else f"{'-':>{larghezza}}"
+
+def stampa_risultati(risultati, precedenti=None):
+    """Stampa la tabella dei risultati, segnalando le regressioni rispetto ai precedenti."""
+    print(f"{'Benchmark':<34} {'tempo (s)':>10} {'righe/s':>12} {'MB/s':>8} {'op/s':>12} {'RSS (MB)':>9}")
+    regressioni = []
+    for r in risultati:
+        if r["errore"]:
+            print(f"{r['nome']:<34} ERRORE: {r['errore']}")
+            continue
+        riga = (
+            f"{r['nome']:<34} {r['secondi']:>10.4f} {_formatta(r.get('righe_s'), 12, ',.0f')} "
+            f"{_formatta(r.get('mb_s'), 8, '.2f')} {_formatta(r.get('op_s'), 12, ',.0f')} {_formatta(r['rss_mb'], 9, '.1f')}"
+        )
+        precedente = (precedenti or {}).get(r["nome"])
+        if precedente and precedente.get("secondi"):
+            variazione = r["secondi"] / precedente["secondi"] - 1
+            riga += f"  {variazione:+.0%}"
+            if variazione > SOGLIA_REGRESSIONE:
+                riga += " REGRESSIONE"
+                regressioni.append(r["nome"])
+        print(riga)
+    return regressioni
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dello scanner su un corpus sintetico riproducibile.")
+    parser.add_argument("--file", type=int, default=40, help="Numero di file del corpus")
+    parser.add_argument("--righe", type=int, default=5000, help="Righe per file")
+    parser.add_argument("--densita", type=float, default=0.02, help="Frazione di righe con un dato sensibile")
+    parser.add_argument("--seed", type=int, default=0, help="Seme del generatore del corpus")
+    parser.add_argument("--ripetizioni", type=int, default=RIPETIZIONI, help="Ripetizioni per benchmark (si tiene la migliore)")
+    parser.add_argument("--solo", action="append", help="Esegue solo i benchmark il cui nome contiene questo testo")
+    parser.add_argument("--salva", help="Salva i risultati in un file JSON")
+    parser.add_argument("--confronta", help="File JSON di un'esecuzione precedente con cui confrontare i tempi")
+    parser.add_argument("--mantieni-corpus", help="Genera il corpus in questa cartella e non la elimina")
+    args = parser.parse_args(argv)
+
+    cartella = args.mantieni_corpus or tempfile.mkdtemp(prefix="privacywatcher-bench-")
+    try:
+        contesto = prepara_contesto(cartella, args.file, args.righe, args.densita, args.seed)
+        corpus = contesto["corpus"]
+        print(
+            f"Corpus: {corpus['file']} file, {corpus['righe']} righe, {corpus['byte'] / 1024 / 1024:.1f} MB, "
+            f"dati inseriti: {corpus['inseriti']} (seed {args.seed})\n"
+        )
+
+        selezionati = [b for b in BENCHMARKS if not args.solo or any(s in b["nome"] for s in args.solo)]
+        risultati = [esegui_benchmark(b, contesto, args.ripetizioni) for b in selezionati]
+
+        precedenti = None
+        if args.confronta:
+            with open(args.confronta, "r", encoding="utf-8") as f:
+                precedenti = {r["nome"]: r for r in json.load(f)["risultati"]}
+        regressioni = stampa_risultati(risultati, precedenti)
+
+        if args.salva:
+            with open(args.salva, "w", encoding="utf-8") as f:
+                json.dump({"parametri": vars(args), "risultati": risultati}, f, indent=2)
+    finally:
+        if not args.mantieni_corpus:
+            shutil.rmtree(cartella, ignore_errors=True)
+
+    # Codice di uscita non nullo se ci sono regressioni, per l'uso in CI
+    return 1 if regressioni else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
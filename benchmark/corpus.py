@@ -0,0 +1,178 @@
+import os
+import json
+import random
+import string
+
+# Tabelle del carattere di controllo del codice fiscale (come in utils.validator)
+_CF_DISPARI = {
+    'A': 1, 'B': 0, 'C': 5, 'D': 7, 'E': 9, 'F': 13, 'G': 15, 'H': 17, 'I': 19,
+    'J': 21, 'K': 2, 'L': 4, 'M': 18, 'N': 20, 'O': 11, 'P': 3, 'Q': 6, 'R': 8,
+    'S': 12, 'T': 14, 'U': 16, 'V': 10, 'W': 22, 'X': 25, 'Y': 24, 'Z': 23,
+    '0': 1, '1': 0, '2': 5, '3': 7, '4': 9, '5': 13, '6': 15, '7': 17, '8': 19,
+    '9': 21
+}
+_CF_PARI = {c: i for i, c in enumerate(string.ascii_uppercase)}
+_CF_PARI.update({str(i): i for i in range(10)})
+
+# Lettere ammesse per il mese di nascita nel codice fiscale
+_CF_MESI = "ABCDEHLMPRST"
+
+# Parole usate per il testo di riempimento, senza dati sensibili
+_PAROLE = (
+    "richiesta", "utente", "servizio", "completata", "errore", "sessione", "cache", "modulo",
+    "configurazione", "avvio", "connessione", "timeout", "risposta", "ordine", "cliente",
+    "prodotto", "magazzino", "aggiornamento", "sincronizzazione", "elaborazione", "coda",
+)
+_NOMI = ("mario", "luca", "giulia", "anna", "marco", "sara", "paolo", "elena", "franco", "chiara")
+_COGNOMI = ("rossi", "bianchi", "verdi", "russo", "ferrari", "esposito", "romano", "colombo", "ricci")
+_DOMINI = ("example.com", "esempio.it", "azienda.it", "mail.test", "posta.org")
+_LIVELLI = ("INFO", "DEBUG", "WARN", "ERROR")
+
+# Tipi di dato sensibile inseribili nel corpus
+TIPI_DATO = ("Email", "IBAN", "Codice Fiscale", "Carta di Credito", "Telefono")
+
+# Formati dei file generati (usati anche come estensione)
+FORMATI = ("log", "csv", "conf", "json")
+
+
+def genera_codice_fiscale(rng):
+    """Genera un codice fiscale sintatticamente valido, con carattere di controllo corretto."""
+    lettere = "".join(rng.choice(string.ascii_uppercase) for _ in range(6))
+    cf = (
+        lettere
+        + f"{rng.randint(0, 99):02d}"
+        + rng.choice(_CF_MESI)
+        + f"{rng.randint(1, 71):02d}"
+        + rng.choice(string.ascii_uppercase)
+        + f"{rng.randint(0, 999):03d}"
+    )
+    somma = sum(_CF_DISPARI[c] if i % 2 == 0 else _CF_PARI[c] for i, c in enumerate(cf))
+    return cf + chr(65 + somma % 26)
+
+def genera_iban(rng):
+    """Genera un IBAN italiano (27 caratteri) con cifre di controllo modulo 97 corrette."""
+    bban = rng.choice(string.ascii_uppercase) + "".join(rng.choice(string.digits) for _ in range(10))
+    bban += "".join(rng.choice(string.digits) for _ in range(12))
+    numerico = "".join(str(int(c, 36)) for c in bban + "IT00")
+    controllo = 98 - int(numerico) % 97
+    return f"IT{controllo:02d}{bban}"
+
+def genera_carta(rng):
+    """Genera un numero di carta (Visa o MasterCard, 16 cifre) valido per Luhn."""
+    cifre = [int(c) for c in rng.choice(("4", "51", "52", "53", "54", "55"))]
+    while len(cifre) < 15:
+        cifre.append(rng.randint(0, 9))
+    # Cifra di controllo: somma di Luhn sulle 15 cifre, raddoppiando da destra
+    somma = 0
+    for i, d in enumerate(reversed(cifre)):
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        somma += d
+    cifre.append((10 - somma % 10) % 10)
+    numero = "".join(map(str, cifre))
+    # Metà delle carte con i gruppi separati da spazi
+    if rng.random() < 0.5:
+        numero = " ".join(numero[i:i + 4] for i in range(0, 16, 4))
+    return numero
+
+def genera_telefono(rng):
+    """Genera un numero di cellulare italiano, con o senza prefisso +39."""
+    numero = "3" + "".join(rng.choice(string.digits) for _ in range(9))
+    return ("+39 " + numero) if rng.random() < 0.5 else numero
+
+def genera_email(rng):
+    """Genera un indirizzo email."""
+    return f"{rng.choice(_NOMI)}.{rng.choice(_COGNOMI)}{rng.randint(1, 999)}@{rng.choice(_DOMINI)}"
+
+# Generatori per tipo di dato
+_GENERATORI = {
+    "Email": genera_email,
+    "IBAN": genera_iban,
+    "Codice Fiscale": genera_codice_fiscale,
+    "Carta di Credito": genera_carta,
+    "Telefono": genera_telefono,
+}
+
+def _testo(rng, parole=8):
+    """Testo di riempimento senza dati sensibili."""
+    return " ".join(rng.choice(_PAROLE) for _ in range(parole))
+
+def _riga(rng, formato, numero, dato):
+    """
+    Genera una riga nel formato indicato; se dato non è None viene inserito nella riga.
+
+    Args:
+        rng (random.Random): Generatore casuale
+        formato (str): Uno dei FORMATI
+        numero (int): Numero della riga nel file
+        dato (tuple): (tipo, valore) da inserire, oppure None
+
+    Returns:
+        str: Riga terminata da newline
+    """
+    valore = dato[1] if dato else ""
+    if formato == "log":
+        ora = f"{numero // 3600 % 24:02d}:{numero // 60 % 60:02d}:{numero % 60:02d}"
+        riga = f"2024-03-{numero % 28 + 1:02d}T{ora} {rng.choice(_LIVELLI)} [worker] {_testo(rng)}"
+        return f"{riga} {valore}\n" if dato else riga + "\n"
+    if formato == "csv":
+        campi = [str(numero), rng.choice(_NOMI), rng.choice(_COGNOMI), rng.choice(_PAROLE), valore]
+        return ",".join(campi) + "\n"
+    if formato == "conf":
+        chiave = dato[0].lower().replace(" ", "_") if dato else rng.choice(_PAROLE)
+        return f"{chiave}_{numero} = {valore or rng.choice(_PAROLE)}\n"
+    # json: un oggetto per riga (JSON Lines)
+    oggetto = {"id": numero, "evento": rng.choice(_PAROLE), "messaggio": _testo(rng, 5)}
+    if dato:
+        oggetto[dato[0].lower().replace(" ", "_")] = valore
+    return json.dumps(oggetto, ensure_ascii=False) + "\n"
+
+def genera_corpus(directory, n_file=40, righe_per_file=5000, densita=0.02, seed=0, tipi=TIPI_DATO):
+    """
+    Genera un corpus sintetico e riproducibile di log, dump CSV, file di configurazione e JSON.
+
+    Args:
+        directory (str): Cartella di destinazione (creata se non esiste)
+        n_file (int): Numero di file da generare, distribuiti tra i formati
+        righe_per_file (int): Righe per file
+        densita (float): Frazione di righe che contengono un dato sensibile
+        seed (int): Seme del generatore casuale: stesso seme, stesso corpus
+        tipi (tuple): Tipi di dato sensibile da inserire (vedi TIPI_DATO)
+
+    Returns:
+        dict: Statistiche del corpus (file, righe, byte, dati inseriti per tipo, percorsi)
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    statistiche = {"file": 0, "righe": 0, "byte": 0, "inseriti": {tipo: 0 for tipo in tipi}, "percorsi": []}
+
+    for indice in range(n_file):
+        formato = FORMATI[indice % len(FORMATI)]
+        # I file sono distribuiti in sottocartelle, come in un albero reale
+        cartella = os.path.join(directory, f"{formato}_{indice // len(FORMATI) % 4}")
+        os.makedirs(cartella, exist_ok=True)
+        percorso = os.path.join(cartella, f"file_{indice:04d}.{formato}")
+
+        righe = []
+        if formato == "csv":
+            righe.append("id,nome,cognome,categoria,valore\n")
+        for numero in range(1, righe_per_file + 1):
+            dato = None
+            if rng.random() < densita:
+                tipo = rng.choice(tipi)
+                dato = (tipo, _GENERATORI[tipo](rng))
+                statistiche["inseriti"][tipo] += 1
+            righe.append(_riga(rng, formato, numero, dato))
+
+        contenuto = "".join(righe).encode("utf-8")
+        with open(percorso, "wb") as f:
+            f.write(contenuto)
+
+        statistiche["file"] += 1
+        statistiche["righe"] += len(righe)
+        statistiche["byte"] += len(contenuto)
+        statistiche["percorsi"].append(percorso)
+
+    return statistiche
@@ -0,0 +1,113 @@
+import sys
+import math
+import time
+import argparse
+
+from utils.patterns import patterns
+
+# Lunghezze (in caratteri) delle righe usate per stimare la crescita del costo
+LUNGHEZZE = (2000, 8000, 32000)
+
+# Esponente oltre il quale la crescita del costo con la lunghezza della riga viene
+# considerata superlineare (1 = lineare, 2 = quadratica)
+SOGLIA_ESPONENTE = 1.4
+
+# Sotto questo tempo (s) la misura è dominata dal rumore e non viene valutata
+TEMPO_MINIMO = 1e-4
+
+# Frammenti ripetuti per costruire righe lunghe e ostili: cifre, separatori,
+# parole chiave senza il resto del pattern, quasi-match di ogni etichetta
+FRAMMENTI = {
+    "cifre": "1",
+    "spazi": " ",
+    "cifre e spazi": "1 ",
+    "cifre e trattini": "12-",
+    "cifre e punti": "1.",
+    "undici cifre": "12345678901 ",
+    "undici cifre + cf iniziale": None,  # Costruita a parte: parola chiave solo all'inizio
+    "telefono": "+39 0123 456789",
+    "lettere": "a",
+    "lettere e spazi": "ab ",
+    "via": "via ",
+    "via + numeri": "via roma 12, ",
+    "indirizzo con cap": "via a - 12345 ",
+    "email senza dominio": "a@",
+    "email": "a.b@c.d",
+    "password": "password:",
+    "parole chiave": "cf iva codice inps abi ",
+    "codice fiscale": "RSSMRA85M01H501",
+    "iban": "IT60X054281110100000012345",
+}
+
+
+def costruisci_riga(nome, lunghezza):
+    """Costruisce una riga ostile di circa lunghezza caratteri con il frammento indicato."""
+    if nome == "undici cifre + cf iniziale":
+        corpo = "12345678901 " * (lunghezza // 12)
+        return "cf " + corpo
+    frammento = FRAMMENTI[nome]
+    return (frammento * (lunghezza // len(frammento) + 1))[:lunghezza]
+
+def cronometra(pattern, riga, ripetizioni=3):
+    """Tempo migliore (s) di pattern.findall sulla riga."""
+    migliore = float("inf")
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        pattern.findall(riga)
+        migliore = min(migliore, time.perf_counter() - inizio)
+    return migliore
+
+def misura_pattern(pattern, lunghezze=LUNGHEZZE):
+    """
+    Misura il costo di un pattern su righe ostili di lunghezza crescente.
+
+    Args:
+        pattern: Regex compilata (o oggetto con il metodo findall)
+        lunghezze (tuple): Lunghezze delle righe, in ordine crescente
+
+    Returns:
+        list: Tuple (frammento, tempi per lunghezza, esponente di crescita stimato)
+    """
+    misure = []
+    for nome in FRAMMENTI:
+        tempi = [cronometra(pattern, costruisci_riga(nome, n)) for n in lunghezze]
+        esponente = None
+        # Esponente stimato tra la lunghezza minore e la maggiore (log-log)
+        if tempi[-1] >= TEMPO_MINIMO:
+            esponente = math.log(max(tempi[-1], 1e-9) / max(tempi[0], 1e-9)) / math.log(lunghezze[-1] / lunghezze[0])
+        misure.append((nome, tempi, esponente))
+    return misure
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cerca i pattern il cui costo cresce in modo superlineare con la lunghezza della riga.")
+    parser.add_argument("--pattern", action="append", help="Etichetta del pattern da misurare (predefinito: tutti)")
+    parser.add_argument("--soglia", type=float, default=SOGLIA_ESPONENTE, help="Esponente oltre il quale segnalare il pattern")
+    parser.add_argument("--dettagli", action="store_true", help="Mostra i tempi di tutti i frammenti")
+    args = parser.parse_args(argv)
+
+    superlineari = []
+    for label, pattern in patterns.items():
+        if args.pattern and label not in args.pattern:
+            continue
+        peggiore = None
+        for nome, tempi, esponente in misura_pattern(pattern):
+            if esponente is not None and (peggiore is None or esponente > peggiore[2]):
+                peggiore = (nome, tempi, esponente)
+            if args.dettagli:
+                tempi_ms = " ".join(f"{t * 1000:8.3f}" for t in tempi)
+                print(f"  {label:<24} {nome:<28} {tempi_ms} ms  esponente {esponente if esponente is None else round(esponente, 2)}")
+
+        if peggiore is None:
+            print(f"{label:<24} OK (troppo veloce per essere misurato)")
+            continue
+        nome, tempi, esponente = peggiore
+        stato = "SUPERLINEARE" if esponente > args.soglia else "OK"
+        print(f"{label:<24} {stato:<12} esponente {esponente:.2f} su '{nome}' ({tempi[-1] * 1000:.2f} ms a {LUNGHEZZE[-1]} caratteri)")
+        if esponente > args.soglia:
+            superlineari.append(label)
+
+    # Codice di uscita non nullo se qualche pattern è superlineare, per l'uso in CI
+    return 1 if superlineari else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,95 +1,663 @@
 import sqlite3       # Modulo per gestire database SQLite
 import os            # Per operazioni su filesystem (cartelle, percorsi)
 import json          # Per serializzare/desserializzare dati JSON
-from datetime import datetime  # Per gestire date e orari
+import threading     # Per mantenere una connessione per thread
+from datetime import datetime, date  # Per gestire date e orari
 
 # Percorso del file database, dentro la cartella "data"
 DB_PATH = os.path.join("data", "logs.db")
 
-def inizializza_db():
-    """Crea il database e la tabella scansioni se non esistono."""
-    # Crea la cartella 'data' se non esiste già
-    os.makedirs("data", exist_ok=True)
+# Pragma applicati a ogni nuova connessione:
+# WAL permette letture concorrenti durante le scritture (scanner in parallelo e GUI),
+# synchronous=NORMAL è sicuro in WAL e molto più veloce di FULL, busy_timeout fa
+# attendere i writer concorrenti invece di fallire subito con "database is locked"
+PRAGMA_CONNESSIONE = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",    # 16 MB di cache delle pagine
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA foreign_keys=ON",
+    "PRAGMA busy_timeout=10000",   # Millisecondi di attesa su un lock
+)
+
+# Numero di statement preparati tenuti in cache da ogni connessione
+STATEMENT_CACHE = 256
+
+# Connessione del thread corrente (una per thread e per processo)
+_locale = threading.local()
+
+# Database (per percorso) il cui schema è già stato aggiornato da questo processo
+_schema_pronto = set()
+_schema_lock = threading.Lock()
+
+def _apri_connessione():
+    """Apre una nuova connessione al database configurata con i pragma di PRAGMA_CONNESSIONE."""
+    # Crea la cartella del database se non esiste già
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=10, cached_statements=STATEMENT_CACHE)
+    for pragma in PRAGMA_CONNESSIONE:
+        conn.execute(pragma)
+    return conn
+
+def get_connessione():
+    """
+    Restituisce la connessione al database del thread corrente, aprendola alla prima richiesta.
+
+    La connessione viene riusata da tutte le funzioni del modulo (e con essa gli statement
+    preparati); dopo un fork o un cambio di DB_PATH ne viene aperta una nuova. Alla prima
+    connessione del processo lo schema viene portato all'ultima versione.
+    """
+    conn = getattr(_locale, "conn", None)
+    if conn is None or _locale.pid != os.getpid() or _locale.path != DB_PATH:
+        conn = _apri_connessione()
+        _locale.conn = conn
+        _locale.pid = os.getpid()
+        _locale.path = DB_PATH
+    if DB_PATH not in _schema_pronto:
+        with _schema_lock:
+            if DB_PATH not in _schema_pronto:
+                _migra_schema(conn)
+                _schema_pronto.add(DB_PATH)
+    return conn
+
+def chiudi_connessione():
+    """Chiude la connessione del thread corrente, se aperta."""
+    conn = getattr(_locale, "conn", None)
+    if conn is not None and _locale.pid == os.getpid():
+        conn.close()
+    _locale.conn = None
+
+def _colonne(cursor, tabella):
+    """Restituisce l'insieme dei nomi di colonna di una tabella."""
+    return {row[1] for row in cursor.execute(f"PRAGMA table_info({tabella})")}
+
+def _migrazione_scansioni(cursor):
+    """Versione 1: tabella 'scansioni'."""
+    # Crea la tabella 'scansioni' se non esiste, con colonne per:
+    # id (chiave primaria autoincrement), timestamp, nome report, directory,
+    # risultati (testo JSON), stato, percorso (stringhe)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scansioni (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT,
+            report_name TEXT,
+            directory TEXT,
+            risultati TEXT,
+            stato TEXT,
+            percorso TEXT
+        )
+    """)
+    
+    # Aggiunge la colonna "stato" ai database creati prima della sua introduzione
+    if "stato" not in _colonne(cursor, "scansioni"):
+        cursor.execute("ALTER TABLE scansioni ADD COLUMN stato TEXT")
+
+def _migrazione_findings(cursor):
+    """Versione 2: tabella 'findings' normalizzata e migrazione dei blob JSON."""
+    # Risultati delle scansioni, una riga per ogni dato sensibile trovato,
+    # collegata alla scansione tramite scan_id
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS findings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            scan_id INTEGER NOT NULL REFERENCES scansioni(id) ON DELETE CASCADE,
+            file TEXT,
+            line INTEGER,
+            content TEXT,
+            data_type TEXT,
+            match TEXT
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_findings_scan_id ON findings(scan_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_findings_data_type ON findings(data_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_findings_file ON findings(file)")
+    
+    # Sposta nella tabella findings i risultati salvati come blob JSON dalle versioni precedenti
+    migra_risultati_json(cursor)
+
+def _migrazione_file_index(cursor):
+    """Versione 3: indice dei file per le scansioni incrementali."""
+    # Per ogni percorso salva dimensione, mtime, inode, hash del contenuto,
+    # firma dei pattern usati e risultati trovati (testo JSON)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS file_index (
+            path TEXT PRIMARY KEY,
+            size INTEGER,
+            mtime_ns INTEGER,
+            inode INTEGER,
+            hash TEXT,
+            firma TEXT,
+            risultati TEXT,
+            aggiornato TEXT
+        )
+    """)
+
+def _fts_trigram_disponibile(cursor):
+    """Indica se la libreria SQLite supporta FTS5 con il tokenizer trigram (SQLite >= 3.34)."""
+    if sqlite3.sqlite_version_info < (3, 34, 0):
+        return False
+    return any(row[0] == "ENABLE_FTS5" for row in cursor.execute("PRAGMA compile_options"))
+
+def _migrazione_ricerca_report(cursor):
+    """Versione 4: indici per lo storico dei report e indice full-text per la ricerca testuale."""
+    # Paginazione per data (keyset su timestamp, id), filtro per stato e ricerca per nome
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scansioni_timestamp ON scansioni(timestamp, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scansioni_stato ON scansioni(stato, timestamp, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_scansioni_report_name ON scansioni(report_name)")
+    
+    if not _fts_trigram_disponibile(cursor):
+        # Senza FTS5 la ricerca testuale ricade su LIKE (vedi recupera_report_pagina)
+        return
+    
+    # Indice full-text a trigrammi (ricerca per sottostringa, case-insensitive) sulle colonne
+    # mostrate nella finestra Database, mantenuto allineato a 'scansioni' dai trigger
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS scansioni_fts USING fts5(
+            report_name, percorso, stato, timestamp,
+            content='scansioni', content_rowid='id', tokenize='trigram'
+        )
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS scansioni_fts_ai AFTER INSERT ON scansioni BEGIN
+            INSERT INTO scansioni_fts(rowid, report_name, percorso, stato, timestamp)
+            VALUES (new.id, new.report_name, new.percorso, new.stato, new.timestamp);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS scansioni_fts_ad AFTER DELETE ON scansioni BEGIN
+            INSERT INTO scansioni_fts(scansioni_fts, rowid, report_name, percorso, stato, timestamp)
+            VALUES ('delete', old.id, old.report_name, old.percorso, old.stato, old.timestamp);
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS scansioni_fts_au AFTER UPDATE ON scansioni BEGIN
+            INSERT INTO scansioni_fts(scansioni_fts, rowid, report_name, percorso, stato, timestamp)
+            VALUES ('delete', old.id, old.report_name, old.percorso, old.stato, old.timestamp);
+            INSERT INTO scansioni_fts(rowid, report_name, percorso, stato, timestamp)
+            VALUES (new.id, new.report_name, new.percorso, new.stato, new.timestamp);
+        END
+    """)
+    # Indicizza le scansioni già presenti
+    cursor.execute("INSERT INTO scansioni_fts(scansioni_fts) VALUES ('rebuild')")
+
+def _migrazione_sweep(cursor):
+    """Versione 5: avanzamento delle scansioni pianificate (sweep) per riprenderle dopo un'interruzione."""
+    # Una riga per sweep, identificato dal nome: directory, date e stato (completato o in corso)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sweep (
+            nome TEXT PRIMARY KEY,
+            directory TEXT,
+            creato TEXT,
+            aggiornato TEXT,
+            completato INTEGER DEFAULT 0
+        )
+    """)
+    # File già scansionati dallo sweep in corso, con dimensione e mtime al momento della
+    # scansione (un file modificato dopo va riscansionato) e numero di risultati trovati
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS sweep_file (
+            nome TEXT NOT NULL REFERENCES sweep(nome) ON DELETE CASCADE,
+            path TEXT NOT NULL,
+            size INTEGER,
+            mtime_ns INTEGER,
+            risultati INTEGER,
+            PRIMARY KEY (nome, path)
+        ) WITHOUT ROWID
+    """)
+
+def _migrazione_checkpoint(cursor):
+    """Versione 6: scansioni salvate a checkpoint, riprendibili dopo un'interruzione."""
+    # Opzioni della scansione (testo JSON), per riprenderla con le stesse impostazioni
+    if "opzioni" not in _colonne(cursor, "scansioni"):
+        cursor.execute("ALTER TABLE scansioni ADD COLUMN opzioni TEXT")
+    # File già elaborati da ogni scansione: salvati insieme ai loro risultati, nella stessa transazione
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS scan_file (
+            scan_id INTEGER NOT NULL REFERENCES scansioni(id) ON DELETE CASCADE,
+            path TEXT NOT NULL,
+            PRIMARY KEY (scan_id, path)
+        ) WITHOUT ROWID
+    """)
+    # Scansione in cui uno sweep con nome salva i risultati dei suoi file: con scan_id i
+    # risultati sono già nella tabella findings, senza restano solo nel conteggio di sweep_file
+    if "scan_id" not in _colonne(cursor, "sweep_file"):
+        cursor.execute("ALTER TABLE sweep_file ADD COLUMN scan_id INTEGER REFERENCES scansioni(id) ON DELETE SET NULL")
+
+# Migrazioni dello schema in ordine: la versione corrente è salvata in PRAGMA user_version.
+# Per cambiare lo schema si aggiunge una funzione in fondo alla lista, senza modificare le precedenti.
+MIGRAZIONI = [
+    _migrazione_scansioni,
+    _migrazione_findings,
+    _migrazione_file_index,
+    _migrazione_ricerca_report,
+    _migrazione_sweep,
+    _migrazione_checkpoint,
+]
+
+def _migra_schema(conn):
+    """Applica, in un'unica transazione, le migrazioni non ancora eseguite sul database."""
+    versione = conn.execute("PRAGMA user_version").fetchone()[0]
+    if versione >= len(MIGRAZIONI):
+        return
     
-    # Connessione al database SQLite (il file viene creato se non esiste)
-    with sqlite3.connect(DB_PATH) as conn:
+    # BEGIN IMMEDIATE: un solo processo alla volta può migrare; gli altri attendono
+    # e rileggono la versione, che nel frattempo potrebbe essere già aggiornata
+    conn.execute("BEGIN IMMEDIATE")
+    try:
         cursor = conn.cursor()
-        
-        # Crea la tabella 'scansioni' se non esiste, con colonne per:
-        # id (chiave primaria autoincrement), timestamp, nome report, directory,
-        # risultati (testo JSON), stato, percorso (stringhe)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS scansioni (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT,
-                report_name TEXT,
-                directory TEXT,
-                risultati TEXT,
-                stato TEXT,
-                percorso TEXT
-            )
-        """)
-        
-        # Prova ad aggiungere la colonna "stato" se non esiste (per retrocompatibilità)
+        versione = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for numero, migrazione in enumerate(MIGRAZIONI[versione:], start=versione + 1):
+            migrazione(cursor)
+            cursor.execute(f"PRAGMA user_version = {numero}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+def inizializza_db():
+    """Crea il database e porta lo schema all'ultima versione, se necessario."""
+    get_connessione()
+
+def _inserisci_risultati(cursor, scan_id, risultati):
+    """Inserisce in blocco i risultati di una scansione nella tabella findings."""
+    cursor.executemany("""
+        INSERT INTO findings (scan_id, file, line, content, data_type, match)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (
+        (scan_id, r.get("file"), r.get("line"), r.get("content"), r.get("data_type"), r.get("match"))
+        for r in risultati
+    ))
+
+def migra_risultati_json(cursor):
+    """
+    Converte le scansioni che hanno ancora i risultati nel blob JSON della colonna
+    scansioni.risultati in righe della tabella findings, poi svuota il blob.
+    Viene eseguita all'interno della transazione della migrazione dello schema.
+    """
+    cursor.execute("SELECT id FROM scansioni WHERE risultati IS NOT NULL")
+    for (scan_id,) in cursor.fetchall():
+        row = cursor.execute("SELECT risultati FROM scansioni WHERE id = ?", (scan_id,)).fetchone()
         try:
-            cursor.execute("ALTER TABLE scansioni ADD COLUMN stato TEXT")
-        except sqlite3.OperationalError:
-            # Se la colonna esiste già, ignora l'errore
-            pass
-        
-        conn.commit()  # Salva le modifiche nel DB
+            risultati = json.loads(row[0]) if row[0] else []
+        except ValueError:
+            # Blob non leggibile: lo lascia com'è invece di perdere i dati
+            continue
+        _inserisci_risultati(cursor, scan_id, risultati)
+        cursor.execute("UPDATE scansioni SET risultati = NULL WHERE id = ?", (scan_id,))
+
+# Stati delle scansioni salvate a checkpoint (vedi inizia_scansione)
+STATO_IN_CORSO = "In corso"
+STATO_COMPLETATO = "Completato"
+STATO_INTERROTTO = "Interrotto"
+
+# Stato delle scansioni salvate da un report esportato: copie di risultati già salvati
+STATO_ESPORTATO = "Esportato"
 
-# Chiama la funzione per assicurarsi che il DB e la tabella siano pronti
-inizializza_db()
+# Stato delle scansioni salvate dal monitor del filesystem
+STATO_MONITORATO = "Monitorato"
+
+# Stato delle scansioni salvate dalle versioni precedenti dell'interfaccia grafica
+STATO_SCANNERIZZATO = "Scannerizzato"
+
+# Tutti gli stati, nell'ordine in cui vengono proposti come filtro
+STATI = (STATO_COMPLETATO, STATO_IN_CORSO, STATO_INTERROTTO, STATO_MONITORATO, STATO_ESPORTATO, STATO_SCANNERIZZATO)
 
 def salva_scansione(directory: str, risultati: list, report_name: str, stato: str):
-    """Salva una nuova scansione nel database."""
+    """Salva una nuova scansione nel database e ne restituisce l'id."""
     # Ottieni timestamp corrente in formato leggibile
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Converte la lista di risultati in una stringa JSON indentata
-    risultati_json = json.dumps(risultati, indent=2)
 
-    # Connessione al DB e inserimento di un nuovo record nella tabella scansioni
-    with sqlite3.connect(DB_PATH) as conn:
+    # La scansione e i suoi risultati vengono inseriti in un'unica transazione
+    with get_connessione() as conn:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO scansioni (timestamp, report_name, directory, risultati, stato, percorso)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (timestamp, report_name, directory, risultati_json, stato, directory))
-        conn.commit()  # Conferma inserimento
+            VALUES (?, ?, ?, NULL, ?, ?)
+        """, (timestamp, report_name, directory, stato, directory))
+        scan_id = cursor.lastrowid
+        
+        # Inserimento in blocco dei risultati nella tabella findings
+        _inserisci_risultati(cursor, scan_id, risultati)
+    return scan_id
+
+# Numero predefinito di report restituiti per pagina
+PAGINA_REPORT = 100
+
+def _formatta_data(valore, fine_giornata=False):
+    """
+    Converte una data (datetime, date o stringa ISO come "2026-10-18" o
+    "2026-10-18 12:30:00") nel formato dei timestamp salvati nel DB.
+
+    Raises:
+        ValueError: Se la stringa non è una data ISO valida
+    """
+    if isinstance(valore, str):
+        # Una stringa con la sola data vale come oggetto date: indica l'intera giornata
+        try:
+            valore = date.fromisoformat(valore.strip())
+        except ValueError:
+            valore = datetime.fromisoformat(valore.strip())
+    if isinstance(valore, datetime):
+        return valore.strftime("%Y-%m-%d %H:%M:%S")
+    if hasattr(valore, "strftime"):
+        # Oggetto date: considera l'intera giornata
+        return valore.strftime("%Y-%m-%d") + (" 23:59:59" if fine_giornata else " 00:00:00")
+    return valore
+
+def recupera_report_pagina(limite: int = PAGINA_REPORT, dopo=None, data_inizio=None, data_fine=None,
+                           stato: str = None, testo: str = None):
+    """
+    Restituisce una pagina dello storico dei report, ordinata per data decrescente.
 
-def recupera_report():
-    """Restituisce la lista dei report (timestamp, nome, stato, percorso), ordinata per data decrescente."""
-    with sqlite3.connect(DB_PATH) as conn:
+    La paginazione è a chiave (keyset): per la pagina successiva si passa in ``dopo`` la
+    coppia (timestamp, id) dell'ultima riga ricevuta, così ogni pagina costa come la prima.
+    Tutti i filtri sono applicati in SQL sfruttando gli indici di 'scansioni' e, per la
+    ricerca testuale, l'indice full-text 'scansioni_fts' se disponibile.
+
+    Args:
+        limite (int): Numero massimo di righe restituite
+        dopo (tuple): (timestamp, id) dell'ultima riga della pagina precedente
+        data_inizio: Data/ora minima (datetime, date o stringa ISO "YYYY-MM-DD[ HH:MM:SS]")
+        data_fine: Data/ora massima, inclusa (le date senza ora includono tutta la giornata)
+        stato (str): Stato esatto della scansione
+        testo (str): Testo cercato in nome, percorso, stato e data (case-insensitive)
+
+    Returns:
+        list: Tuple (id, timestamp, report_name, stato, percorso)
+
+    Raises:
+        ValueError: Se una data passata come stringa non è valida
+    """
+    condizioni = []
+    parametri = []
+    
+    if dopo is not None:
+        condizioni.append("(s.timestamp, s.id) < (?, ?)")
+        parametri.extend(dopo)
+    if data_inizio is not None:
+        condizioni.append("s.timestamp >= ?")
+        parametri.append(_formatta_data(data_inizio))
+    if data_fine is not None:
+        condizioni.append("s.timestamp <= ?")
+        parametri.append(_formatta_data(data_fine, fine_giornata=True))
+    if stato:
+        condizioni.append("s.stato = ?")
+        parametri.append(stato)
+    
+    with get_connessione() as conn:
+        if testo:
+            fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scansioni_fts'"
+            ).fetchone()
+            # Il tokenizer trigram richiede almeno 3 caratteri; altrimenti si usa LIKE
+            if fts and len(testo) >= 3:
+                condizioni.append("s.id IN (SELECT rowid FROM scansioni_fts WHERE scansioni_fts MATCH ?)")
+                parametri.append('"' + testo.replace('"', '""') + '"')
+            else:
+                like = "%" + testo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+                condizioni.append(
+                    "(s.report_name LIKE ? ESCAPE '\\' OR s.percorso LIKE ? ESCAPE '\\'"
+                    " OR s.stato LIKE ? ESCAPE '\\' OR s.timestamp LIKE ? ESCAPE '\\')"
+                )
+                parametri.extend([like] * 4)
+        
+        where = ("WHERE " + " AND ".join(condizioni)) if condizioni else ""
+        cursor = conn.execute(f"""
+            SELECT s.id, s.timestamp, s.report_name, s.stato, s.percorso
+            FROM scansioni s
+            {where}
+            ORDER BY s.timestamp DESC, s.id DESC
+            LIMIT ?
+        """, parametri + [limite])
+        return cursor.fetchall()
+
+def recupera_id_scansioni(report_name: str):
+    """Restituisce gli id delle scansioni con il nome indicato, dalla più recente (i nomi possono ripetersi)."""
+    with get_connessione() as conn:
+        cursor = conn.execute("SELECT id FROM scansioni WHERE report_name = ? ORDER BY id DESC", (report_name,))
+        return [scan_id for (scan_id,) in cursor]
+
+def recupera_contenuto_report(scan_id: int):
+    """
+    Recupera i risultati di una scansione dato il suo id, come iteratore che li legge dal
+    database man mano (vedi recupera_risultati_scansione), o None se la scansione non esiste.
+    """
+    with get_connessione() as conn:
+        result = conn.execute("SELECT risultati FROM scansioni WHERE id = ?", (scan_id,)).fetchone()
+    # Se nessun risultato trovato, ritorna None
+    if result is None:
+        return None
+    
+    # Scansione con blob JSON non migrato (illeggibile durante la migrazione)
+    if result[0]:
+        return iter(json.loads(result[0]))
+    
+    return recupera_risultati_scansione(scan_id)
+
+def recupera_risultati_scansione(scan_id: int):
+    """
+    Restituisce un generatore dei risultati di una scansione, nel formato prodotto dallo
+    scanner e nell'ordine in cui sono stati salvati, senza caricarli tutti in memoria.
+    """
+    cursor = get_connessione().execute("""
+        SELECT file, line, content, data_type, match
+        FROM findings
+        WHERE scan_id = ?
+        ORDER BY id
+    """, (scan_id,))
+    for file, line, content, data_type, match in cursor:
+        yield {"file": file, "line": line, "content": content, "data_type": data_type, "match": match}
+
+def copia_scansione(scan_id: int, report_name: str, stato: str):
+    """
+    Salva come nuova scansione una copia dei risultati di scan_id, copiandoli all'interno
+    del database (es. un report esportato, con stato STATO_ESPORTATO), e ne restituisce l'id.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_connessione() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT timestamp, report_name, stato, percorso
-            FROM scansioni
-            ORDER BY timestamp DESC
-        """)
-        # Ritorna tutte le righe ottenute come lista di tuple
-        return cursor.fetchall()
+            INSERT INTO scansioni (timestamp, report_name, directory, risultati, stato, percorso)
+            SELECT ?, ?, directory, NULL, ?, percorso FROM scansioni WHERE id = ?
+        """, (timestamp, report_name, stato, scan_id))
+        nuovo_id = cursor.lastrowid
+        cursor.execute("""
+            INSERT INTO findings (scan_id, file, line, content, data_type, match)
+            SELECT ?, file, line, content, data_type, match FROM findings WHERE scan_id = ? ORDER BY id
+        """, (nuovo_id, scan_id))
+    return nuovo_id
+
+def elimina_report(scan_id: int):
+    """Elimina un report dal database dato l'id della scansione (i nomi possono ripetersi)."""
+    with get_connessione() as conn:
+        c = conn.cursor()
+        # Elimina prima i risultati collegati, poi la scansione
+        c.execute("DELETE FROM findings WHERE scan_id = ?", (scan_id,))
+        c.execute("DELETE FROM scansioni WHERE id = ?", (scan_id,))
 
-def recupera_contenuto_report(report_name: str):
-    """Recupera i risultati JSON di una scansione dato il nome del report."""
-    with sqlite3.connect(DB_PATH) as conn:
+def recupera_indice_file(path: str):
+    """Restituisce la voce dell'indice per un file (dizionario) o None se il file non è indicizzato."""
+    with get_connessione() as conn:
         cursor = conn.cursor()
         cursor.execute("""
-            SELECT risultati FROM scansioni
-            WHERE report_name = ?
-            LIMIT 1
-        """, (report_name,))
-        result = cursor.fetchone()
-        if result:
-            # Converte la stringa JSON in struttura dati Python e la restituisce
-            return json.loads(result[0])
-        # Se nessun risultato trovato, ritorna None
+            SELECT size, mtime_ns, inode, hash, firma, risultati
+            FROM file_index
+            WHERE path = ?
+        """, (path,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        size, mtime_ns, inode, hash_, firma, risultati = row
+        return {
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "inode": inode,
+            "hash": hash_,
+            "firma": firma,
+            "risultati": json.loads(risultati) if risultati else [],
+        }
+
+def salva_indice_file(voci: list):
+    """
+    Inserisce o aggiorna in blocco le voci dell'indice dei file.
+    Ogni voce è un dizionario con path, size, mtime_ns, inode, hash, firma e risultati.
+    """
+    if not voci:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_connessione() as conn:
+        cursor = conn.cursor()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO file_index (path, size, mtime_ns, inode, hash, firma, risultati, aggiornato)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (v["path"], v["size"], v["mtime_ns"], v["inode"], v["hash"], v["firma"],
+             json.dumps(v["risultati"]), timestamp)
+            for v in voci
+        ])
+
+def recupera_storico_risultati():
+    """
+    Restituisce il numero di risultati trovati in passato per ogni file, dalle scansioni
+    salvate e dagli sweep: serve a dare priorità ai file e alle directory già a rischio.
+
+    I percorsi sono assoluti (quelli relativi vengono risolti rispetto alla directory di
+    lavoro) e i risultati dei membri di un archivio sono attribuiti all'archivio. Ogni
+    risultato è contato una volta: gli sweep contano solo se non l'hanno salvato in una
+    scansione, e le scansioni STATO_ESPORTATO (copie di risultati già salvati) non contano.
+
+    Returns:
+        dict: Percorso -> numero di risultati
+    """
+    storico = {}
+    with get_connessione() as conn:
+        righe = conn.execute("""
+            SELECT f.file, COUNT(*)
+            FROM findings f JOIN scansioni s ON s.id = f.scan_id
+            WHERE s.stato IS NOT ?
+            GROUP BY f.file
+        """, (STATO_ESPORTATO,)).fetchall()
+        righe += conn.execute("SELECT path, risultati FROM sweep_file WHERE risultati > 0 AND scan_id IS NULL").fetchall()
+    for file, conteggio in righe:
+        if not file:
+            continue
+        path = os.path.abspath(file.split("!", 1)[0])
+        storico[path] = storico.get(path, 0) + conteggio
+    return storico
+
+def inizia_sweep(nome: str, directory: str):
+    """
+    Prepara lo sweep indicato e ne restituisce i file già scansionati.
+
+    Uno sweep interrotto viene ripreso; uno completato, o registrato per un'altra
+    directory, ricomincia da capo.
+
+    Returns:
+        dict: Percorso -> (size, mtime_ns) dei file già scansionati
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_connessione() as conn:
+        riga = conn.execute("SELECT directory, completato FROM sweep WHERE nome = ?", (nome,)).fetchone()
+        if riga is not None and (riga[1] or riga[0] != directory):
+            conn.execute("DELETE FROM sweep_file WHERE nome = ?", (nome,))
+            conn.execute("DELETE FROM sweep WHERE nome = ?", (nome,))
+            riga = None
+        if riga is None:
+            conn.execute("""
+                INSERT INTO sweep (nome, directory, creato, aggiornato, completato)
+                VALUES (?, ?, ?, ?, 0)
+            """, (nome, directory, timestamp, timestamp))
+            return {}
+        cursor = conn.execute("SELECT path, size, mtime_ns FROM sweep_file WHERE nome = ?", (nome,))
+        return {path: (size, mtime_ns) for path, size, mtime_ns in cursor}
+
+def salva_avanzamento_sweep(nome: str, voci: list, scan_id: int = None, risultati: list = ()):
+    """
+    Registra in blocco i file scansionati da uno sweep.
+    Ogni voce è una tupla (path, size, mtime_ns, numero di risultati).
+    Con scan_id i risultati di quei file vengono salvati nella stessa transazione:
+    un file risulta già scansionato dallo sweep solo se i suoi risultati sono salvati.
+    """
+    if not voci:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_connessione() as conn:
+        if scan_id is not None:
+            _inserisci_risultati(conn.cursor(), scan_id, risultati)
+        conn.executemany("""
+            INSERT OR REPLACE INTO sweep_file (nome, path, size, mtime_ns, risultati, scan_id)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(nome,) + tuple(voce) + (scan_id,) for voce in voci])
+        conn.execute("UPDATE sweep SET aggiornato = ? WHERE nome = ?", (timestamp, nome))
+
+def completa_sweep(nome: str):
+    """Segna uno sweep come completato: la prossima esecuzione ricomincerà da capo."""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_connessione() as conn:
+        conn.execute("UPDATE sweep SET completato = 1, aggiornato = ? WHERE nome = ?", (timestamp, nome))
+
+def inizia_scansione(directory: str, report_name: str, opzioni: dict = None):
+    """
+    Registra una scansione che salverà i risultati a checkpoint (vedi salva_checkpoint)
+    e ne restituisce l'id. Lo stato iniziale è STATO_IN_CORSO.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with get_connessione() as conn:
+        cursor = conn.execute("""
+            INSERT INTO scansioni (timestamp, report_name, directory, risultati, stato, percorso, opzioni)
+            VALUES (?, ?, ?, NULL, ?, ?, ?)
+        """, (timestamp, report_name, directory, STATO_IN_CORSO, directory, json.dumps(opzioni or {})))
+        return cursor.lastrowid
+
+def salva_checkpoint(scan_id: int, file_elaborati: list, risultati: list):
+    """
+    Salva in un'unica transazione i file elaborati da una scansione e i loro risultati:
+    dopo un'interruzione, un file risulta elaborato solo se i suoi risultati sono salvati.
+    """
+    if not file_elaborati and not risultati:
+        return
+    with get_connessione() as conn:
+        cursor = conn.cursor()
+        _inserisci_risultati(cursor, scan_id, risultati)
+        cursor.executemany(
+            "INSERT OR IGNORE INTO scan_file (scan_id, path) VALUES (?, ?)",
+            ((scan_id, path) for path in file_elaborati),
+        )
+
+def aggiorna_stato_scansione(scan_id: int, stato: str):
+    """Aggiorna lo stato di una scansione (es. STATO_COMPLETATO o STATO_INTERROTTO)."""
+    with get_connessione() as conn:
+        conn.execute("UPDATE scansioni SET stato = ? WHERE id = ?", (stato, scan_id))
+
+def recupera_scansione(scan_id: int):
+    """
+    Restituisce una scansione come dizionario (id, timestamp, report_name, directory,
+    stato, opzioni, risultati e file elaborati finora) o None se non esiste.
+    Le opzioni sono None per le scansioni non salvate a checkpoint.
+    """
+    with get_connessione() as conn:
+        row = conn.execute("""
+            SELECT id, timestamp, report_name, directory, stato, opzioni,
+                   (SELECT COUNT(*) FROM findings WHERE scan_id = s.id),
+                   (SELECT COUNT(*) FROM scan_file WHERE scan_id = s.id)
+            FROM scansioni s
+            WHERE id = ?
+        """, (scan_id,)).fetchone()
+    if row is None:
         return None
+    id_, timestamp, report_name, directory, stato, opzioni, risultati, file_elaborati = row
+    return {
+        "id": id_,
+        "timestamp": timestamp,
+        "report_name": report_name,
+        "directory": directory,
+        "stato": stato,
+        "opzioni": json.loads(opzioni) if opzioni is not None else None,
+        "risultati": risultati,
+        "file_elaborati": file_elaborati,
+    }
 
-def elimina_report(report_name):
-    """Elimina un report dal database dato il nome."""
-    with sqlite3.connect(DB_PATH) as conn:
-        c = conn.cursor()
-        c.execute("DELETE FROM scansioni WHERE report_name = ?", (report_name,))
-        conn.commit()
+def recupera_file_elaborati(scan_id: int):
+    """Restituisce l'insieme dei percorsi già elaborati da una scansione."""
+    with get_connessione() as conn:
+        cursor = conn.execute("SELECT path FROM scan_file WHERE scan_id = ?", (scan_id,))
+        return {path for (path,) in cursor}
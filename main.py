@@ -1,15 +1,22 @@
 import os
 import sys
-from datetime import datetime
-from scanner.scanner import scan_file
-from report.report_generator import generate_txt_report
+import argparse
+import contextlib
 
-# Importa la funzione per lanciare l'interfaccia grafica
-from GUI.gui_app import launch_gui
-from db.database import inizializza_db
+# Solo moduli della libreria standard a livello di modulo: scanner, database, report e GUI
+# vengono importati dai singoli comandi, così una scansione da cron non carica tkinter,
+# ttkbootstrap e tkcalendar e funziona anche su host senza display
 
-# Inizializza il database SQLite all'avvio dell'applicazione
-inizializza_db()
+# Codici di uscita: 1 solo con --exit-code-on-findings, 2 per errori (come argparse)
+EXIT_OK = 0
+EXIT_FINDINGS = 1
+EXIT_ERROR = 2
+
+# Sottocomandi riconosciuti (un primo argomento diverso viene trattato come percorso da scansionare)
+COMMANDS = ("scan", "sweep", "resume", "report", "history", "watch", "gui")
+
+# Formati di output (gli stessi del writer dei report, elencati qui per non importarlo all'avvio)
+OUTPUT_FORMATS = ("txt", "jsonl", "csv", "sarif")
 
 def check_environment():
     """
@@ -24,10 +31,10 @@ def check_environment():
 def group_results(results):
     """
     Raggruppa i risultati della scansione per tipo di dato sensibile.
-    
+
     Args:
         results (list): Lista dei risultati dalla scansione
-        
+
     Returns:
         dict: Dizionario con i risultati raggruppati per tipo di dato
     """
@@ -39,67 +46,519 @@ def group_results(results):
         grouped[key].append(item)
     return grouped
 
-def main_cli(path):
+def _open_writer(args, scan_path, stdout):
     """
-    Esegue la scansione in modalità command line interface (CLI).
-    
-    Args:
-        path (str): Percorso del file da scansionare
-    """
-    # Esegue la scansione del file specificato
-    results = scan_file(path)
-
-    # Se non sono stati trovati risultati, mostra messaggio di successo
-    if not results:
-        print("\n✅ Nessun dato sensibile rilevato.")
-        return
-
-    # Mostra i risultati della scansione
-    print("\n== RISULTATI DELLA SCANSIONE ==\n")
-    for r in results:
-        print(f"📄 File: {r['file']}")
-        print(f"🔢 Riga: {r['line']}")
-        print(f"🔍 Contenuto: {r['content'].strip()}")
-        print(f"   → {r['data_type']}: {r['match']}\n")
-
-    # Chiede all'utente se vuole generare un report
-    risposta = input("Vuoi generare un report .txt dei risultati? (s/n): ").lower()
-    if risposta == 's':
-        # Raggruppa i risultati per tipo di dato
-        grouped = group_results(results)
-        
-        # Genera un nome file con timestamp
-        timestamp = datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
-        filename = f"Report_{timestamp}.txt"
-        
-        # Genera il report
-        generate_txt_report(grouped, path, filename)
-        print(f"📄 Report generato: {filename}")
-
-def main():
-    """
-    Funzione principale che determina la modalità di esecuzione del programma.
-    
-    Modalità disponibili:
-    - --gui: Avvia l'interfaccia grafica
-    - <percorso_file>: Esegue la scansione CLI del file specificato
-    """
-    # Verifica l'ambiente di esecuzione
+    Apre il writer del report indicato da --output e --format.
+
+    Senza --output (o con "-") il report viene scritto su stdout; il formato, se non
+    indicato, è dedotto dall'estensione di --output (txt per stdout).
+    """
+    from report.report_generator import WRITERS, open_report, format_from_filename
+
+    output = args.output
+    if output is None or output == "-":
+        return WRITERS[args.format or "txt"]("-", scan_path, stream=stdout)
+    format = args.format or format_from_filename(output)
+    return open_report(os.path.basename(output), scan_path, format, os.path.dirname(output) or ".")
+
+def _load_registry(args):
+    """
+    Registro dei pattern della scansione: quello predefinito, eventualmente letto da
+    --patterns-config e limitato ai tipi di dato indicati con --only.
+
+    Raises:
+        ValueError: Se la configurazione o i tipi di dato non sono validi
+        OSError: Se il file di configurazione non può essere letto
+    """
+    from utils.patterns import patterns, load_patterns_config
+
+    registry = load_patterns_config(args.patterns_config) if args.patterns_config else patterns
+    if args.only:
+        registry = registry.select(args.only)
+    return registry
+
+def _iter_findings(paths, args, errors, registry=None):
+    """Genera i risultati di tutti i percorsi indicati, file o directory, senza accumularli."""
+    from scanner.scanner import iter_scan_file, iter_scan_directory
+
+    walk_options = {"max_depth": args.max_depth, "same_filesystem": args.same_filesystem, "symlinks": args.symlinks}
+    for path in paths:
+        if os.path.isdir(path):
+            if args.io_workers:
+                # Pipeline asincrona per i filesystem di rete: I/O concorrente, risultati in ordine di completamento
+                from scanner.pipeline import iter_scan_directory_pipeline
+                outcomes = iter_scan_directory_pipeline(path, io_workers=args.io_workers, cpu_workers=args.workers,
+                                                        queue_size=args.queue_size, use_mmap=args.mmap,
+                                                        walk_options=walk_options, registry=registry, max_size=args.max_size)
+            else:
+                outcomes = iter_scan_directory(path, workers=args.workers, incremental=args.incremental,
+                                               use_mmap=args.mmap, walk_options=walk_options, registry=registry,
+                                               max_size=args.max_size)
+            for _, file_results in outcomes:
+                yield from file_results
+        elif os.path.isfile(path):
+            yield from iter_scan_file(path, max_size=args.max_size, use_mmap=args.mmap, registry=registry)
+        else:
+            print(f"[!] Percorso non valido: {path}")
+            errors.append(path)
+
+def cmd_scan(args):
+    """
+    Scansiona file e directory e scrive i risultati in streaming, senza domande interattive.
+
+    I messaggi diagnostici dello scanner vanno su stderr, il report su stdout o su --output.
+
+    Returns:
+        int: Codice di uscita
+    """
+    if args.io_workers and args.incremental:
+        print("[!] --incremental non è supportato con --io-workers", file=sys.stderr)
+        return EXIT_ERROR
+    if args.checkpoint:
+        if len(args.paths) != 1 or not os.path.isdir(args.paths[0]):
+            print("[!] --checkpoint richiede una sola directory", file=sys.stderr)
+            return EXIT_ERROR
+        if args.io_workers or args.save:
+            print("[!] --checkpoint non è supportato con --io-workers e --save (i risultati vengono già salvati)", file=sys.stderr)
+            return EXIT_ERROR
+    try:
+        registry = _load_registry(args)
+    except (ValueError, OSError) as e:
+        print(f"[!] {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    if args.checkpoint:
+        from scanner.checkpoint import start_scan
+        directory = os.path.abspath(args.paths[0])
+        # Opzioni salvate con la scansione, per riprenderla con le stesse impostazioni
+        options = {
+            "workers": args.workers,
+            "incremental": args.incremental,
+            "mmap": args.mmap,
+            "max_size": args.max_size,
+            "walk_options": {"max_depth": args.max_depth, "same_filesystem": args.same_filesystem, "symlinks": args.symlinks},
+            "only": args.only,
+            "patterns_config": os.path.abspath(args.patterns_config) if args.patterns_config else None,
+        }
+        name = _report_name(args)
+        scan_id = start_scan(directory, name, options)
+        return _run_checkpointed(args, scan_id, name, directory, options, registry)
+
+    errors = []
+    return _write_findings(args, ", ".join(args.paths), lambda: _iter_findings(args.paths, args, errors, registry), errors)
+
+def _write_findings(args, scan_path, iter_findings, errors=()):
+    """
+    Scrive i risultati prodotti da iter_findings nel report (e, con --save, nel database)
+    e restituisce il codice di uscita. Durante la scansione stdout è rediretto su stderr.
+    """
+    stdout = sys.stdout
+    saved = None
+
+    with contextlib.redirect_stdout(sys.stderr), contextlib.closing(iter_findings()) as findings:
+        if args.save:
+            # Il salvataggio nel database richiede tutti i risultati: vengono tenuti in un ResultStore
+            from scanner.results import ResultStore
+            saved = ResultStore()
+            findings = _tee(findings, saved)
+        with _open_writer(args, scan_path, stdout) as writer:
+            writer.write_all(findings)
+        if args.output not in (None, "-"):
+            print(f"[INFO] Report salvato nel file: {writer.filepath}")
+
+        if saved is not None:
+            from db.database import salva_scansione
+            salva_scansione(scan_path, saved, _report_name(args), "Completato")
+        print(f"[INFO] {writer.count} risultati" + (f" ({', '.join(f'{k}: {v}' for k, v in writer.totals.items())})" if writer.totals else ""))
+
+    if errors:
+        return EXIT_ERROR
+    if args.exit_code_on_findings and writer.count:
+        return EXIT_FINDINGS
+    return EXIT_OK
+
+def _report_name(args, prefix="Scan"):
+    """Nome della scansione nel database: quello del file di --output o uno con data e ora."""
+    from datetime import datetime
+
+    if args.output not in (None, "-"):
+        return os.path.basename(args.output)
+    timestamp = datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
+    return f"{prefix}_{timestamp}.{args.format or 'txt'}"
+
+def _tee(findings, store):
+    # Passa i risultati al writer conservandone una copia compatta
+    for finding in findings:
+        store.append(finding)
+        yield finding
+
+def _parse_size(value):
+    """Dimensione in byte da una stringa come "500M", "10G" o "4096"."""
+    units = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+    value = value.strip().upper().removesuffix("B")
+    try:
+        if value and value[-1] in units:
+            return int(float(value[:-1]) * units[value[-1]])
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"dimensione non valida: {value}") from None
+
+def _parse_duration(value):
+    """Durata in secondi da una stringa come "90", "45m" o "2h"."""
+    units = {"S": 1, "M": 60, "H": 3600}
+    value = value.strip().upper()
+    try:
+        if value and value[-1] in units:
+            return float(value[:-1]) * units[value[-1]]
+        return float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"durata non valida: {value}") from None
+
+def cmd_sweep(args):
+    """
+    Scansiona una directory in ordine di rischio, entro i budget indicati; con --name
+    riprende lo sweep interrotto con lo stesso nome e salva i risultati nel database
+    insieme all'avanzamento.
+
+    Returns:
+        int: Codice di uscita
+    """
+    if not os.path.isdir(args.directory):
+        print(f"[!] Percorso non valido: {args.directory}", file=sys.stderr)
+        return EXIT_ERROR
+    if args.name and args.save and not args.dry_run:
+        print("[!] --save non serve con --name (i risultati vengono già salvati)", file=sys.stderr)
+        return EXIT_ERROR
+    try:
+        registry = _load_registry(args)
+    except (ValueError, OSError) as e:
+        print(f"[!] {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    from scanner.scheduler import ScanBudget, iter_scan_scheduled, plan_scan
+
+    walk_options = {"max_depth": args.max_depth, "same_filesystem": args.same_filesystem, "symlinks": args.symlinks}
+    if args.dry_run:
+        # Solo il piano: punteggio, dimensione e percorso, dal file più a rischio
+        history = None
+        if not args.no_history:
+            from db.database import recupera_storico_risultati
+            history = recupera_storico_risultati()
+        plan = plan_scan(args.directory, history, walk_options=walk_options)
+        plan, _ = ScanBudget(max_bytes=args.max_bytes, max_files=args.max_files).select(plan)
+        for score, path, st in plan:
+            print(f"{score:8.3f} {st.st_size:>12} {path}")
+        return EXIT_OK
+
+    budget = ScanBudget(args.max_time, args.max_bytes, args.max_files)
+    stats = {}
+    scan_id = None
+    if args.name:
+        # Con un cursore i risultati vanno nel database con l'avanzamento: un file segnato
+        # come già scansionato dallo sweep ha sempre i suoi risultati salvati
+        from db.database import inizia_scansione
+        name = _report_name(args, prefix=f"Sweep_{args.name}")
+        scan_id = inizia_scansione(os.path.abspath(args.directory), name, {"sweep": args.name})
+        print(f"[INFO] Risultati salvati nel database: privacywatcher report {scan_id}", file=sys.stderr)
+
+    def iter_findings():
+        for _, file_results in iter_scan_scheduled(args.directory, budget, sweep=args.name, use_history=not args.no_history,
+                                                   workers=args.workers, stats=stats, use_mmap=args.mmap,
+                                                   walk_options=walk_options, registry=registry, scan_id=scan_id,
+                                                   max_size=args.max_size):
+            yield from file_results
+        print(f"[INFO] {stats['scanned']} file scansionati, {stats['remaining']} rimandati"
+              + (f", {stats['resumed']} già scansionati dallo sweep" if stats.get('resumed') else "")
+              + f" (arresto: {stats['stopped']})")
+
+    try:
+        return _write_findings(args, args.directory, iter_findings)
+    except KeyboardInterrupt:
+        print("\n[!] Sweep interrotto" + (f": riprendilo con: privacywatcher sweep --name {args.name}" if args.name else ""),
+              file=sys.stderr)
+        return EXIT_ERROR
+
+def _run_checkpointed(args, scan_id, name, directory, options, registry):
+    """
+    Esegue (o riprende) una scansione a checkpoint: i risultati vanno nel report come per
+    scan e vengono salvati nel database a ogni checkpoint, insieme ai file elaborati.
+    """
+    from scanner.checkpoint import iter_scan_checkpointed
+
+    stats = {}
+    print(f"[INFO] Scansione {scan_id} ({name}): se si interrompe, riprendila con: privacywatcher resume {scan_id}", file=sys.stderr)
+
+    def iter_findings():
+        scan = iter_scan_checkpointed(scan_id, directory, workers=options.get("workers", 1), stats=stats,
+                                      incremental=options.get("incremental", False), use_mmap=options.get("mmap", False),
+                                      walk_options=options.get("walk_options"), registry=registry,
+                                      checkpoint_files=args.checkpoint_every, max_size=options.get("max_size"))
+        with contextlib.closing(scan):
+            for _, file_results in scan:
+                yield from file_results
+        print(f"[INFO] Scansione {scan_id} completata: {stats['checkpoints']} checkpoint salvati nel database"
+              + (f", {stats['resumed']} file già elaborati" if stats.get('resumed') else "")
+              + f". Risultati completi: privacywatcher report {scan_id}", file=sys.stderr)
+
+    try:
+        return _write_findings(args, directory, iter_findings)
+    except KeyboardInterrupt:
+        print(f"\n[!] Scansione {scan_id} interrotta: riprendila con: privacywatcher resume {scan_id}", file=sys.stderr)
+        return EXIT_ERROR
+
+def cmd_resume(args):
+    """
+    Riprende una scansione a checkpoint interrotta, saltando i file già elaborati.
+    Il report contiene solo i risultati dei file rimanenti; quelli completi sono nel database.
+
+    Returns:
+        int: Codice di uscita
+    """
+    from db.database import recupera_scansione, STATO_COMPLETATO
+
+    scan = recupera_scansione(args.scan_id)
+    if scan is None:
+        print(f"[!] Scansione non trovata nel database: {args.scan_id}", file=sys.stderr)
+        return EXIT_ERROR
+    if scan["opzioni"] is None:
+        print(f"[!] La scansione {args.scan_id} non è stata salvata a checkpoint e non può essere ripresa", file=sys.stderr)
+        return EXIT_ERROR
+    if "sweep" in scan["opzioni"]:
+        print(f"[!] La scansione {args.scan_id} appartiene a uno sweep: riprendila con privacywatcher sweep --name {scan['opzioni']['sweep']}",
+              file=sys.stderr)
+        return EXIT_ERROR
+    if scan["stato"] == STATO_COMPLETATO:
+        print(f"[!] La scansione {args.scan_id} è già completata: privacywatcher report {args.scan_id}", file=sys.stderr)
+        return EXIT_ERROR
+    if not os.path.isdir(scan["directory"]):
+        print(f"[!] Percorso non valido: {scan['directory']}", file=sys.stderr)
+        return EXIT_ERROR
+
+    options = scan["opzioni"]
+    try:
+        registry = _load_registry(argparse.Namespace(only=options.get("only"), patterns_config=options.get("patterns_config")))
+    except (ValueError, OSError) as e:
+        print(f"[!] {e}", file=sys.stderr)
+        return EXIT_ERROR
+    print(f"[INFO] Ripresa della scansione {args.scan_id} di {scan['directory']} "
+          f"({scan['file_elaborati']} file già elaborati, {scan['risultati']} risultati salvati)", file=sys.stderr)
+    return _run_checkpointed(args, args.scan_id, scan["report_name"], scan["directory"], options, registry)
+
+def _resolve_scan(riferimento):
+    """
+    Trova la scansione indicata per id o per nome del report. I nomi possono ripetersi:
+    se più scansioni hanno lo stesso nome bisogna indicarne l'id.
+
+    Returns:
+        dict: La scansione (vedi recupera_scansione)
+
+    Raises:
+        LookupError: Se la scansione non esiste o il nome è ambiguo
+    """
+    from db.database import recupera_scansione, recupera_id_scansioni
+
+    if riferimento.isdigit():
+        scan = recupera_scansione(int(riferimento))
+        if scan is not None:
+            return scan
+    ids = recupera_id_scansioni(riferimento)
+    if not ids:
+        raise LookupError(f"Scansione non trovata nel database: {riferimento}")
+    if len(ids) > 1:
+        raise LookupError(f"Più scansioni si chiamano {riferimento} (id {', '.join(map(str, ids))}): indica l'id")
+    return recupera_scansione(ids[0])
+
+def cmd_report(args):
+    """
+    Esporta i risultati di una scansione salvata nel database, nel formato richiesto.
+    I risultati vengono letti dal database man mano che il report li scrive.
+
+    Returns:
+        int: Codice di uscita
+    """
+    from db.database import recupera_contenuto_report
+
+    try:
+        scan = _resolve_scan(args.scan)
+    except LookupError as e:
+        print(f"[!] {e}", file=sys.stderr)
+        return EXIT_ERROR
+    results = recupera_contenuto_report(scan["id"])
+    with _open_writer(args, scan["directory"], sys.stdout) as writer:
+        writer.write_all(results)
+    if args.exit_code_on_findings and writer.count:
+        return EXIT_FINDINGS
+    return EXIT_OK
+
+def cmd_history(args):
+    """
+    Mostra lo storico delle scansioni salvate, dalla più recente.
+
+    Returns:
+        int: Codice di uscita
+    """
+    from db.database import recupera_report_pagina
+
+    try:
+        rows = recupera_report_pagina(args.limit, data_inizio=args.since, data_fine=args.until, stato=args.status, testo=args.search)
+    except ValueError as e:
+        print(f"[!] Data non valida: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    for scan_id, timestamp, report_name, stato, percorso in rows:
+        print(f"{scan_id:>6}  {timestamp}  {stato:<12} {report_name}  {percorso}")
+    if not rows:
+        print("Nessuna scansione salvata.", file=sys.stderr)
+    return EXIT_OK
+
+def cmd_watch(args):
+    """
+    Monitora le directory indicate e scansiona i file creati o modificati (fino a Ctrl+C).
+
+    Returns:
+        int: Codice di uscita
+    """
+    from monitor.monitor import watch
+
+    try:
+        walk_options = {"max_depth": args.max_depth, "same_filesystem": args.same_filesystem, "symlinks": args.symlinks}
+        watch(args.paths, debounce=args.debounce, polling=args.polling, interval=args.interval, save=not args.no_save,
+              walk_options=walk_options)
+    except NotADirectoryError as e:
+        print(f"[!] {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+def cmd_gui(args):
+    """Avvia l'interfaccia grafica."""
     check_environment()
+    try:
+        from GUI.gui_app import launch_gui
+    except ImportError as e:
+        print(f"[!] Interfaccia grafica non disponibile: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    print("Avvio modalità grafica...")
+    launch_gui()
+    return EXIT_OK
 
-    # Controlla gli argomenti della riga di comando
-    if len(sys.argv) == 2 and sys.argv[1] == '--gui':
-        # Avvia l'interfaccia grafica
-        print("Avvio modalità grafica...")
-        launch_gui()
-    elif len(sys.argv) == 2:
-        # Esegue la scansione CLI del file specificato
-        print("Esecuzione della modalità test senza GUI.")
-        main_cli(sys.argv[1])
-    else:
-        # Mostra le istruzioni d'uso
-        print("Uso: python3 main.py <percorso_file> oppure python3 main.py --gui")
+def _add_output_options(parser):
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, help="Formato del report (predefinito: dall'estensione di --output, altrimenti txt)")
+    parser.add_argument("--output", "-o", help="File di destinazione del report ('-' o assente: stdout)")
+    parser.add_argument("--exit-code-on-findings", action="store_true", help=f"Esce con codice {EXIT_FINDINGS} se ci sono risultati")
+
+def _add_pattern_options(parser):
+    parser.add_argument("--only", action="append", metavar="TIPO", help="Cerca solo questo tipo di dato (ripetibile, es. --only IBAN --only 'Carta di Credito')")
+    parser.add_argument("--patterns-config", metavar="FILE", help="File JSON con i pattern da attivare, disattivare o aggiungere")
+
+def build_parser():
+    """Costruisce il parser degli argomenti con i sottocomandi."""
+    parser = argparse.ArgumentParser(prog="privacywatcher", description="Cerca dati sensibili in file e directory.")
+    commands = parser.add_subparsers(dest="command", metavar="comando")
+
+    scan = commands.add_parser("scan", help="Scansiona file e directory")
+    scan.add_argument("paths", nargs="+", metavar="percorso", help="File o directory da scansionare")
+    scan.add_argument("--workers", "-w", type=int, default=1, help="Processi per le directory (0 = tutti i core)")
+    scan.add_argument("--io-workers", type=int, default=0, metavar="N",
+                      help="Operazioni di I/O contemporanee (pipeline asincrona per filesystem di rete; 0 = disattivata)")
+    scan.add_argument("--queue-size", type=int, default=32, metavar="N", help="File in attesa tra le fasi della pipeline asincrona")
+    _add_output_options(scan)
+    scan.add_argument("--save", action="store_true", help="Salva la scansione nel database")
+    scan.add_argument("--incremental", action="store_true", help="Riusa i risultati dei file invariati dall'ultima scansione")
+    scan.add_argument("--mmap", action="store_true", help="Scansiona i file mappati in memoria")
+    scan.add_argument("--max-size", type=_parse_size, metavar="DIM",
+                      help="Dimensione massima dei file scansionati, anche nelle directory (es. 50M; predefinito: nessun limite)")
+    scan.add_argument("--max-depth", type=int, help="Livelli di sottodirectory da attraversare")
+    scan.add_argument("--same-filesystem", action="store_true", help="Non attraversa altri filesystem montati")
+    scan.add_argument("--symlinks", choices=("skip", "files", "follow"), default="files", help="Politica per i collegamenti simbolici")
+    scan.add_argument("--checkpoint", action="store_true",
+                      help="Salva risultati e avanzamento nel database durante la scansione di una directory (vedi resume)")
+    scan.add_argument("--checkpoint-every", type=int, default=500, metavar="N", help="File elaborati tra due checkpoint")
+    _add_pattern_options(scan)
+    scan.set_defaults(handler=cmd_scan)
+
+    sweep = commands.add_parser("sweep", help="Scansiona una directory in ordine di rischio, entro un budget")
+    sweep.add_argument("directory", help="Directory da scansionare")
+    sweep.add_argument("--name", help="Nome dello sweep: registra i file scansionati con i loro risultati e riprende da lì alla prossima esecuzione")
+    sweep.add_argument("--max-time", type=_parse_duration, metavar="DURATA", help="Durata massima (es. 3600, 45m, 2h)")
+    sweep.add_argument("--max-bytes", type=_parse_size, metavar="DIM", help="Byte massimi dei file scansionati (es. 500M, 10G)")
+    sweep.add_argument("--max-files", type=int, metavar="N", help="Numero massimo di file scansionati")
+    sweep.add_argument("--no-history", action="store_true", help="Non usa i risultati salvati nel database per la priorità")
+    sweep.add_argument("--dry-run", action="store_true", help="Mostra i file nell'ordine in cui verrebbero scansionati")
+    sweep.add_argument("--workers", "-w", type=int, default=1, help="Processi per la scansione (0 = tutti i core)")
+    _add_output_options(sweep)
+    sweep.add_argument("--save", action="store_true", help="Salva la scansione nel database")
+    sweep.add_argument("--mmap", action="store_true", help="Scansiona i file mappati in memoria")
+    sweep.add_argument("--max-size", type=_parse_size, metavar="DIM",
+                       help="Dimensione massima dei file scansionati (es. 50M; predefinito: nessun limite)")
+    sweep.add_argument("--max-depth", type=int, help="Livelli di sottodirectory da attraversare")
+    sweep.add_argument("--same-filesystem", action="store_true", help="Non attraversa altri filesystem montati")
+    sweep.add_argument("--symlinks", choices=("skip", "files", "follow"), default="files", help="Politica per i collegamenti simbolici")
+    _add_pattern_options(sweep)
+    sweep.set_defaults(handler=cmd_sweep)
+
+    resume = commands.add_parser("resume", help="Riprende una scansione a checkpoint interrotta")
+    resume.add_argument("scan_id", type=int, help="Id della scansione (mostrato da scan --checkpoint)")
+    resume.add_argument("--checkpoint-every", type=int, default=500, metavar="N", help="File elaborati tra due checkpoint")
+    _add_output_options(resume)
+    resume.set_defaults(handler=cmd_resume, save=False)
+
+    report = commands.add_parser("report", help="Esporta una scansione salvata nel database")
+    report.add_argument("scan", help="Id o nome della scansione (vedi il comando history)")
+    _add_output_options(report)
+    report.set_defaults(handler=cmd_report)
+
+    history = commands.add_parser("history", help="Mostra lo storico delle scansioni salvate")
+    history.add_argument("--limit", type=int, default=20, help="Numero massimo di scansioni mostrate")
+    history.add_argument("--status", help="Filtra per stato (es. Completato, Esportato, Monitorato)")
+    history.add_argument("--search", help="Testo da cercare in nome, percorso, stato e data")
+    history.add_argument("--since", help="Data minima (YYYY-MM-DD)")
+    history.add_argument("--until", help="Data massima, inclusa (YYYY-MM-DD)")
+    history.set_defaults(handler=cmd_history)
+
+    watch = commands.add_parser("watch", help="Monitora directory e scansiona i file modificati")
+    watch.add_argument("paths", nargs="+", metavar="directory", help="Directory da monitorare")
+    watch.add_argument("--polling", action="store_true", help="Usa il polling invece di inotify")
+    watch.add_argument("--interval", type=float, default=2.0, help="Intervallo (s) del polling")
+    watch.add_argument("--debounce", type=float, default=1.0, help="Secondi senza modifiche prima di scansionare un file")
+    watch.add_argument("--no-save", action="store_true", help="Non salva i risultati nel database")
+    watch.add_argument("--max-depth", type=int, help="Livelli di sottodirectory da monitorare")
+    watch.add_argument("--same-filesystem", action="store_true", help="Non monitora altri filesystem montati")
+    watch.add_argument("--symlinks", choices=("skip", "files", "follow"), default="files", help="Politica per i collegamenti simbolici")
+    watch.set_defaults(handler=cmd_watch)
+
+    gui = commands.add_parser("gui", help="Avvia l'interfaccia grafica")
+    gui.set_defaults(handler=cmd_gui)
+    return parser
+
+def main(argv=None):
+    """
+    Funzione principale: interpreta la riga di comando ed esegue il sottocomando.
+
+    Per compatibilità "--gui" avvia l'interfaccia grafica e un percorso senza
+    sottocomando equivale a "scan <percorso>".
+
+    Returns:
+        int: Codice di uscita
+    """
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv == ["--gui"]:
+        argv = ["gui"]
+    elif argv and argv[0] not in COMMANDS and not argv[0].startswith("-"):
+        argv = ["scan"] + argv
+
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return EXIT_ERROR
+    try:
+        return args.handler(args)
+    except BrokenPipeError:
+        # Il lettore del report ha chiuso la pipe (es. "| head"): si esce senza traceback.
+        # Lo stdout punta a devnull, così lo svuotamento all'uscita non fallisce di nuovo
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return EXIT_OK
 
 # Punto di ingresso del programma
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
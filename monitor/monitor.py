@@ -1 +1,275 @@
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import datetime
 
+from scanner.scanner import scan_file
+from scanner.walker import WalkState, walk_files
+from db.database import salva_scansione, STATO_MONITORATO
+
+# Tempo (s) senza nuovi eventi dopo il quale un file modificato viene scansionato:
+# un file scritto a più riprese viene così scansionato una sola volta
+DEBOUNCE_SECONDS = 1.0
+
+# Intervallo (s) tra due istantanee nella modalità a polling
+POLL_INTERVAL = 2.0
+
+# Attesa massima (s) di ogni ciclo, per reagire in fretta alla richiesta di stop
+WAIT_INTERVAL = 0.5
+
+# Costanti inotify (da linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+# Eventi che indicano un file creato o modificato
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+# Intestazione di un evento inotify: wd, mask, cookie, lunghezza del nome
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Dimensione del buffer di lettura degli eventi
+_EVENT_BUFFER = 64 * 1024
+
+# Restituisce la radice monitorata che contiene il percorso
+def _radice_di(path, roots):
+    for root in roots:
+        if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+            return root
+    return None
+
+
+# Watcher basato su inotify (solo Linux), usato tramite ctypes senza dipendenze esterne.
+# Ogni directory attraversata dalla scansione ricorsiva (stesse regole di walk_files, file
+# .privacywatcherignore compresi) riceve un watch; le nuove directory vengono aggiunte
+# man mano che compaiono. walk_options sono le opzioni dell'attraversamento.
+class InotifyWatcher:
+    def __init__(self, roots, walk_options=None):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.walk_options = walk_options or {}
+        self._walks = {root: WalkState(root, **self.walk_options) for root in self.roots}
+
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._inotify_add_watch = libc.inotify_add_watch
+        self._inotify_add_watch.argtypes = (ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+        self._inotify_add_watch.restype = ctypes.c_int
+
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+        self._watches = {}  # Descrittore del watch -> directory osservata
+        for root in self.roots:
+            node = self._walks[root].root()
+            if node is not None:
+                self._watch_tree(node, root)
+
+    # Aggiunge il watch a una singola directory
+    def _watch_dir(self, directory):
+        wd = self._inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            print(f"[!] Impossibile monitorare {directory}: {os.strerror(err)}")
+            return
+        self._watches[wd] = directory
+
+    # Aggiunge i watch a una directory (come tupla di WalkState.read_directory) e alle
+    # sottodirectory che l'attraversamento non esclude. Restituisce i file già presenti:
+    # in una directory appena creata possono essere stati scritti prima che il watch fosse attivo.
+    def _watch_tree(self, node, root):
+        walk = self._walks[root]
+        files = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            self._watch_dir(node[0])
+            entries, subdirs = walk.read_directory(*node)
+            files.extend(entry.path for entry in entries if walk.stat_file(entry) is not None)
+            stack.extend(subdirs)
+        return files
+
+    # Attende gli eventi per al massimo timeout secondi e restituisce i file cambiati
+    def read(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+
+        changed = []
+        candidates = set()  # File con eventi, filtrati alla fine con le regole dell'attraversamento
+        while True:
+            try:
+                buffer = os.read(self.fd, _EVENT_BUFFER)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(buffer[offset:offset + length].rstrip(b"\0"))
+                offset += length
+
+                # Coda del kernel piena: alcuni eventi sono persi, si riparte dai file presenti
+                if mask & IN_Q_OVERFLOW:
+                    for root in self.roots:
+                        changed.extend(path for path, _ in walk_files(root, **self.walk_options))
+                    continue
+
+                # Directory rimossa: il kernel ha già eliminato il watch
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+
+                directory = self._watches.get(wd)
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, name)
+                root = _radice_di(path, self.roots)
+
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        node = self._walks[root].locate(path)
+                        if node is not None:
+                            changed.extend(self._watch_tree(node, root))
+                    continue
+
+                candidates.add((path, root))
+
+        # Un file conta se la scansione ricorsiva lo includerebbe: le regole sono rilette a ogni
+        # controllo, così una modifica ai file di esclusione vale subito
+        changed.extend(path for path, root in candidates if self._walks[root].stat_path(path) is not None)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+# Watcher a polling: confronta istantanee (dimensione, mtime, inode) dei file.
+# Funziona ovunque, anche nei container o sui filesystem dove inotify non è disponibile.
+# walk_options sono le opzioni dell'attraversamento (vedi walk_files).
+class PollingWatcher:
+    def __init__(self, roots, interval=POLL_INTERVAL, walk_options=None):
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.interval = interval
+        self.walk_options = walk_options or {}
+        self.snapshot = self._istantanea()
+        self._next_poll = time.monotonic() + interval
+
+    # Metadati di tutti i file sotto le radici monitorate, dalla stat già fatta da walk_files
+    def _istantanea(self):
+        snapshot = {}
+        for root in self.roots:
+            for path, st in walk_files(root, **self.walk_options):
+                snapshot[path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return snapshot
+
+    # Attende per al massimo timeout secondi e, se è ora di un nuovo controllo,
+    # restituisce i file nuovi o modificati rispetto all'istantanea precedente
+    def read(self, timeout):
+        wait = min(timeout, max(self._next_poll - time.monotonic(), 0))
+        if wait > 0:
+            time.sleep(wait)
+        if time.monotonic() < self._next_poll:
+            return []
+
+        snapshot = self._istantanea()
+        changed = [path for path, meta in snapshot.items() if self.snapshot.get(path) != meta]
+        self.snapshot = snapshot
+        self._next_poll = time.monotonic() + self.interval
+        return changed
+
+    def close(self):
+        pass
+
+
+# Crea il watcher migliore disponibile: inotify su Linux, altrimenti polling.
+# I due watcher osservano gli stessi file, quelli della scansione ricorsiva con walk_options.
+def crea_watcher(roots, polling=False, interval=POLL_INTERVAL, walk_options=None):
+    if not polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots, walk_options)
+        except (OSError, AttributeError) as e:
+            print(f"[!] inotify non disponibile ({e}), uso il polling.")
+    return PollingWatcher(roots, interval, walk_options)
+
+# Scansiona i file cambiati e salva i risultati nel database, una scansione per radice
+def scansiona_modificati(paths, roots, save=True):
+    results_by_root = {}
+    for path in paths:
+        if not os.path.isfile(path):
+            continue  # Rimosso o rinominato prima della scansione
+        file_results = scan_file(path)
+        if file_results:
+            print(f"[FOUND] {len(file_results)} risultati in {path}")
+            results_by_root.setdefault(_radice_di(path, roots), []).extend(file_results)
+
+    if save:
+        for root, results in results_by_root.items():
+            timestamp = datetime.datetime.now().strftime("%Y.%m.%d-%H.%M.%S")
+            salva_scansione(root, results, f"Monitor_{timestamp}.txt", STATO_MONITORATO)
+
+    return [result for results in results_by_root.values() for result in results]
+
+# Monitora le radici indicate e scansiona solo i file creati o modificati.
+# Gli eventi sullo stesso file vengono accorpati: il file viene scansionato quando
+# non riceve eventi da almeno debounce secondi. Il ciclo termina quando stop_event
+# (es. threading.Event) viene impostato o con Ctrl+C; on_results, se indicato,
+# riceve i risultati di ogni gruppo di file scansionati. walk_options sono le opzioni
+# dell'attraversamento (vedi walk_files) che scelgono i file monitorati.
+def watch(roots, debounce=DEBOUNCE_SECONDS, polling=False, interval=POLL_INTERVAL, stop_event=None, on_results=None, save=True,
+          walk_options=None):
+    roots = [os.path.abspath(root) for root in roots]
+    for root in roots:
+        if not os.path.isdir(root):
+            raise NotADirectoryError(f"Il percorso da monitorare non è una directory: {root}")
+
+    watcher = crea_watcher(roots, polling, interval, walk_options)
+    print(f"[INFO] Monitoraggio ({type(watcher).__name__}) di: {', '.join(roots)}")
+
+    pending = {}  # File cambiato -> istante dell'ultimo evento
+    try:
+        while stop_event is None or not stop_event.is_set():
+            timeout = min(debounce, WAIT_INTERVAL) if pending else WAIT_INTERVAL
+            changed = watcher.read(timeout)
+            now = time.monotonic()
+            for path in changed:
+                pending[path] = now
+
+            # File senza eventi da almeno debounce secondi
+            ready = [path for path, last_event in pending.items() if now - last_event >= debounce]
+            if not ready:
+                continue
+            for path in ready:
+                del pending[path]
+
+            results = scansiona_modificati(ready, roots, save)
+            if on_results is not None:
+                on_results(ready, results)
+    except KeyboardInterrupt:
+        print("\n[INFO] Monitoraggio interrotto.")
+    finally:
+        watcher.close()
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Uso: python3 -m monitor.monitor [--polling] <directory> [<directory> ...]")
+        sys.exit(1)
+
+    args = sys.argv[1:]
+    use_polling = "--polling" in args
+    watch([arg for arg in args if arg != "--polling"], polling=use_polling)
@@ -1,20 +1,40 @@
 import os
+import csv
+import json
 import datetime
+from urllib.parse import quote
 
-def generate_txt_report(results: dict, scan_path: str, filename: str):
+# Cartella predefinita dei report, relativa alla directory di lavoro
+# (non la cartella del pacchetto "report", che contiene il codice)
+DEFAULT_OUTPUT_DIR = "reports"
+
+# Formati supportati dal writer in streaming, riconosciuti anche dall'estensione del file
+FORMATS = ("txt", "jsonl", "csv", "sarif")
+
+# Dimensione del buffer di scrittura dei report
+BUFFER_SIZE = 1024 * 1024
+
+# Versione e schema SARIF prodotti
+SARIF_VERSION = "2.1.0"
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+def _percorso_report(filename, output_dir):
+    """Percorso completo del report, creando la cartella di destinazione se serve."""
+    filepath = os.path.join(output_dir if output_dir is not None else DEFAULT_OUTPUT_DIR, filename)
+    os.makedirs(os.path.dirname(filepath) or ".", exist_ok=True)
+    return filepath
+
+def generate_txt_report(results: dict, scan_path: str, filename: str, output_dir: str = None):
     """
     Genera un report in formato .txt contenente i risultati della scansione.
     results: dizionario con dati sensibili trovati
     scan_path: percorso scansionato
-    filename: nome file di output del report (senza path)
+    filename: nome file di output del report
+    output_dir: cartella di destinazione (predefinita: DEFAULT_OUTPUT_DIR)
     """
 
-    # Definisce la directory in cui salvare il report: una cartella "report" nella directory corrente
-    report_dir = os.path.join(os.getcwd(), "report")
-    # Costruisce il percorso completo del file di report, dentro la cartella "report"
-    filepath = os.path.join("report", filename)
-    # Crea la cartella "report" se non esiste già, per evitare errori nel salvataggio
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    # Costruisce il percorso completo del file di report e crea la cartella se non esiste già
+    filepath = _percorso_report(filename, output_dir)
 
     # Apre (o crea) il file di testo per scrivere il report, con codifica UTF-8
     with open(filepath, 'w', encoding='utf-8') as f:
@@ -48,3 +68,237 @@ def generate_txt_report(results: dict, scan_path: str, filename: str):
 
     # Stampa a console un messaggio informativo con il percorso del file salvato
     print(f"[INFO] Report salvato nel file: {filepath}")
+    return filepath
+
+
+class ReportWriter:
+    """
+    Writer di report in streaming: riceve i risultati uno alla volta e li scrive
+    subito nel file, con I/O bufferizzato, senza tenerli in memoria. I totali per
+    tipo di dato vengono aggiornati man mano e il riepilogo è scritto alla chiusura.
+    Le sottoclassi implementano l'intestazione, il singolo risultato e la chiusura.
+
+    Args:
+        filepath (str): File di destinazione
+        scan_path (str): Percorso scansionato, riportato nel report
+        stream: Flusso di testo già aperto (es. sys.stdout) su cui scrivere al posto di
+            filepath; alla chiusura viene svuotato ma non chiuso
+    """
+
+    format = None
+
+    def __init__(self, filepath, scan_path="", stream=None):
+        self.filepath = filepath
+        self.scan_path = scan_path
+        self.started = datetime.datetime.now()
+        self.totals = {}  # Tipo di dato -> occorrenze scritte
+        self.count = 0
+        self._owns_file = stream is None
+        self._file = open(filepath, "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE) if stream is None else stream
+        self._closed = False
+        self._write_header()
+
+    def write(self, finding):
+        """Scrive un risultato (dizionario o vista con file, line, content, data_type, match)."""
+        data_type = finding["data_type"]
+        self.totals[data_type] = self.totals.get(data_type, 0) + 1
+        self.count += 1
+        self._write_finding(finding)
+
+    def write_all(self, findings):
+        """Scrive tutti i risultati di un iterabile (anche un generatore) e restituisce il totale."""
+        for finding in findings:
+            self.write(finding)
+        return self.count
+
+    def close(self):
+        """Scrive il riepilogo e chiude il file (più chiamate non hanno effetto)."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._write_footer()
+        finally:
+            if self._owns_file:
+                self._file.close()
+            else:
+                self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _write_header(self):
+        pass
+
+    def _write_finding(self, finding):
+        raise NotImplementedError
+
+    def _write_footer(self):
+        pass
+
+
+class TxtReportWriter(ReportWriter):
+    """Report testuale: i risultati nell'ordine in cui arrivano, poi i totali per tipo."""
+
+    format = "txt"
+
+    def _write_header(self):
+        self._file.write(
+            "Report di scansione PrivacyWatcher\n"
+            f"Data e ora: {self.started.strftime('%Y-%m-%d %H:%M:%S')}\n"
+            f"Percorso scansionato: {self.scan_path}\n"
+            + "=" * 50 + "\n\n"
+        )
+
+    def _write_finding(self, finding):
+        self._file.write(
+            f"File: {finding['file']}\n"
+            f"Riga: {finding['line']}\n"
+            f"Tipo: {finding['data_type']}\n"
+            f"Valore trovato: {finding['match']}\n\n"
+        )
+
+    def _write_footer(self):
+        lines = ["-" * 50 + "\n"]
+        for data_type, count in self.totals.items():
+            lines.append(f"{data_type} - Totale occorrenze: {count}\n")
+        lines.append(f"\nTotale occorrenze trovate: {self.count}\n")
+        if self.count == 0:
+            lines.append("Nessun dato sensibile rilevato.\n")
+        self._file.write("".join(lines))
+
+
+class JsonlReportWriter(ReportWriter):
+    """JSON Lines: un oggetto per risultato e, come ultima riga, l'oggetto "summary"."""
+
+    format = "jsonl"
+
+    def _write_finding(self, finding):
+        self._file.write(json.dumps({
+            "file": finding["file"],
+            "line": finding["line"],
+            "content": finding["content"],
+            "data_type": finding["data_type"],
+            "match": finding["match"],
+        }, ensure_ascii=False) + "\n")
+
+    def _write_footer(self):
+        self._file.write(json.dumps({"summary": {
+            "scan_path": self.scan_path,
+            "timestamp": self.started.strftime("%Y-%m-%d %H:%M:%S"),
+            "total": self.count,
+            "totals": self.totals,
+        }}, ensure_ascii=False) + "\n")
+
+
+class CsvReportWriter(ReportWriter):
+    """CSV con intestazione; i totali restano in ``totals`` per non mescolare righe diverse."""
+
+    format = "csv"
+
+    def _write_header(self):
+        self._csv = csv.writer(self._file)
+        self._csv.writerow(("file", "line", "data_type", "match", "content"))
+
+    def _write_finding(self, finding):
+        self._csv.writerow((finding["file"], finding["line"], finding["data_type"], finding["match"], finding["content"]))
+
+
+class SarifReportWriter(ReportWriter):
+    """
+    SARIF 2.1.0, leggibile dagli strumenti di code scanning. I risultati vengono
+    scritti man mano nell'array "results"; le regole (una per tipo di dato trovato)
+    e i totali, noti solo alla fine, seguono l'array nello stesso oggetto "run".
+    """
+
+    format = "sarif"
+
+    def _write_header(self):
+        self._file.write(
+            '{"version": ' + json.dumps(SARIF_VERSION)
+            + ', "$schema": ' + json.dumps(SARIF_SCHEMA)
+            + ', "runs": [{"results": ['
+        )
+
+    @staticmethod
+    def _uri(path):
+        # URI del file: assoluto come file://, relativo con separatori '/'
+        if os.path.isabs(path):
+            return "file://" + quote(os.path.abspath(path).replace(os.sep, "/"))
+        return quote(path.replace(os.sep, "/"))
+
+    def _write_finding(self, finding):
+        result = {
+            "ruleId": finding["data_type"],
+            "level": "warning",
+            "message": {"text": f"{finding['data_type']}: {finding['match']}"},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": self._uri(finding["file"])},
+                    "region": {"startLine": finding["line"], "snippet": {"text": finding["content"]}},
+                },
+            }],
+        }
+        self._file.write(("\n" if self.count == 1 else ",\n") + json.dumps(result, ensure_ascii=False))
+
+    def _write_footer(self):
+        driver = {
+            "name": "PrivacyWatcher",
+            "informationUri": "https://github.com/Enigma9666/PrivacyWatcher",
+            "rules": [
+                {"id": data_type, "name": data_type, "shortDescription": {"text": f"Dato sensibile: {data_type}"}}
+                for data_type in self.totals
+            ],
+        }
+        properties = {"scanPath": self.scan_path, "total": self.count, "totals": self.totals}
+        self._file.write(
+            "\n], " + '"tool": ' + json.dumps({"driver": driver}, ensure_ascii=False)
+            + ', "properties": ' + json.dumps(properties, ensure_ascii=False) + "}]}\n"
+        )
+
+
+# Writer per formato
+WRITERS = {
+    "txt": TxtReportWriter,
+    "jsonl": JsonlReportWriter,
+    "csv": CsvReportWriter,
+    "sarif": SarifReportWriter,
+}
+
+def format_from_filename(filename, default="txt"):
+    """Formato del report dedotto dall'estensione del file (default se non riconosciuta)."""
+    extension = os.path.splitext(filename)[1].lower().lstrip(".")
+    if extension in ("json", "ndjson"):
+        extension = "jsonl"
+    return extension if extension in WRITERS else default
+
+def open_report(filename, scan_path="", format=None, output_dir=None):
+    """
+    Apre un writer di report in streaming.
+    filename: nome del file di report (relativo a output_dir)
+    scan_path: percorso scansionato
+    format: uno di FORMATS (se None, dedotto dall'estensione di filename)
+    output_dir: cartella di destinazione (predefinita: DEFAULT_OUTPUT_DIR)
+    """
+    format = format or format_from_filename(filename)
+    if format not in WRITERS:
+        raise ValueError(f"Formato di report non supportato: {format} (ammessi: {', '.join(FORMATS)})")
+    return WRITERS[format](_percorso_report(filename, output_dir), scan_path)
+
+def write_report(findings, scan_path, filename, format=None, output_dir=None):
+    """
+    Scrive in streaming un report con i risultati di un iterabile e restituisce il writer
+    (con filepath, count e totals per tipo di dato).
+    findings: risultati della scansione (lista, ResultStore o generatore)
+    scan_path: percorso scansionato
+    filename: nome file di output del report
+    format: uno di FORMATS (se None, dedotto dall'estensione di filename)
+    output_dir: cartella di destinazione (predefinita: DEFAULT_OUTPUT_DIR)
+    """
+    with open_report(filename, scan_path, format, output_dir) as writer:
+        writer.write_all(findings)
+    print(f"[INFO] Report salvato nel file: {writer.filepath}")
+    return writer
@@ -0,0 +1,245 @@
+import io
+import os
+import bz2
+import contextlib
+import gzip
+import lzma
+import zlib
+import tarfile
+import zipfile
+from scanner.sniffer import sniff_bytes, SNIFF_SIZE, TEXT
+
+# Separatore tra il percorso di un archivio e quello di un suo membro (es. "log.zip!app/server.log")
+ARCHIVE_SEPARATOR = "!"
+
+# Limite dei dati decompressi letti da un archivio (contro le zip bomb): superato il
+# limite la scansione dell'archivio si interrompe, conservando i risultati già trovati
+MAX_DECOMPRESSED_SIZE = 512 * 1024 * 1024
+
+# Numero massimo di membri di un archivio (zip e tar) esaminati
+MAX_ARCHIVE_MEMBERS = 10000
+
+# Livelli massimi di archivi annidati (es. .tar.gz = 2, un .gz dentro un .zip = 2)
+MAX_ARCHIVE_DEPTH = 4
+
+# Dimensione del buffer tra decompressore e decodifica del testo
+ARCHIVE_BUFFER_SIZE = 256 * 1024
+
+# Decompressori in streaming della libreria standard, per tipo riconosciuto dallo sniffer
+COMPRESSED_FORMATS = {
+    "gzip": lambda f: gzip.GzipFile(fileobj=f, mode="rb"),
+    "bzip2": lambda f: bz2.BZ2File(f, mode="rb"),
+    "xz": lambda f: lzma.LZMAFile(f, mode="rb"),
+}
+
+# Estensioni tolte dal nome di un file compresso per ottenere quello del contenuto
+_COMPRESSED_EXTENSIONS = {".gz": "", ".bz2": "", ".xz": "", ".tgz": ".tar", ".tbz2": ".tar", ".txz": ".tar"}
+
+# Tipi (verdetti dello sniffer) aperti come archivi invece di essere saltati come binari
+ARCHIVE_FORMATS = frozenset(COMPRESSED_FORMATS) | {"zip", "tar"}
+
+# Errori dei formati compressi e degli archivi danneggiati o troncati
+ARCHIVE_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError, tarfile.TarError, zipfile.BadZipFile, RuntimeError)
+
+
+class ArchiveLimitError(Exception):
+    """Superato il limite di dati decompressi o di membri di un archivio."""
+
+
+class _Budget:
+    """Dati decompressi e membri ancora ammessi per un archivio (annidati compresi)."""
+
+    def __init__(self, max_size, max_members):
+        self.bytes = max_size
+        self.members = max_members
+
+    def consume(self, n):
+        self.bytes -= n
+        if self.bytes < 0:
+            raise ArchiveLimitError("superato il limite di dati decompressi")
+
+    def member(self):
+        self.members -= 1
+        if self.members < 0:
+            raise ArchiveLimitError("superato il numero massimo di membri")
+
+
+class _CountingStream(io.RawIOBase):
+    """Flusso in lettura che scala dal budget i byte prodotti da un decompressore."""
+
+    def __init__(self, stream, budget):
+        self._stream = stream
+        self._budget = budget
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        data = self._stream.read(len(b))
+        n = len(data)
+        self._budget.consume(n)
+        b[:n] = data
+        return n
+
+    # Riposizionabile se lo è il flusso sottostante (membri di zip, per gli zip annidati)
+    def seekable(self):
+        return _seekable(self._stream)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        return self._stream.seek(offset, whence)
+
+    def tell(self):
+        return self._stream.tell()
+
+
+class _HeadStream(io.RawIOBase):
+    """Flusso che restituisce prima i byte già letti per il riconoscimento, poi il resto."""
+
+    def __init__(self, head, stream):
+        self._head = memoryview(head)
+        self._stream = stream
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        if self._head:
+            n = min(len(b), len(self._head))
+            b[:n] = self._head[:n]
+            self._head = self._head[n:]
+            return n
+        data = self._stream.read(len(b))
+        n = len(data)
+        b[:n] = data
+        return n
+
+
+def _seekable(stream):
+    # Alcuni flussi (es. i membri di un tar letto in streaming) non sanno rispondere
+    try:
+        return stream.seekable()
+    except (AttributeError, OSError, ValueError):
+        return False
+
+def _read_head(stream):
+    # Primi SNIFF_SIZE byte del flusso (read può restituirne meno del richiesto)
+    parts = []
+    size = 0
+    while size < SNIFF_SIZE:
+        data = stream.read(SNIFF_SIZE - size)
+        if not data:
+            break
+        parts.append(data)
+        size += len(data)
+    return b"".join(parts)
+
+def _content_name(path):
+    # Nome del contenuto di un file compresso: "app.log.gz" -> "app.log", "dati.tgz" -> "dati.tar"
+    name = os.path.basename(path.rsplit(ARCHIVE_SEPARATOR, 1)[-1])
+    root, ext = os.path.splitext(name)
+    if ext.lower() in _COMPRESSED_EXTENSIONS:
+        return root + _COMPRESSED_EXTENSIONS[ext.lower()]
+    return name
+
+def _scan_stream(stream, container, name, scan_text, budget, depth):
+    # Riconosce il contenuto di un flusso dai primi KB e lo scansiona: testo, file compresso
+    # o archivio (annidato). container è il percorso dell'archivio che lo contiene, name il
+    # nome del membro (None per il contenuto di un file compresso, che prende il nome del file).
+    here = container + ARCHIVE_SEPARATOR + name if name else container
+    head = _read_head(stream)
+    kind = sniff_bytes(head, truncated=len(head) == SNIFF_SIZE)
+
+    if kind == TEXT:
+        display_path = here if name else here + ARCHIVE_SEPARATOR + _content_name(here)
+        raw = io.BufferedReader(_HeadStream(head, stream), ARCHIVE_BUFFER_SIZE)
+        with io.TextIOWrapper(raw, encoding="utf-8", errors="ignore") as f:
+            yield from scan_text(f, display_path)
+        return
+
+    if kind not in ARCHIVE_FORMATS:
+        return  # Membro binario: saltato come i file binari sul disco
+    if depth > MAX_ARCHIVE_DEPTH:
+        print(f"[!] {here}: troppi livelli di archivi annidati. Saltato.")
+        return
+
+    if kind == "zip":
+        # Lo zip richiede accesso casuale: solo su flussi riposizionabili (file su disco o membri di zip)
+        if not _seekable(stream):
+            print(f"[!] {here}: archivio zip non leggibile in streaming. Saltato.")
+            return
+        stream.seek(0)
+        yield from _scan_zip(stream, here, scan_text, budget, depth)
+        return
+
+    raw = io.BufferedReader(_HeadStream(head, stream), ARCHIVE_BUFFER_SIZE)
+    if kind == "tar":
+        yield from _scan_tar(raw, here, scan_text, budget, depth)
+        return
+
+    # File compresso: il contenuto decompresso viene conteggiato nel budget dell'archivio
+    with COMPRESSED_FORMATS[kind](raw) as decompressed:
+        yield from _scan_stream(_CountingStream(decompressed, budget), here, None, scan_text, budget, depth + 1)
+
+def _scan_zip(fileobj, here, scan_text, budget, depth):
+    # Membri di uno zip, decompressi uno alla volta senza estrarli su disco
+    with zipfile.ZipFile(fileobj) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            budget.member()
+            try:
+                member = zf.open(info)
+            except RuntimeError as e:
+                print(f"[!] {here}{ARCHIVE_SEPARATOR}{info.filename}: {e}. Saltato.")  # Membro cifrato
+                continue
+            with member:
+                yield from _scan_stream(_CountingStream(member, budget), here, info.filename, scan_text, budget, depth + 1)
+
+def _scan_tar(fileobj, here, scan_text, budget, depth):
+    # Membri di un tar letti in sequenza (modalità stream "r|"), anche se il tar è compresso
+    with tarfile.open(fileobj=fileobj, mode="r|") as tar:
+        for member in tar:
+            if not member.isfile():
+                continue
+            budget.member()
+            with tar.extractfile(member) as stream:
+                yield from _scan_stream(stream, here, member.name, scan_text, budget, depth + 1)
+
+def iter_scan_archive(file_path, kind, scan_text, max_size=MAX_DECOMPRESSED_SIZE, fileobj=None):
+    """
+    Scansiona un file compresso (gzip, bzip2, xz) o un archivio (zip, tar, anche compresso)
+    in streaming, senza estrarlo su disco e con memoria costante.
+
+    Il limite dei dati decompressi protegge dalle zip bomb ma non limita la memoria: questa
+    dipende da scan_text, che legge il membro a blocchi e divide in finestre le righe lunghe
+    (vedi scanner.iter_lines), anche quando il membro è una sola riga senza a capo.
+
+    Ogni membro di testo viene passato a scan_text come file di testo; i risultati riportano
+    percorsi nella forma "archivio.zip!cartella/file.log" (per un file compresso
+    "app.log.gz!app.log"). I membri binari vengono saltati.
+
+    Args:
+        file_path (str): Percorso dell'archivio
+        kind (str): Tipo riconosciuto dallo sniffer (uno di ARCHIVE_FORMATS)
+        scan_text (callable): Funzione (file di testo, percorso da riportare) -> risultati
+        max_size (int): Limite dei dati decompressi (None = MAX_DECOMPRESSED_SIZE)
+        fileobj: Contenuto dell'archivio già aperto in lettura binaria (es. io.BytesIO con
+            il file letto in memoria); se None viene aperto file_path
+
+    Returns:
+        generator: Risultati prodotti da scan_text per ogni membro di testo
+    """
+    budget = _Budget(max_size if max_size is not None else MAX_DECOMPRESSED_SIZE, MAX_ARCHIVE_MEMBERS)
+    try:
+        with (open(file_path, "rb") if fileobj is None else contextlib.nullcontext(fileobj)) as f:
+            if kind == "zip":
+                yield from _scan_zip(f, file_path, scan_text, budget, 1)
+            elif kind == "tar":
+                yield from _scan_tar(f, file_path, scan_text, budget, 1)
+            else:
+                with COMPRESSED_FORMATS[kind](f) as decompressed:
+                    yield from _scan_stream(_CountingStream(decompressed, budget), file_path, None, scan_text, budget, 2)
+    except ArchiveLimitError as e:
+        print(f"[!] {file_path}: {e}. Scansione dell'archivio interrotta.")
+    except ARCHIVE_ERRORS as e:
+        print(f"[!] Errore nella lettura dell'archivio {file_path}: {e}")
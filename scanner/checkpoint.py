@@ -0,0 +1,86 @@
+import os
+import time
+from scanner.scanner import iter_scan_directory, DEFAULT_CHUNKSIZE
+from db.database import (inizia_scansione, salva_checkpoint, aggiorna_stato_scansione, recupera_file_elaborati,
+                         STATO_IN_CORSO, STATO_COMPLETATO, STATO_INTERROTTO)
+
+# Un checkpoint viene scritto nel database quando si raggiunge il primo di questi limiti:
+# file elaborati, risultati accumulati o secondi trascorsi dall'ultimo checkpoint.
+# La memoria usata dalla scansione dipende da questi limiti, non dal totale dei risultati.
+CHECKPOINT_FILES = 500
+CHECKPOINT_FINDINGS = 10000
+CHECKPOINT_SECONDS = 30.0
+
+
+def start_scan(directory, report_name, options=None):
+    """
+    Registra nel database una nuova scansione a checkpoint e ne restituisce l'id.
+
+    Args:
+        directory (str): Directory da scansionare (salvata come percorso assoluto)
+        report_name (str): Nome del report nello storico
+        options (dict): Opzioni da riusare per riprendere la scansione (salvate come JSON)
+
+    Returns:
+        int: Id della scansione, da passare a iter_scan_checkpointed
+    """
+    return inizia_scansione(os.path.abspath(directory), report_name, options)
+
+def iter_scan_checkpointed(scan_id, directory, workers=1, chunksize=DEFAULT_CHUNKSIZE, stats=None, incremental=False,
+                           use_mmap=False, walk_options=None, registry=None, checkpoint_files=CHECKPOINT_FILES,
+                           checkpoint_findings=CHECKPOINT_FINDINGS, checkpoint_seconds=CHECKPOINT_SECONDS, max_size=None):
+    """
+    Scansiona una directory come iter_scan_directory salvando periodicamente nel database
+    i file elaborati e i loro risultati, in transazioni che li tengono sempre allineati.
+
+    Se la scansione (scan_id) ha già dei file elaborati, viene ripresa: quei file sono
+    saltati. Durante la scansione lo stato è STATO_IN_CORSO; alla fine diventa
+    STATO_COMPLETATO, o STATO_INTERROTTO se il generatore viene chiuso prima (annullamento,
+    errore, Ctrl+C). Se il processo viene ucciso lo stato resta STATO_IN_CORSO: anche in
+    quel caso la scansione può essere ripresa dall'ultimo checkpoint.
+
+    Args:
+        scan_id (int): Id della scansione (vedi start_scan)
+        directory (str): Directory da scansionare (la stessa passata a start_scan)
+        workers, chunksize, incremental, use_mmap, walk_options, registry, max_size: come iter_scan_directory
+        stats (dict): Contatori di iter_scan_directory più 'checkpoints' (scritture nel database,
+            compresa l'ultima con i file rimasti in sospeso)
+        checkpoint_files (int): File elaborati tra due checkpoint
+        checkpoint_findings (int): Risultati accumulati che anticipano il checkpoint
+        checkpoint_seconds (float): Secondi massimi tra due checkpoint
+
+    Returns:
+        generator: Tuple (percorso assoluto, lista dei risultati) per ogni file non ancora elaborato
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('checkpoints', 0)
+    # Percorsi assoluti: la scansione può essere ripresa da un'altra directory di lavoro
+    directory = os.path.abspath(directory)
+    done = recupera_file_elaborati(scan_id)
+    aggiorna_stato_scansione(scan_id, STATO_IN_CORSO)
+
+    files = []     # File elaborati dall'ultimo checkpoint
+    findings = []  # Loro risultati
+    last_checkpoint = time.monotonic()
+    completed = False
+    scan = iter_scan_directory(directory, workers, chunksize, stats, incremental, use_mmap, walk_options, registry, skip_paths=done,
+                               max_size=max_size)
+    try:
+        for full_path, file_results in scan:
+            files.append(full_path)
+            findings.extend(file_results)
+            if (len(files) >= checkpoint_files or len(findings) >= checkpoint_findings
+                    or time.monotonic() - last_checkpoint >= checkpoint_seconds):
+                salva_checkpoint(scan_id, files, findings)
+                stats['checkpoints'] += 1
+                files, findings = [], []
+                last_checkpoint = time.monotonic()
+            yield full_path, file_results
+        completed = True
+    finally:
+        scan.close()  # Termina il pool di processi prima dell'ultimo checkpoint
+        if files:
+            salva_checkpoint(scan_id, files, findings)
+            stats['checkpoints'] += 1
+        aggiorna_stato_scansione(scan_id, STATO_COMPLETATO if completed else STATO_INTERROTTO)
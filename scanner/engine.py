@@ -0,0 +1,324 @@
+import re
+from utils.patterns import valore_findall
+
+# Caratteri non ASCII che, con re.IGNORECASE, corrispondono a lettere ASCII ma che
+# str.lower() non porta nella lettera ASCII equivalente: per le righe che li contengono
+# si usa la regex case-insensitive invece della riga convertita in minuscolo
+_CARATTERI_SPECIALI = ("\u0130", "\u0131", "\u017f", "\u212a")  # İ, ı, ſ e il simbolo del kelvin
+
+# Separatori ammessi tra gruppi di cifre (come in "4111 1111-1111 1111")
+_SEPARATORI = re.compile(r"[\s\-]")
+_SEPARATORI_BYTES = re.compile(rb"[\s\-]")
+
+
+def _regex_trie(parole):
+    """
+    Costruisce una regex ad albero (trie) che riconosce le parole indicate.
+
+    A parità di posizione iniziale viene preferita la parola più lunga, e i rami
+    con prefisso comune vengono provati una sola volta.
+
+    Args:
+        parole (iterable): Parole chiave in minuscolo
+
+    Returns:
+        str: Sorgente della regex
+    """
+    radice = {}
+    for parola in parole:
+        nodo = radice
+        for carattere in parola:
+            nodo = nodo.setdefault(carattere, {})
+        nodo[""] = True
+
+    def costruisci(nodo):
+        alternative = [re.escape(c) + costruisci(figlio) for c, figlio in sorted(nodo.items()) if c]
+        if not alternative:
+            return ""
+        corpo = alternative[0] if len(alternative) == 1 else "(?:" + "|".join(alternative) + ")"
+        # Se la parola può terminare qui, il resto del ramo è opzionale (greedy)
+        return "(?:" + corpo + ")?" if "" in nodo else corpo
+
+    return costruisci(radice)
+
+
+class MatchEngine:
+    """
+    Motore di ricerca compilato una sola volta a partire dal dizionario dei pattern.
+
+    Invece di eseguire tutti i pattern su ogni riga, il motore scorre la riga una
+    sola volta con un'unica regex a gruppi nominati che raccoglie gli inneschi
+    (blocchi di cifre, '@', parole chiave) e lancia ``findall`` solo per le
+    etichette i cui requisiti sono soddisfatti. I requisiti sono condizioni
+    necessarie, quindi il risultato è identico a quello del ciclo su tutti i pattern.
+    Con ``chunk_may_match`` lo stesso controllo può scartare in una sola ricerca
+    interi blocchi di righe.
+
+    Con ``binario=True`` il motore lavora su testo ``bytes`` e i pattern devono
+    essere le loro versioni per bytes (vedi utils.patterns.versione_bytes). Sui
+    byte le regex seguono le regole ASCII: il motore va usato solo su testo ASCII
+    senza i separatori \\x1c-\\x1f, per il quale il risultato è lo stesso.
+
+    Args:
+        patterns (dict): Etichetta -> regex compilata
+        requisiti (dict): Etichetta -> condizioni necessarie (vedi utils.patterns)
+        binario (bool): True se il testo da analizzare è bytes
+    """
+
+    def __init__(self, patterns, requisiti=None, binario=False):
+        requisiti = requisiti or {}
+        self.patterns = dict(patterns)
+
+        # Sorgenti delle regex e letterali cercati nel testo, convertiti in bytes se serve
+        converti = (lambda t: t.encode("utf-8")) if binario else (lambda t: t)
+        self._chiocciola = converti("@")
+        self._cifre = tuple(converti(c) for c in "0123456789")
+        self._speciali = tuple(converti(c) for c in _CARATTERI_SPECIALI)
+        self._separatori = _SEPARATORI_BYTES if binario else _SEPARATORI
+
+        # Indice parola chiave -> etichette che la richiedono, e testo che deve
+        # seguire la parola chiave per ciascuna etichetta (None = nessun vincolo)
+        etichette_per_parola = {}
+        seguito = {}
+        for label, req in requisiti.items():
+            for parola in req.get("parole", ()):
+                etichette_per_parola.setdefault(parola.lower(), set()).add(label)
+            dopo = req.get("dopo")
+            seguito[label] = re.compile(converti(dopo), re.IGNORECASE) if dopo else None
+
+        # Il trie riporta la parola più lunga che inizia in una posizione: le si
+        # associano anche le parole che ne sono prefisso, ognuna con la sua lunghezza
+        # per controllare il testo che la segue. Le parole le cui etichette non hanno
+        # vincoli sul seguito vanno in una tabella a parte, controllata senza regex.
+        self._etichette_parola = {}
+        self._seguiti_parola = {}
+        for parola in etichette_per_parola:
+            libere = set()
+            vincolate = []
+            for altra, labels in etichette_per_parola.items():
+                if parola.startswith(altra):
+                    for label in labels:
+                        if seguito[label] is None:
+                            libere.add(label)
+                        else:
+                            vincolate.append((len(altra), label, seguito[label].match))
+            self._etichette_parola[converti(parola)] = frozenset(libere)
+            self._seguiti_parola[converti(parola)] = tuple(vincolate)
+        self._tutte_da_parole = frozenset().union(*etichette_per_parola.values())
+
+        # Un blocco di cifre (separato da spazi o trattini, eventualmente seguito da
+        # un punto come in un indirizzo IP), la chiocciola o una parola chiave.
+        # La lettera che precede le cifre viene controllata a parte: tenerla fuori
+        # dalla regex evita un tentativo a vuoto su ogni lettera della riga.
+        inneschi = r"(?P<cifre>\d+(?:[\s\-]\d+)*)(?P<punto>\.(?=\d+\.\d))?|(?P<chiocciola>@)"
+        if etichette_per_parola:
+            inneschi += "|(?P<parola>" + _regex_trie(etichette_per_parola) + ")"
+        self._inneschi = re.compile(converti(inneschi))
+        self._inneschi_ci = re.compile(converti(inneschi), re.IGNORECASE)
+        self._lettera = re.compile(converti("[a-z]")).match
+        self._lettera_ci = re.compile(converti("[a-z]"), re.IGNORECASE).match
+
+        # Filtro per interi blocchi di testo: per ogni etichetta la condizione necessaria
+        # più selettiva (chiocciola, cifra-punto-cifra, cifre consecutive o parole chiave
+        # con il loro seguito). Se nessuna compare nel blocco, nessuna riga interamente
+        # contenuta nel blocco può avere un match. Ogni condizione viene prima verificata
+        # con una ricerca letterale (str.__contains__), molto più veloce di una regex
+        # su un blocco di diversi MB: la regex viene eseguita solo se il letterale c'è.
+        self._blocco_attivo = True
+        self._blocco_chiocciola = False
+        self._blocco_parole = []  # (parole chiave, regex, regex case-insensitive)
+        cifre = []
+        min_cifre = None
+        for label in self.patterns:
+            req = requisiti.get(label, {})
+            if req.get("chiocciola"):
+                self._blocco_chiocciola = True
+            elif req.get("punto"):
+                cifre.append(r"\d\.\d+\.\d")
+            elif req.get("cifre"):
+                min_cifre = req["cifre"] if min_cifre is None else min(min_cifre, req["cifre"])
+            elif req.get("parole"):
+                parole = tuple(p.lower() for p in req["parole"])
+                sorgente = "(?:" + _regex_trie(parole) + ")"
+                if req.get("dopo"):
+                    sorgente += "(?=" + req["dopo"] + ")"
+                self._blocco_parole.append((
+                    tuple(converti(p) for p in parole),
+                    re.compile(converti(sorgente)),
+                    re.compile(converti(sorgente), re.IGNORECASE),
+                ))
+            else:
+                self._blocco_attivo = False  # Etichetta senza requisiti: nessun blocco può essere scartato
+        if min_cifre is not None:
+            cifre.append(r"\d{%d}" % min_cifre)
+        self._blocco_cifre = re.compile(converti("|".join(cifre))) if cifre else None
+
+        # Requisiti normalizzati nell'ordine originale dei pattern:
+        # (etichetta, cifre consecutive, cifre nel blocco, lettera, chiocciola, punto, parole)
+        self._piano = []
+        for label in self.patterns:
+            req = requisiti.get(label, {})
+            self._piano.append((
+                label,
+                req.get("cifre", 0),
+                req.get("blocco", 0),
+                req.get("lettera", False),
+                req.get("chiocciola", False),
+                req.get("punto", False),
+                bool(req.get("parole")),
+            ))
+
+    def chunk_may_match(self, text):
+        """
+        Dice se un blocco di testo può contenere righe con dati sensibili.
+
+        Il blocco viene esaminato per intero con poche ricerche letterali: se
+        restituisce False nessuna riga interamente contenuta nel blocco può avere
+        un match e le righe possono essere saltate senza analizzarle una per una.
+
+        Args:
+            text (str): Blocco di testo (anche di più righe), bytes se binario
+
+        Returns:
+            bool: False solo se il blocco non contiene nessun innesco
+        """
+        if not self._blocco_attivo:
+            return True
+        if self._blocco_chiocciola and self._chiocciola in text:
+            return True
+
+        ascii = text.isascii()
+        # Con caratteri non ASCII \d riconosce anche cifre Unicode: si usa direttamente la regex
+        if self._blocco_cifre is not None and (not ascii or any(c in text for c in self._cifre)):
+            if self._blocco_cifre.search(text):
+                return True
+
+        if ascii or not any(c in text for c in self._speciali):
+            testo = text.lower()
+            for parole, regex, _ in self._blocco_parole:
+                if any(p in testo for p in parole) and regex.search(testo):
+                    return True
+        else:
+            for _, _, regex_ci in self._blocco_parole:
+                if regex_ci.search(text):
+                    return True
+        return False
+
+    def candidate_labels(self, line):
+        """
+        Restituisce le etichette i cui pattern possono trovare un match nella riga.
+
+        Args:
+            line (str): Riga di testo da analizzare, bytes se binario
+
+        Returns:
+            list: Etichette candidate, nell'ordine del dizionario dei pattern
+        """
+        # Le parole chiave sono cercate sulla riga in minuscolo, molto più veloce
+        # di un'alternativa case-insensitive, salvo i rari caratteri speciali
+        if line.isascii() or not any(c in line for c in self._speciali):
+            testo = line.lower()
+            cerca = self._inneschi.search
+            e_lettera = self._lettera
+        else:
+            testo = line
+            cerca = self._inneschi_ci.search
+            e_lettera = self._lettera_ci
+
+        max_cifre = 0
+        max_blocco = 0
+        lettera = False
+        chiocciola = False
+        punto = False
+        da_parole = set()
+
+        # Unica passata sulla riga per raccogliere tutti gli inneschi
+        pos = 0
+        while True:
+            m = cerca(testo, pos)
+            if m is None:
+                break
+            gruppo = m.lastgroup
+            if gruppo == "parola":
+                parola = m.group("parola").lower()
+                inizio = m.start()
+                if parola in self._etichette_parola:
+                    da_parole.update(self._etichette_parola[parola])
+                    # Etichette la cui parola chiave deve essere seguita da un testo preciso
+                    for lunghezza, label, segue in self._seguiti_parola[parola]:
+                        if label not in da_parole and segue(testo, inizio + lunghezza):
+                            da_parole.add(label)
+                else:
+                    da_parole.update(self._tutte_da_parole)
+                # Riparte dal carattere successivo: un'altra parola chiave può
+                # iniziare dentro quella appena trovata
+                pos = inizio + 1
+                continue
+            pos = m.end()
+            if gruppo == "chiocciola":
+                chiocciola = True
+                continue
+            if gruppo == "punto":
+                punto = True
+            inizio = m.start()
+            if not lettera and inizio and e_lettera(testo, inizio - 1):
+                lettera = True
+            blocco = m.group("cifre")
+            if blocco.isdigit():
+                cifre = totale = len(blocco)
+            else:
+                gruppi = self._separatori.split(blocco)
+                cifre = max(map(len, gruppi))
+                totale = len(blocco) - len(gruppi) + 1
+            if cifre > max_cifre:
+                max_cifre = cifre
+            if totale > max_blocco:
+                max_blocco = totale
+
+        candidate = []
+        for label, min_cifre, min_blocco, serve_lettera, serve_chiocciola, serve_punto, serve_parole in self._piano:
+            if max_cifre < min_cifre or max_blocco < min_blocco:
+                continue
+            if serve_lettera and not lettera:
+                continue
+            if serve_chiocciola and not chiocciola:
+                continue
+            if serve_punto and not punto:
+                continue
+            if serve_parole and label not in da_parole:
+                continue
+            candidate.append(label)
+        return candidate
+
+    def findall(self, line, inizio=0, fine=None):
+        """
+        Equivalente a ``[(label, p.findall(line)) for label, p in patterns.items()]``
+        limitato alle etichette con almeno un match.
+
+        Con ``inizio`` o ``fine`` vengono riportati solo i match che iniziano in
+        ``[inizio, fine)``: il testo prima e dopo fa da contesto (è il caso delle
+        finestre di una riga lunga, vedi scanner.iter_lines).
+
+        Args:
+            line (str): Riga di testo da analizzare, bytes se binario
+            inizio (int): Posizione minima in cui inizia un match riportato
+            fine (int): Posizione da cui i match non vengono più riportati (None = fino alla fine)
+
+        Returns:
+            list: Lista di tuple (etichetta, lista di match grezzi)
+        """
+        finestra = inizio > 0 or fine is not None
+        risultati = []
+        for label in self.candidate_labels(line):
+            if finestra:
+                matches = []
+                for m in self.patterns[label].finditer(line):
+                    if fine is not None and m.start() >= fine:
+                        break
+                    if m.start() >= inizio:
+                        matches.append(valore_findall(m))
+            else:
+                matches = self.patterns[label].findall(line)
+            if matches:
+                risultati.append((label, matches))
+        return risultati
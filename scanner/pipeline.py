@@ -0,0 +1,199 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from scanner.scanner import scan_file, iter_scan_bytes
+from scanner.sniffer import sniff_bytes, SNIFF_SIZE, TEXT
+from scanner.archives import ARCHIVE_FORMATS
+from scanner.walker import WalkState
+
+# Thread per le operazioni di I/O (lettura delle directory, stat, lettura dei file).
+# Su NFS/SMB ogni operazione costa millisecondi di attesa, non CPU: è anche il numero
+# massimo di richieste contemporanee inviate al file server
+DEFAULT_IO_WORKERS = 16
+
+# Elementi in attesa tra una fase e la successiva: quando una coda è piena la fase che
+# la riempie si ferma (backpressure), così la memoria resta limitata
+DEFAULT_QUEUE_SIZE = 32
+
+# I file fino a questa dimensione vengono letti per intero dai thread di I/O; quelli più
+# grandi vengono letti a blocchi dalla fase di scansione, come in iter_scan_file.
+# Memoria massima dei contenuti in attesa: circa (2 * DEFAULT_QUEUE_SIZE + io_workers) * PREFETCH_SIZE
+PREFETCH_SIZE = 1024 * 1024
+
+# Segnale di fine inserito nelle code
+_FINE = object()
+
+
+def _scan_data(data, file_path, kind, registry):
+    # Scansione di un file già letto in memoria (eseguita dal pool di scansione)
+    return list(iter_scan_bytes(data, file_path, kind, registry=registry))
+
+def _read_file(walk, entry, max_size, use_mmap, registry):
+    """
+    Fase di I/O per un file: stat, riconoscimento del contenuto e lettura.
+
+    Returns:
+        tuple | None: (percorso, lista dei risultati se già noti, altrimenti la funzione
+        da eseguire nel pool di scansione); None se il file non è più accessibile
+    """
+    st = walk.stat_file(entry)
+    if st is None:
+        return None
+    file_path = entry.path
+    # File grandi (o oltre il limite, che scan_file segnala senza aprirli): letti dalla scansione
+    if st.st_size > PREFETCH_SIZE or (max_size is not None and st.st_size > max_size) or use_mmap:
+        return file_path, functools.partial(scan_file, file_path, max_size=max_size, use_mmap=use_mmap, st=st, registry=registry)
+    try:
+        with open(file_path, "rb") as f:
+            head = f.read(SNIFF_SIZE)
+            kind = sniff_bytes(head, truncated=st.st_size > len(head))
+            if kind != TEXT and kind not in ARCHIVE_FORMATS:
+                return file_path, list(iter_scan_bytes(head, file_path, kind))  # Binario: segnalato e saltato
+            data = head + f.read()
+    except OSError:
+        print(f"[!] Impossibile leggere il file {file_path}. Saltato.")
+        return file_path, []
+    return file_path, functools.partial(_scan_data, data, file_path, kind, registry)
+
+async def _walk(walk, loop, io_pool, files_queue, io_workers):
+    # Legge fino a io_workers directory contemporaneamente e accoda i file trovati
+    root = await loop.run_in_executor(io_pool, walk.root)
+    waiting = [root] if root is not None else []
+    running = set()
+    while waiting or running:
+        while waiting and len(running) < io_workers:
+            running.add(loop.run_in_executor(io_pool, walk.read_directory, *waiting.pop()))
+        done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            files, subdirs = future.result()
+            waiting.extend(reversed(subdirs))
+            for entry in files:
+                await files_queue.put(entry)
+
+async def _read(loop, io_pool, read, files_queue, scan_queue):
+    # Legge i file accodati dall'attraversamento e li passa alla fase di scansione
+    while True:
+        entry = await files_queue.get()
+        if entry is _FINE:
+            return
+        item = await loop.run_in_executor(io_pool, read, entry)
+        if item is not None:
+            await scan_queue.put(item)
+
+async def _scan(loop, cpu_pool, scan_queue, output_queue):
+    # Esegue la ricerca dei dati sensibili (CPU) sui file letti
+    while True:
+        item = await scan_queue.get()
+        if item is _FINE:
+            return
+        file_path, task = item
+        results = task if isinstance(task, list) else await loop.run_in_executor(cpu_pool, task)
+        await output_queue.put((file_path, results))
+
+async def aiter_scan_directory(directory, io_workers=DEFAULT_IO_WORKERS, cpu_workers=1, queue_size=DEFAULT_QUEUE_SIZE,
+                               stats=None, use_mmap=False, walk_options=None, registry=None, max_size=None):
+    """
+    Scansiona ricorsivamente una directory con una pipeline asyncio, pensata per i filesystem
+    di rete in cui ogni open e stat costa millisecondi.
+
+    Tre fasi lavorano in parallelo, collegate da code limitate (backpressure):
+    attraversamento (lettura delle directory) e lettura dei file (stat, riconoscimento e
+    contenuto) in un pool di io_workers thread, ricerca dei dati sensibili in un pool di
+    cpu_workers (un thread, o processi se più di uno). I risultati sono gli stessi di
+    iter_scan_directory, ma i file arrivano nell'ordine in cui la loro scansione termina.
+
+    Args:
+        directory (str): Directory radice
+        io_workers (int): Operazioni di I/O contemporanee sul filesystem
+        cpu_workers (int): Scansioni contemporanee (0 o None = tutti i core)
+        queue_size (int): Elementi massimi in attesa tra due fasi
+        stats (dict): Contatori aggiornati durante la scansione ('skipped': file esclusi)
+        use_mmap (bool): Scansiona i file mappati in memoria (letti dalla fase di scansione)
+        walk_options (dict): Opzioni dell'attraversamento (vedi walk_files)
+        registry (PatternRegistry): Pattern da cercare (None = tutti)
+        max_size (int): Dimensione massima dei file scansionati (None = nessun limite)
+
+    Returns:
+        async generator: Tuple (percorso, lista dei risultati) per ogni file
+    """
+    if stats is None:
+        stats = {}
+    walk = WalkState(directory, stats, **(walk_options or {}))
+    if not cpu_workers:
+        cpu_workers = os.cpu_count() or 1
+    loop = asyncio.get_running_loop()
+
+    io_pool = ThreadPoolExecutor(max_workers=io_workers, thread_name_prefix="privacywatcher-io")
+    # La regex è CPU-bound: con più di un worker servono processi, non thread
+    cpu_pool = ThreadPoolExecutor(max_workers=1) if cpu_workers == 1 else ProcessPoolExecutor(max_workers=cpu_workers)
+    files_queue = asyncio.Queue(queue_size)
+    scan_queue = asyncio.Queue(queue_size)
+    output_queue = asyncio.Queue(queue_size)
+    read = functools.partial(_read_file, walk, max_size=max_size, use_mmap=use_mmap, registry=registry)
+    errors = []
+
+    # Ogni fase, terminata, segnala la fine ai worker della fase successiva
+    async def walker():
+        await _walk(walk, loop, io_pool, files_queue, io_workers)
+        for _ in range(io_workers):
+            await files_queue.put(_FINE)
+
+    async def readers():
+        await asyncio.gather(*(_read(loop, io_pool, read, files_queue, scan_queue) for _ in range(io_workers)))
+        for _ in range(cpu_workers):
+            await scan_queue.put(_FINE)
+
+    async def scanners():
+        await asyncio.gather(*(_scan(loop, cpu_pool, scan_queue, output_queue) for _ in range(cpu_workers)))
+        await output_queue.put(_FINE)
+
+    async def guarded(stage):
+        # Un errore in una fase interrompe la pipeline e viene rilanciato al chiamante
+        try:
+            await stage
+        except Exception as e:
+            errors.append(e)
+            await output_queue.put(_FINE)
+
+    tasks = [asyncio.ensure_future(guarded(stage)) for stage in (walker(), readers(), scanners())]
+    completed = False
+    try:
+        while True:
+            item = await output_queue.get()
+            if item is _FINE:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+        completed = True
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        io_pool.shutdown(wait=False, cancel_futures=True)
+        cpu_pool.shutdown(wait=completed, cancel_futures=True)
+
+def iter_scan_directory_pipeline(directory, **options):
+    """
+    Versione sincrona di aiter_scan_directory, per chi non usa asyncio: esegue la pipeline
+    in un proprio event loop e genera (percorso, lista dei risultati) come iter_scan_directory.
+
+    Args:
+        directory (str): Directory radice
+        **options: Opzioni di aiter_scan_directory
+
+    Returns:
+        generator: Tuple (percorso, lista dei risultati) per ogni file
+    """
+    loop = asyncio.new_event_loop()
+    results = aiter_scan_directory(directory, **options)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
@@ -0,0 +1,125 @@
+from array import array
+from collections.abc import Mapping
+
+# Campi di un risultato, nell'ordine in cui vengono salvati nel database
+FIELDS = ("file", "line", "content", "data_type", "match")
+
+
+class Finding(Mapping):
+    """
+    Vista in sola lettura di un risultato salvato in un ResultStore.
+
+    Si usa come il dizionario prodotto dallo scanner (``item['file']``,
+    ``item.get('match')``, ``dict(item)``), ma non copia i dati: legge le
+    colonne del contenitore a cui appartiene.
+    """
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, key):
+        store = self._store
+        i = self._index
+        if key == "file":
+            return store._paths[store._file[i]]
+        if key == "line":
+            return store._line[i]
+        if key == "content":
+            return store._texts[store._content[i]]
+        if key == "data_type":
+            return store._labels[store._label[i]]
+        if key == "match":
+            return store._match[i]
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+class ResultStore:
+    """
+    Contenitore compatto dei risultati di una scansione, al posto di una lista di dizionari.
+
+    I percorsi e i tipi di dato sono salvati una volta sola e ogni risultato ne tiene
+    l'indice; numeri di riga e indici sono colonne ``array``. Il testo di una riga è
+    salvato una volta per (file, riga) anche quando la riga ha più match. Si scorre e
+    si indicizza come una lista: ogni elemento è una vista Finding compatibile con
+    il dizionario prodotto dallo scanner.
+
+    Args:
+        results (iterable): Risultati iniziali (dizionari o viste Finding)
+    """
+
+    def __init__(self, results=()):
+        self._paths = []
+        self._path_index = {}
+        self._labels = []
+        self._label_index = {}
+        self._texts = []
+        self._file = array("I")
+        self._line = array("L")
+        self._label = array("I")
+        self._content = array("I")
+        self._match = []
+        self.extend(results)
+
+    @staticmethod
+    def _intern(value, values, index):
+        # Indice di value nella tabella, aggiungendolo se non c'è ancora
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(values)
+            values.append(value)
+        return i
+
+    def append(self, result):
+        """Aggiunge un risultato (dizionario con i campi di FIELDS)."""
+        file_index = self._intern(result["file"], self._paths, self._path_index)
+        line = result["line"]
+        content = result["content"]
+
+        # I risultati di una riga arrivano consecutivi e condividono il testo della riga
+        if (self._match and self._file[-1] == file_index and self._line[-1] == line
+                and self._texts[self._content[-1]] == content):
+            text_index = self._content[-1]
+        else:
+            text_index = len(self._texts)
+            self._texts.append(content)
+
+        self._file.append(file_index)
+        self._line.append(line)
+        self._label.append(self._intern(result["data_type"], self._labels, self._label_index))
+        self._content.append(text_index)
+        self._match.append(result["match"])
+
+    def extend(self, results):
+        """Aggiunge tutti i risultati di un iterabile."""
+        for result in results:
+            self.append(result)
+
+    def __len__(self):
+        return len(self._match)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._match)
+        if not 0 <= index < len(self._match):
+            raise IndexError("indice del risultato fuori intervallo")
+        return Finding(self, index)
+
+    def __iter__(self):
+        for i in range(len(self._match)):
+            yield Finding(self, i)
+
+    def to_dicts(self):
+        """Restituisce i risultati come lista di dizionari indipendenti."""
+        return [dict(finding) for finding in self]
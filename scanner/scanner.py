@@ -1,193 +1,698 @@
+import io
 import os
 import sys
-from utils.patterns import patterns  # Importa i pattern regex per i dati sensibili
+import mmap
+import collections
+import hashlib
+import functools
+import multiprocessing
+from utils.patterns import patterns, versione_bytes  # Registro dei pattern regex (compilati al primo uso) e loro versione per bytes
 from utils.validator import validate_luhn, validate_italian_cf, validate_iban, validate_italian_phone  # Funzioni di validazione specifiche
-from db.database import salva_scansione  # Funzione per salvare la scansione nel DB (non usata nel codice mostrato)
+from utils.validator import validate_luhn_batch, validate_italian_cf_batch, validate_iban_batch  # Versioni in blocco (NumPy se disponibile)
+from scanner.engine import MatchEngine  # Motore che seleziona in una passata i pattern da eseguire
+from scanner.results import ResultStore  # Contenitore compatto dei risultati
+from scanner.sniffer import sniff_file, sniff_bytes, SNIFF_SIZE, TEXT  # Riconoscimento dei file binari dai primi KB
+from scanner.walker import walk_files, EXCLUDED_DIRS, EXCLUDED_SUFFIXES  # Attraversamento delle directory con os.scandir
+from scanner.archives import iter_scan_archive, ARCHIVE_FORMATS  # File compressi e archivi letti in streaming
+
+# Importare lo scanner non compila regex e non apre file: i motori vengono costruiti al
+# primo uso e il database (indice dei file) è importato solo dalle scansioni incrementali.
+
+# Motori di ricerca già costruiti, per firma del registro dei pattern e tipo di testo (str o bytes)
+_engines = {}
+
+# Motore per un registro di pattern (None = tutti i pattern), costruito al primo uso:
+# compila solo le regex delle etichette del registro, così quelle escluse non costano nulla.
+# Con binario=True restituisce il motore sui byte della modalità mmap, con le versioni per bytes dei pattern.
+def get_engine(registry=None, binario=False):
+    if registry is None:
+        registry = patterns
+    key = (registry.signature(), binario)
+    engine = _engines.get(key)
+    if engine is None:
+        compiled = {label: versione_bytes(pattern) for label, pattern in registry.items()} if binario else registry
+        engine = _engines[key] = MatchEngine(compiled, registry.requisiti, binario=binario)
+    return engine
+
+# Compatibilità: l'attributo engine del modulo resta il motore con tutti i pattern, costruito solo se richiesto
+def __getattr__(name):
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Regole di validazione per tipo di dato: ricevono il match così come trovato
+# e la sua versione ripulita da spazi, trattini e punti
+def _valida_email(match, clean):
+    # Validazione base: deve contenere '@' e un '.' dopo la chiocciola
+    return '@' in match and '.' in match.split('@')[1]
+
+def _valida_password(match, clean):
+    # Filtra password troppo comuni o troppo corte
+    return len(clean) >= 4 and clean.lower() not in ['password', 'pass', 'pwd', '1234', 'admin']
+
+def _valida_cap(match, clean):
+    # CAP italiano valido tra 00010 e 98168 e di 5 cifre
+    return clean.isdigit() and len(clean) == 5 and 10 <= int(clean) <= 98168
+
+def _valida_partita_iva(match, clean):
+    # Controlla che sia un numero di 11 cifre
+    return clean.isdigit() and len(clean) == 11
+
+def _valida_generico(match, clean):
+    # Per altri tipi, accetta se almeno 3 caratteri
+    return len(clean) >= 3
+
+# Validatore di ogni tipo di dato (i tipi non elencati usano _valida_generico)
+VALIDATORS = {
+    "Carta di Credito": lambda match, clean: validate_luhn(clean),
+    "Codice Fiscale": lambda match, clean: validate_italian_cf(clean.upper()),
+    "IBAN": lambda match, clean: validate_iban(clean.upper()),
+    "Telefono": lambda match, clean: validate_italian_phone(clean),
+    "Email": _valida_email,
+    "Password": _valida_password,
+    "CAP": _valida_cap,
+    "Partita IVA": _valida_partita_iva,
+    "IP Address": lambda match, clean: True,  # Per IP, la validazione è già gestita dal regex
+}
+
+# Numero massimo di esiti di validazione tenuti in cache
+VALIDATION_CACHE_SIZE = 65536
+
+# Rimuove spazi e caratteri speciali da un match prima della validazione
+def _clean(match):
+    return match.replace(' ', '').replace('-', '').replace('.', '')
+
+# Valida un match del tipo indicato. Gli stessi valori (l'IBAN aziendale, l'email del
+# supporto, l'IP di un server) si ripetono su moltissime righe: l'esito viene tenuto in
+# una cache LRU limitata. La chiave è il match grezzo e non quello ripulito, perché
+# alcune regole (es. email) guardano anche i caratteri che la pulizia rimuove.
+@functools.lru_cache(maxsize=VALIDATION_CACHE_SIZE)
+def is_valid_match(label, match):
+    return VALIDATORS.get(label, _valida_generico)(match, _clean(match))
+
+# Statistiche della cache di validazione (hits, misses, maxsize, currsize) del processo corrente
+def validation_cache_info():
+    return is_valid_match.cache_info()
+
+# Svuota la cache di validazione e ne azzera i contatori
+def clear_validation_cache():
+    is_valid_match.cache_clear()
+
+# Tipi di dato con un validatore in blocco: ricevono la lista dei match ripuliti
+# e restituiscono la maschera degli esiti, con le stesse regole di VALIDATORS
+BATCH_VALIDATORS = {
+    "Carta di Credito": validate_luhn_batch,
+    "Codice Fiscale": lambda cleans: validate_italian_cf_batch([clean.upper() for clean in cleans]),
+    "IBAN": lambda cleans: validate_iban_batch([clean.upper() for clean in cleans]),
+}
+
+# Candidati raccolti durante la scansione di un file prima di validarli in blocco
+VALIDATION_BATCH_SIZE = 1024
+
+# Sotto questo numero di match distinti la validazione in blocco non conviene (e non
+# serve importare NumPy): i match passano dalla cache di is_valid_match
+BATCH_MIN_SIZE = 64
+
+# Valida in una sola chiamata i match di un tipo di dato e restituisce l'insieme di
+# quelli validi. I tipi con un validatore in blocco lo ricevono senza duplicati, gli
+# altri (e i gruppi piccoli) passano dalla cache di is_valid_match.
+def validate_matches(label, matches):
+    batch_validator = BATCH_VALIDATORS.get(label)
+    if batch_validator is None:
+        return {match for match in matches if is_valid_match(label, match)}
+    unique = list(dict.fromkeys(matches))
+    if len(unique) < BATCH_MIN_SIZE:
+        return {match for match in unique if is_valid_match(label, match)}
+    mask = batch_validator([_clean(match) for match in unique])
+    return {match for match, valid in zip(unique, mask) if valid}
+
+# Match grezzi di una riga, come lista di (tipo dato, lista di match) non ancora validati.
+# La riga può essere bytes (solo ASCII, vedi _ascii_safe): i match vengono decodificati.
+# engine è il motore adatto al tipo della riga (None = quello con tutti i pattern).
+# start e stop limitano i match a quelli che iniziano in [start, stop) (vedi LineWindow).
+def _raw_matches(line, engine=None, start=0, stop=None):
+    binary = isinstance(line, bytes)
+    if engine is None:
+        engine = get_engine(binario=binary)
+    found = []
+    # Il motore esegue solo i pattern compatibili con la riga e restituisce i match grezzi
+    for label, matches in engine.findall(line, start, stop):
+        # Se il match è una tupla (da gruppi regex), prendi il primo elemento non vuoto
+        values = [next((m for m in match if m), match[0]) if isinstance(match, tuple) else match for match in matches]
+        if binary:
+            values = [value.decode("ascii") for value in values]
+        found.append((label, values))
+    return found
 
 # Funzione che scansiona una singola riga di testo alla ricerca di dati sensibili
-def scan_line_for_sensitive_data(line):
+# registry limita la ricerca a un registro di pattern (None = tutti i pattern)
+def scan_line_for_sensitive_data(line, registry=None):
     findings = []  # Lista dei risultati trovati in questa riga
     
-    # Cicla sui tipi di dato sensibile e sui relativi pattern regex
-    for label, pattern in patterns.items():
-        matches = pattern.findall(line)  # Cerca tutte le occorrenze nel testo
+    for label, matches in _raw_matches(line, get_engine(registry, isinstance(line, bytes))):
+        # Controlla la validità in base al tipo di dato (con cache)
+        validated_matches = [match for match in matches if is_valid_match(label, match)]
         
-        if matches:
-            validated_matches = []  # Lista di match che passano la validazione
-            
-            for match in matches:
-                # Se il match è una tupla (da gruppi regex), prendi il primo elemento non vuoto
-                if isinstance(match, tuple):
-                    match = next((m for m in match if m), match[0])
-                
-                # Rimuovi spazi e caratteri speciali per la validazione
-                clean_match = match.replace(' ', '').replace('-', '').replace('.', '')
-                
-                # Controlla la validità in base al tipo di dato
-                if label == "Carta di Credito":
-                    if validate_luhn(clean_match):
-                        validated_matches.append(match)
-                elif label == "Codice Fiscale":
-                    if validate_italian_cf(clean_match.upper()):
-                        validated_matches.append(match)
-                elif label == "IBAN":
-                    if validate_iban(clean_match.upper()):
-                        validated_matches.append(match)
-                elif label == "Telefono":
-                    if validate_italian_phone(clean_match):
-                        validated_matches.append(match)
-                elif label == "Email":
-                    # Validazione base: deve contenere '@' e un '.' dopo la chiocciola
-                    if '@' in match and '.' in match.split('@')[1]:
-                        validated_matches.append(match)
-                elif label == "Password":
-                    # Filtra password troppo comuni o troppo corte
-                    if len(clean_match) >= 4 and clean_match.lower() not in ['password', 'pass', 'pwd', '1234', 'admin']:
-                        validated_matches.append(match)
-                elif label == "CAP":
-                    # CAP italiano valido tra 00010 e 98168 e di 5 cifre
-                    if clean_match.isdigit() and len(clean_match) == 5 and 10 <= int(clean_match) <= 98168:
-                        validated_matches.append(match)
-                elif label == "Partita IVA":
-                    # Controlla che sia un numero di 11 cifre
-                    if clean_match.isdigit() and len(clean_match) == 11:
-                        validated_matches.append(match)
-                elif label == "IP Address":
-                    # Per IP, la validazione è già gestita dal regex
-                    validated_matches.append(match)
-                else:
-                    # Per altri tipi, accetta se almeno 3 caratteri
-                    if len(clean_match) >= 3:
-                        validated_matches.append(match)
-            
-            # Se ci sono match validati, aggiungili ai risultati
-            if validated_matches:
-                findings.append((label, validated_matches))
+        # Se ci sono match validati, aggiungili ai risultati
+        if validated_matches:
+            findings.append((label, validated_matches))
     
     return findings  # Ritorna lista di tuple (tipo dato, lista di match)
 
-# Funzione che scansiona un singolo file alla ricerca di dati sensibili
-def scan_file(file_path):
-    results = []
+# Limite predefinito di scan_file sulla dimensione dei file (None = nessun limite)
+MAX_FILE_SIZE = 50 * 1024 * 1024
+
+# Caratteri letti dal disco per ogni blocco durante la scansione in streaming
+CHUNK_SIZE = 1024 * 1024
+
+# Le righe più lunghe di così (es. JSON minificato, righe CSV molto larghe) vengono
+# scansionate per intero, ma come contenuto del risultato si salva un estratto attorno al match
+MAX_CONTENT_LENGTH = 10000
+
+# Caratteri mostrati prima e dopo il match nell'estratto di una riga lunga
+CONTENT_CONTEXT = 200
+
+# Le righe più lunghe di LINE_WINDOW_SIZE caratteri (es. JSON minificato o un file senza
+# a capo) vengono scansionate a finestre, senza accumularle in memoria. Ogni finestra
+# comprende anche LINE_OVERLAP caratteri prima e dopo la sua parte e riporta solo i match
+# che iniziano nella sua parte: un match più corto di LINE_OVERLAP non viene mai tagliato.
+LINE_WINDOW_SIZE = 1024 * 1024
+LINE_OVERLAP = 4096
+
+# Finestra di una riga lunga: testo (con il contesto delle finestre vicine) e intervallo
+# [start, stop) in cui iniziano i match da riportare (stop None = fino alla fine del testo)
+LineWindow = collections.namedtuple("LineWindow", ("text", "start", "stop"))
+
+# Ultimo pezzo di una riga: la riga intera o, se è già stata divisa, la sua ultima finestra
+def _end_of_line(text, context):
+    return text if context is None else LineWindow(text, context, None)
+
+# Legge un file di testo a blocchi e restituisce (numero riga, riga) come farebbe readlines().
+# Le righe a cavallo tra due blocchi vengono ricomposte; quelle più lunghe di window_size
+# vengono restituite come LineWindow, con lo stesso numero di riga, man mano che si leggono.
+# Se filtro_blocco restituisce False per un blocco, le righe interamente contenute nel
+# blocco vengono solo contate, senza dividerle né restituirle.
+# Se cancel restituisce True la lettura si ferma prima del blocco successivo.
+def iter_lines(f, chunk_size=CHUNK_SIZE, filtro_blocco=None, window_size=LINE_WINDOW_SIZE, cancel=None):
+    lineno = 0
+    carry = ''          # Parte non ancora restituita della riga corrente
+    context = None      # Caratteri di contesto all'inizio di carry, se la riga è già divisa in finestre
     
-    # Controlla che il file esista
-    if not os.path.exists(file_path):
-        print(f"[!] Il file {file_path} non esiste.")
-        return results
+    while True:
+        if cancel is not None and cancel():
+            return
+        chunk = f.read(chunk_size)
+        if not chunk:
+            break
+        
+        if filtro_blocco is not None and not filtro_blocco(chunk):
+            first = chunk.find('\n')
+            if first != -1:
+                last = chunk.rfind('\n')
+                # La prima riga può essere iniziata nel blocco precedente: va restituita intera
+                lineno += 1
+                yield lineno, _end_of_line(carry + chunk[:first] + '\n', context)
+                # Le righe successive stanno tutte nel blocco scartato
+                lineno += chunk.count('\n', first + 1, last + 1)
+                carry = ''
+                context = None
+                chunk = chunk[last + 1:]
+            pieces = [chunk]
+        else:
+            pieces = chunk.split('\n')
+        # L'ultimo pezzo non è terminato da '\n': prosegue nel blocco successivo
+        tail = pieces.pop()
+        
+        for piece in pieces:
+            lineno += 1
+            if carry:
+                piece = carry + piece
+                carry = ''
+            yield lineno, _end_of_line(piece + '\n', context)
+            context = None
+        
+        carry += tail
+        # Riga più lunga di una finestra: le finestre complete vengono restituite subito
+        while len(carry) >= (context or 0) + window_size + LINE_OVERLAP:
+            start = context or 0
+            stop = start + window_size
+            yield lineno + 1, LineWindow(carry[:stop + LINE_OVERLAP], start, stop)
+            carry = carry[stop - LINE_OVERLAP:]
+            context = LINE_OVERLAP
     
-    # Controlla la dimensione del file, evita file > 50 MB
+    # Ultima riga senza '\n' finale
+    if carry:
+        lineno += 1
+        yield lineno, _end_of_line(carry, context)
+
+# Estratto di una riga lunga attorno alla prima occorrenza di value a partire da start.
+# Restituisce l'estratto e la posizione da cui cercare l'occorrenza successiva.
+def _content_excerpt(content, value, start=0):
+    pos = content.find(value, start)
+    if pos == -1:
+        pos = max(content.find(value), 0)
+    begin = max(pos - CONTENT_CONTEXT, 0)
+    end = min(pos + len(value) + CONTENT_CONTEXT, len(content))
+    excerpt = content[begin:end]
+    if begin > 0:
+        excerpt = "…" + excerpt
+    if end < len(content):
+        excerpt += "…"
+    return excerpt, pos + len(value)
+
+# Risultati delle righe in attesa: i candidati raccolti vengono validati con una
+# chiamata per tipo di dato, poi ogni riga produce i suoi risultati nell'ordine originale
+def _validate_pending(pending, candidates, file_path):
+    valid = {label: validate_matches(label, matches) for label, matches in candidates.items()}
+    for lineno, line, found in pending:
+        content = None
+        for label, values in found:
+            values = [value for value in values if value in valid[label]]
+            if not values:
+                continue
+            if content is None:
+                # Il contenuto viene calcolato una volta sola e condiviso dai risultati della riga
+                content = line.strip()
+                long_line = len(content) > MAX_CONTENT_LENGTH
+            start = 0  # I valori di un'etichetta sono nell'ordine in cui compaiono nella riga
+            for value in values:
+                if long_line:
+                    excerpt, start = _content_excerpt(content, value, start)
+                yield {
+                    "file": file_path,
+                    "line": lineno,
+                    "content": excerpt if long_line else content,
+                    "data_type": label,
+                    "match": value
+                }
+
+# Scansiona le righe (numero riga, riga) producendo un risultato per ogni match.
+# Le righe con numero <= skip_until sono già state restituite (vedi il fallback latin-1).
+# I candidati delle righe vengono validati in blocco ogni VALIDATION_BATCH_SIZE match, o prima
+# se le righe in attesa superano LINE_WINDOW_SIZE caratteri (ad esempio finestre di righe lunghe).
+# Le righe bytes (dalla modalità mmap) vengono decodificate solo se contengono match.
+# Le finestre delle righe lunghe (LineWindow) riportano solo i match della loro parte.
+# registry è il registro dei pattern da cercare (None = tutti i pattern).
+def _scan_lines(lines, file_path, skip_until=0, registry=None):
+    text_engine = get_engine(registry)
+    bytes_engine = None  # Costruito alla prima riga bytes
+    pending = []      # Righe con match grezzi: (numero riga, riga, match per tipo di dato)
+    candidates = {}   # Tipo di dato -> match da validare
+    collected = 0
+    pending_size = 0  # Caratteri delle righe in attesa
+    for lineno, line in lines:
+        start, stop = 0, None
+        if isinstance(line, LineWindow):
+            line, start, stop = line
+        # Salta righe vuote o già elaborate
+        if lineno <= skip_until or not line.strip():
+            continue
+        
+        if isinstance(line, bytes):
+            if bytes_engine is None:
+                bytes_engine = get_engine(registry, binario=True)
+            found = _raw_matches(line, bytes_engine, start, stop)
+        else:
+            found = _raw_matches(line, text_engine, start, stop)
+        if not found:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode("ascii")
+        pending.append((lineno, line, found))
+        pending_size += len(line)
+        for label, matches in found:
+            candidates.setdefault(label, []).extend(matches)
+            collected += len(matches)
+        
+        if collected >= VALIDATION_BATCH_SIZE or pending_size >= LINE_WINDOW_SIZE:
+            yield from _validate_pending(pending, candidates, file_path)
+            pending, candidates, collected, pending_size = [], {}, 0, 0
+    
+    if pending:
+        yield from _validate_pending(pending, candidates, file_path)
+
+# Scansiona le righe di un file aperto in modalità testo. I blocchi in cui il motore
+# non trova nessun innesco vengono scartati senza dividerli in righe.
+def _iter_scan_lines(f, file_path, chunk_size, skip_until=0, registry=None, cancel=None):
+    lines = iter_lines(f, chunk_size, filtro_blocco=get_engine(registry).chunk_may_match, cancel=cancel)
+    return _scan_lines(lines, file_path, skip_until, registry)
+
+# Caratteri ASCII che le regex su str considerano spazi (\s) e quelle su bytes no
+_UNICODE_SEPARATORS = (b"\x1c", b"\x1d", b"\x1e", b"\x1f")
+
+# Vero se le regex sui byte danno sul testo gli stessi risultati delle regex su str
+# applicate al testo decodificato: testo ASCII senza i separatori \x1c-\x1f
+def _ascii_safe(data):
+    return data.isascii() and not any(c in data for c in _UNICODE_SEPARATORS)
+
+# Righe contenute in un testo bytes, con gli a capo della modalità testo ('\n', '\r\n', '\r')
+def _count_lines(data):
+    return data.count(b"\n") + data.count(b"\r") - data.count(b"\r\n")
+
+# Restituisce (numero riga, riga) di un file mappato in memoria, come iter_lines in
+# modalità testo. Il file viene diviso in finestre di circa chunk_size byte che terminano
+# con un a capo: le finestre scartate dal motore non vengono divise in righe e le loro
+# righe vengono contate solo quando serve il numero di una riga successiva. Le finestre
+# ASCII restano bytes (per il motore sui byte); le altre vengono decodificate in UTF-8
+# ignorando gli errori e divise in righe str, esattamente come in modalità testo.
+# Se cancel restituisce True la lettura si ferma prima della finestra successiva.
+def iter_mmap_lines(mm, chunk_size=CHUNK_SIZE, registry=None, cancel=None):
+    engine = get_engine(registry)
+    bytes_engine = get_engine(registry, binario=True)
+    size = len(mm)
+    lineno = 0
+    skipped = []  # Finestre ASCII scartate (inizio, fine) le cui righe non sono ancora contate
+    start = 0
+    while start < size:
+        if cancel is not None and cancel():
+            return
+        next_newline = mm.find(b"\n", start + chunk_size - 1)
+        end = size if next_newline == -1 else next_newline + 1
+        window = mm[start:end]
+        
+        if _ascii_safe(window):
+            newline, carriage_return = b"\n", b"\r"
+            may_match = bytes_engine.chunk_may_match
+        else:
+            window = window.decode("utf-8", "ignore")
+            newline, carriage_return = "\n", "\r"
+            may_match = engine.chunk_may_match
+        # A capo universali come nella modalità testo: '\r\n' e '\r' diventano '\n'
+        if carriage_return in window:
+            window = window.replace(carriage_return + newline, newline).replace(carriage_return, newline)
+        
+        if not may_match(window):
+            if isinstance(window, bytes):
+                skipped.append((start, end))
+            else:
+                lineno += window.count(newline)  # Già decodificata: si conta subito
+            start = end
+            continue
+        
+        # Numero delle righe saltate finora, calcolato dagli a capo delle finestre scartate
+        for skipped_start, skipped_end in skipped:
+            lineno += _count_lines(mm[skipped_start:skipped_end])
+        skipped = []
+        
+        lines = window.split(newline)
+        # L'ultimo pezzo è vuoto, salvo per l'ultima riga di un file senza '\n' finale
+        tail = lines.pop()
+        for line in lines:
+            lineno += 1
+            yield lineno, line + newline
+        if tail:
+            lineno += 1
+            yield lineno, tail
+        start = end
+
+# Scansiona un file in streaming: legge blocchi di chunk_size caratteri e restituisce
+# i risultati man mano che li trova, con memoria costante anche su file di diversi GB.
+# max_size limita la dimensione dei file accettati (None = nessun limite).
+# st è il risultato di stat già ottenuto (es. da walk_files), per non ripeterla.
+# Con use_mmap=True il file viene mappato in memoria e scansionato sui byte, senza
+# decodificarlo: solo le righe con match (o non ASCII) vengono convertite in str.
+# registry limita la scansione a un registro di pattern (None = tutti, vedi utils.patterns).
+# cancel è una funzione senza argomenti controllata a ogni blocco letto (anche dei membri
+# degli archivi): se restituisce True la scansione si ferma, anche in un file senza risultati.
+def iter_scan_file(file_path, max_size=None, chunk_size=CHUNK_SIZE, use_mmap=False, st=None, registry=None, cancel=None):
+    # Una sola stat: esistenza, dimensione e chiave della cache dello sniffer
     try:
-        file_size = os.path.getsize(file_path)
-        if file_size > 50 * 1024 * 1024:
-            print(f"[!] Il file {file_path} è troppo grande (>{file_size/1024/1024:.1f}MB). Saltato.")
-            return results
+        if st is None:
+            st = os.stat(file_path)
+    except FileNotFoundError:
+        print(f"[!] Il file {file_path} non esiste.")
+        return
     except OSError:
         print(f"[!] Errore nell'accesso al file {file_path}")
-        return results
+        return
+    file_size = st.st_size
     
-    # Estensioni di file considerate per la scansione
-    processable_extensions = {'.txt', '.csv', '.log', '.conf', '.cfg', '.ini', '.xml', '.json', '.py', '.js', '.html', '.css', '.sql', '.md', '.rst'}
-    file_ext = os.path.splitext(file_path)[1].lower()
+    # Controlla la dimensione del file rispetto al limite configurato
+    if max_size is not None and file_size > max_size:
+        print(f"[!] Il file {file_path} è troppo grande (>{file_size/1024/1024:.1f}MB). Saltato.")
+        return
     
-    # Se estensione non nota, prova a leggere e verifica se è testo o binario
-    if file_ext not in processable_extensions and file_ext:
+    # Prima di ogni lettura completa, i primi KB dicono se il file è testo
+    # (NUL, caratteri di controllo, firme di archivi, immagini e database)
+    try:
+        verdetto = sniff_file(file_path, st)
+    except OSError:
+        print(f"[!] Impossibile leggere il file {file_path}. Saltato.")
+        return
+    # File compressi e archivi (gz, bz2, xz, zip, tar): decompressi in streaming, membro per
+    # membro, senza estrarli su disco (anche in modalità mmap, che non si applica ai dati compressi)
+    if verdetto in ARCHIVE_FORMATS:
+        yield from iter_scan_archive(file_path, verdetto,
+                                     lambda f, path: _iter_scan_lines(f, path, chunk_size, registry=registry, cancel=cancel))
+        return
+    if verdetto != TEXT:
+        print(f"[!] Il file {file_path} sembra essere binario ({verdetto}). Saltato.")
+        return
+    
+    # Modalità mmap: nessuna decodifica dell'intero file, quindi nessun fallback latin-1
+    if use_mmap:
+        if file_size == 0:
+            return  # Un file vuoto non può essere mappato
         try:
-            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                test_lines = f.readlines(1000)  # Legge fino a 1000 caratteri
-                # Se trova caratteri non ASCII (oltre 127), probabilmente binario
-                if any(ord(c) > 127 for line in test_lines for c in line[:100]):
-                    print(f"[!] Il file {file_path} sembra essere binario. Saltato.")
-                    return results
-        except:
-            print(f"[!] Impossibile leggere il file {file_path}. Saltato.")
-            return results
-    
-    # Prova a leggere il file riga per riga
+            with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from _scan_lines(iter_mmap_lines(mm, chunk_size, registry, cancel), file_path, registry=registry)
+        except Exception as e:
+            print(f"[!] Errore nella lettura di {file_path}: {e}")
+        return
+    
+    # Ultima riga già restituita, per non duplicare risultati se serve rileggere il file
+    last_line = 0
+    
+    # Prova a leggere il file a blocchi
     try:
         with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-            lines = f.readlines()
-            
-            for lineno, line in enumerate(lines, start=1):
-                # Salta righe vuote o troppo lunghe (>10.000 caratteri)
-                if not line.strip() or len(line) > 10000:
-                    continue
-                
-                matches = scan_line_for_sensitive_data(line)
-                if matches:
-                    # Per ogni risultato trovato, salva i dettagli
-                    for label, values in matches:
-                        for value in values:
-                            results.append({
-                                "file": file_path,
-                                "line": lineno,
-                                "content": line.strip(),
-                                "data_type": label,
-                                "match": value
-                            })
-                            
+            for result in _iter_scan_lines(f, file_path, chunk_size, registry=registry, cancel=cancel):
+                last_line = result["line"]
+                yield result
+    
     # Gestione errori di encoding, prova encoding latin-1 se utf-8 fallisce
     except UnicodeDecodeError:
         print(f"[!] Errore di codifica nel file {file_path}. Tentativo con encoding alternativo...")
         try:
             with open(file_path, "r", encoding="latin-1", errors="ignore") as f:
-                lines = f.readlines()
-                for lineno, line in enumerate(lines, start=1):
-                    if not line.strip() or len(line) > 10000:
-                        continue
-                    matches = scan_line_for_sensitive_data(line)
-                    if matches:
-                        for label, values in matches:
-                            for value in values:
-                                results.append({
-                                    "file": file_path,
-                                    "line": lineno,
-                                    "content": line.strip(),
-                                    "data_type": label,
-                                    "match": value
-                                })
+                yield from _iter_scan_lines(f, file_path, chunk_size, skip_until=last_line, registry=registry, cancel=cancel)
         except Exception as e:
             print(f"[!] Errore nella lettura di {file_path}: {e}")
     except Exception as e:
         print(f"[!] Errore nella lettura di {file_path}: {e}")
+
+# Scansiona il contenuto di un file già letto in memoria (es. dalla pipeline asincrona),
+# con gli stessi risultati di iter_scan_file sul file: testo, file compressi e archivi.
+# kind è il verdetto dello sniffer se già noto (None = calcolato dai primi byte di data).
+def iter_scan_bytes(data, file_path, kind=None, chunk_size=CHUNK_SIZE, registry=None):
+    if kind is None:
+        kind = sniff_bytes(data[:SNIFF_SIZE], truncated=len(data) > SNIFF_SIZE)
+    if kind in ARCHIVE_FORMATS:
+        yield from iter_scan_archive(file_path, kind, lambda f, path: _iter_scan_lines(f, path, chunk_size, registry=registry),
+                                     fileobj=io.BytesIO(data))
+        return
+    if kind != TEXT:
+        print(f"[!] Il file {file_path} sembra essere binario ({kind}). Saltato.")
+        return
+    # Stessa decodifica della modalità testo di iter_scan_file (UTF-8, errori ignorati, a capo universali)
+    with io.TextIOWrapper(io.BytesIO(data), encoding="utf-8", errors="ignore") as f:
+        yield from _iter_scan_lines(f, file_path, chunk_size, registry=registry)
+
+# Funzione che scansiona un singolo file alla ricerca di dati sensibili
+def scan_file(file_path, max_size=MAX_FILE_SIZE, use_mmap=False, st=None, registry=None):
+    return list(iter_scan_file(file_path, max_size=max_size, use_mmap=use_mmap, st=st, registry=registry))  # Ritorna lista di dizionari con i risultati trovati
+
+# Numero di file inviati in blocco a ogni processo worker
+DEFAULT_CHUNKSIZE = 16
+
+# Genera i percorsi dei file da scansionare, contando quelli saltati in stats.
+# walk_options sono le opzioni di walk_files (max_depth, same_filesystem, symlinks,
+# ignore_rules, ignore_files): senza, valgono le esclusioni predefinite e .privacywatcherignore.
+def iter_directory_files(directory, stats=None, walk_options=None):
+    for full_path, _ in walk_files(directory, stats, **(walk_options or {})):
+        yield full_path
+
+# Versione del formato dei risultati salvati nell'indice dei file
+INDEX_FORMAT = 2
+
+# Firma dei pattern attivi: se cambia, i risultati salvati nell'indice dei file non sono più validi.
+# Include INDEX_FORMAT e la firma del registro (calcolata senza compilare le regex).
+def patterns_signature(registry=None):
+    if registry is None:
+        registry = patterns
+    return hashlib.sha1(repr((INDEX_FORMAT, registry.signature())).encode("utf-8")).hexdigest()
+
+# Numero di voci dell'indice dei file accumulate prima di scriverle nel database
+INDEX_BATCH_SIZE = 100
+
+# Calcola l'hash del contenuto di un file leggendolo a blocchi
+def file_hash(file_path, block_size=CHUNK_SIZE):
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Nell'indice il campo "file" dei risultati contiene solo ciò che segue il percorso del file
+# ("" o, per i membri degli archivi, "!membro"): il percorso cambia con la directory di lavoro
+def _results_for_index(results, file_path):
+    return [{**result, "file": result["file"][len(file_path):]} for result in results]
+
+def _results_from_index(results, file_path):
+    for result in results:
+        result["file"] = file_path + result["file"]
+    return results
+
+# Scansione incrementale di un file: se dimensione, mtime e inode (o almeno il contenuto)
+# coincidono con quelli salvati nell'indice, riusa i risultati senza riscansionare.
+# Restituisce (risultati, voce da salvare nell'indice o None, True se riusati dall'indice).
+# max_size limita la dimensione dei file scansionati (None = nessun limite); i file
+# saltati perché troppo grandi non entrano nell'indice.
+def _scan_file_incremental(file_path, use_mmap=False, st=None, registry=None, max_size=None):
+    from db.database import recupera_indice_file  # Il database serve solo alle scansioni incrementali
+    
+    key = os.path.abspath(file_path)
+    try:
+        if st is None:
+            st = os.stat(file_path)
+    except OSError:
+        return scan_file(file_path, max_size=max_size, use_mmap=use_mmap, registry=registry), None, False  # scan_file segnala l'errore
+    if max_size is not None and st.st_size > max_size:
+        return scan_file(file_path, max_size=max_size, st=st), None, False  # scan_file segnala il file saltato
+    
+    signature = patterns_signature(registry)
+    entry = recupera_indice_file(key)
+    if entry is not None and entry["firma"] != signature:
+        entry = None  # Risultati ottenuti con pattern diversi: vanno ricalcolati
+    
+    # Metadati invariati: il file non è cambiato
+    if entry is not None and (entry["size"], entry["mtime_ns"], entry["inode"]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+        results = _results_from_index(entry["risultati"], file_path)
+        return results, None, True
+    
+    try:
+        digest = file_hash(file_path)
+    except OSError:
+        return scan_file(file_path, max_size=max_size, use_mmap=use_mmap, registry=registry), None, False
+    
+    # Metadati cambiati ma contenuto identico (es. file copiato o toccato): basta aggiornare l'indice
+    if entry is not None and entry["hash"] == digest:
+        results = _results_from_index(entry["risultati"], file_path)
+        cached = True
+    else:
+        results = scan_file(file_path, max_size=max_size, use_mmap=use_mmap, st=st, registry=registry)
+        cached = False
+    
+    return results, {
+        "path": key,
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "inode": st.st_ino,
+        "hash": digest,
+        "firma": signature,
+        "risultati": _results_for_index(results, file_path),
+    }, cached
+
+# Task eseguito dai processi worker: deve stare a livello di modulo per essere serializzabile.
+# Riceve (percorso, stat) da walk_files, così il file non viene di nuovo sottoposto a stat.
+# Il registro dei pattern viaggia come definizioni: ogni worker compila solo i pattern selezionati.
+def _scan_file_task(entry, incremental=False, use_mmap=False, registry=None, max_size=None):
+    file_path, st = entry
+    if incremental:
+        return (file_path,) + _scan_file_incremental(file_path, use_mmap, st, registry, max_size)
+    return file_path, scan_file(file_path, max_size=max_size, use_mmap=use_mmap, st=st, registry=registry), None, False
+
+# Filtra le voci (percorso, stat) dell'attraversamento escludendo i percorsi in skip_paths
+def _skip_entries(entries, skip_paths, stats):
+    for entry in entries:
+        if entry[0] in skip_paths:
+            stats['resumed'] += 1
+            continue
+        yield entry
+
+# Scansiona ricorsivamente una directory restituendo (percorso, risultati) per ogni file.
+# Con workers > 1 i file vengono distribuiti a un pool di processi a blocchi di chunksize:
+# l'ordine dei risultati resta quello dell'attraversamento, come nella modalità sequenziale.
+# Con incremental=True i file invariati dall'ultima scansione riusano i risultati salvati
+# nell'indice dei file del database; l'indice viene aggiornato a blocchi dal processo principale.
+# use_mmap sceglie la scansione dei file mappati in memoria (vedi iter_scan_file).
+# walk_options sono le opzioni dell'attraversamento (vedi iter_directory_files); i file
+# vengono scansionati mentre l'attraversamento è ancora in corso.
+# registry limita la scansione a un registro di pattern (None = tutti, vedi utils.patterns).
+# skip_paths è un insieme di percorsi (come generati dall'attraversamento) da non scansionare,
+# ad esempio i file già elaborati da una scansione ripresa; sono contati in stats['resumed'].
+# max_size limita la dimensione dei file scansionati (None = nessun limite: i file vengono
+# letti in streaming, con memoria costante anche su log di diversi GB).
+def iter_scan_directory(directory, workers=1, chunksize=DEFAULT_CHUNKSIZE, stats=None, incremental=False, use_mmap=False, walk_options=None,
+                        registry=None, skip_paths=None, max_size=None):
+    if stats is None:
+        stats = {}
+    stats.setdefault('skipped', 0)
+    stats.setdefault('cached', 0)
+    stats.setdefault('resumed', 0)
+    if incremental:
+        from db.database import salva_indice_file  # Senza indice incrementale la scansione non tocca il database
+    entries = walk_files(directory, stats, **(walk_options or {}))
+    if skip_paths:
+        entries = _skip_entries(entries, skip_paths, stats)
+    task = functools.partial(_scan_file_task, incremental=incremental, use_mmap=use_mmap, registry=registry, max_size=max_size)
+    
+    # workers=None o 0: usa tutti i core disponibili
+    if not workers:
+        workers = os.cpu_count() or 1
     
-    return results  # Ritorna lista di dizionari con i risultati trovati
+    pending = []  # Voci dell'indice ancora da scrivere
+    pool = None
+    try:
+        if workers == 1:
+            outcomes = map(task, entries)
+        else:
+            # La regex e la validazione sono CPU-bound: servono processi, non thread
+            pool = multiprocessing.Pool(processes=workers)
+            # imap mantiene l'ordine di input e restituisce i risultati man mano che arrivano
+            outcomes = pool.imap(task, entries, chunksize=chunksize)
+        
+        for full_path, file_results, entry, cached in outcomes:
+            if cached:
+                stats['cached'] += 1
+            if entry is not None:
+                pending.append(entry)
+                if len(pending) >= INDEX_BATCH_SIZE:
+                    salva_indice_file(pending)
+                    pending = []
+            yield full_path, file_results
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if pending:
+            salva_indice_file(pending)
 
-# Funzione per scansionare una directory ricorsivamente
-def scan_directory(directory):
-    report = []
+# Funzione per scansionare una directory ricorsivamente (max_size come in iter_scan_directory)
+def scan_directory(directory, workers=1, chunksize=DEFAULT_CHUNKSIZE, incremental=False, use_mmap=False, walk_options=None, registry=None,
+                   max_size=None):
+    report = ResultStore()
     scanned_files = 0
-    skipped_files = 0
+    stats = {'skipped': 0, 'cached': 0}
     
     print(f"[INFO] Inizio scansione della directory: {directory}")
     
-    # Cammina ricorsivamente dentro la directory
-    for root, dirs, files in os.walk(directory):
-        # Esclude directory comuni da saltare (git, cache, editor config...)
-        dirs[:] = [d for d in dirs if d not in {'.git', '__pycache__', '.svn', 'node_modules', '.idea', '.vscode'}]
+    for full_path, file_results in iter_scan_directory(directory, workers, chunksize, stats, incremental, use_mmap, walk_options, registry,
+                                                      max_size=max_size):
+        if file_results:
+            report.extend(file_results)  # Aggiungi risultati al report totale
+            print(f"[FOUND] {len(file_results)} risultati in {full_path}")
+        scanned_files += 1
         
-        for filename in files:
-            full_path = os.path.join(root, filename)
-            
-            # Salta file temporanei o di sistema
-            if filename.startswith('.') or filename.endswith(('.tmp', '.temp', '.bak', '.swp')):
-                skipped_files += 1
-                continue
-            
-            if os.path.isfile(full_path):
-                file_results = scan_file(full_path)  # Scansiona singolo file
-                if file_results:
-                    report.extend(file_results)  # Aggiungi risultati al report totale
-                    print(f"[FOUND] {len(file_results)} risultati in {full_path}")
-                scanned_files += 1
-                
-                # Stampa progresso ogni 100 file
-                if scanned_files % 100 == 0:
-                    print(f"[INFO] Scansionati {scanned_files} file...")
-    
-    print(f"[INFO] Scansione completata: {scanned_files} file processati, {skipped_files} file saltati")
+        # Stampa progresso ogni 100 file
+        if scanned_files % 100 == 0:
+            print(f"[INFO] Scansionati {scanned_files} file...")
+    
+    print(f"[INFO] Scansione completata: {scanned_files} file processati, {stats['skipped']} file saltati")
+    if incremental:
+        print(f"[INFO] {stats['cached']} file invariati, risultati riusati dall'indice")
     print(f"[INFO] Trovati {len(report)} risultati totali")
     
-    return report  # Ritorna la lista completa dei risultati
+    return report  # Ritorna tutti i risultati (ResultStore: si scorre come una lista di dizionari)
 
 # Funzione per stampare a video i risultati della scansione in modo leggibile
 def print_report(results):
@@ -218,17 +723,19 @@ def print_report(results):
         print(f"   → {result['data_type']}: {result['match']}")
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Uso: python3 scanner.py <file_o_directory_da_scansionare>")
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python3 scanner.py <file_o_directory_da_scansionare> [numero_processi]")
         sys.exit(1)
 
     path = sys.argv[1]
+    # Numero di processi per la scansione di directory (0 = tutti i core)
+    workers = int(sys.argv[2]) if len(sys.argv) == 3 else 1
 
     if os.path.isfile(path):
         results = scan_file(path)
         print_report(results)
     elif os.path.isdir(path):
-        results = scan_directory(path)
+        results = scan_directory(path, workers=workers)
         print_report(results)
     else:
         print(f"[!] Il percorso specificato non è un file né una directory valida: {path}")
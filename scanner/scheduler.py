@@ -0,0 +1,272 @@
+import os
+import math
+import time
+import functools
+import multiprocessing
+from scanner.scanner import scan_file, DEFAULT_CHUNKSIZE
+from scanner.walker import walk_files
+
+# Peso di rischio per estensione: file che contengono spesso dati personali o credenziali
+# (esportazioni, configurazioni, posta, log) prima del codice sorgente e della documentazione
+EXTENSION_RISK = {
+    ".csv": 3.0, ".tsv": 3.0, ".sql": 3.0, ".vcf": 3.0, ".eml": 3.0, ".mbox": 3.0,
+    ".env": 3.0, ".ini": 2.5, ".conf": 2.5, ".cfg": 2.5, ".properties": 2.5, ".yaml": 2.5, ".yml": 2.5,
+    ".json": 2.0, ".jsonl": 2.0, ".xml": 2.0, ".log": 2.0, ".txt": 2.0,
+    ".gz": 1.5, ".bz2": 1.5, ".xz": 1.5, ".zip": 1.5, ".tar": 1.5, ".tgz": 1.5,
+    ".html": 1.0, ".htm": 1.0, ".md": 1.0, ".rst": 1.0,
+    ".py": 0.5, ".js": 0.5, ".ts": 0.5, ".java": 0.5, ".c": 0.5, ".h": 0.5, ".cpp": 0.5, ".go": 0.5,
+    ".css": 0.3, ".svg": 0.3,
+}
+DEFAULT_EXTENSION_RISK = 1.0
+
+# Giorni dopo i quali il peso dato a un file modificato di recente si dimezza
+RECENCY_HALF_LIFE_DAYS = 30
+
+# Oltre questa dimensione la priorità di un file cala: costa di più del budget di byte
+# a parità di probabilità di contenere un dato sensibile
+SIZE_PIVOT = 1024 * 1024
+
+# Peso dei risultati trovati in passato nello stesso file e nella stessa directory
+HISTORY_FILE_WEIGHT = 2.0
+HISTORY_DIR_WEIGHT = 0.5
+
+# File registrati nel cursore dello sweep per ogni scrittura nel database
+CURSOR_BATCH_SIZE = 100
+
+# Motivi di arresto riportati in stats['stopped']
+STOP_COMPLETED = "completed"
+STOP_TIME = "time"
+STOP_BYTES = "bytes"
+STOP_FILES = "files"
+
+
+class ScanBudget:
+    """
+    Limiti di una scansione pianificata: durata, byte letti e numero di file.
+
+    Il numero di file e i byte vengono applicati quando si sceglie quali file scansionare
+    (un file più grande del budget residuo viene rimandato, i successivi più piccoli no);
+    la durata viene controllata tra un file e l'altro (tra un blocco di file e l'altro con
+    più processi), quindi un file molto grande può superarla di quanto serve a completarlo.
+
+    Args:
+        max_seconds (float): Durata massima, dall'avvio della pianificazione (None = nessun limite)
+        max_bytes (int): Byte massimi dei file scansionati (None = nessun limite)
+        max_files (int): Numero massimo di file scansionati (None = nessun limite)
+    """
+
+    def __init__(self, max_seconds=None, max_bytes=None, max_files=None):
+        self.max_seconds = max_seconds
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.started = time.monotonic()
+
+    def expired(self):
+        """True se la durata massima è trascorsa."""
+        return self.max_seconds is not None and time.monotonic() - self.started >= self.max_seconds
+
+    def select(self, plan):
+        """
+        Sceglie, nell'ordine di priorità, i file che rientrano nei budget di byte e di file.
+
+        Args:
+            plan (list): Tuple (punteggio, percorso, stat) in ordine di priorità
+
+        Returns:
+            tuple: (file scelti, motivo per cui ne sono rimasti fuori o None)
+        """
+        selected = []
+        bytes_left = self.max_bytes
+        reason = None
+        for item in plan:
+            if self.max_files is not None and len(selected) >= self.max_files:
+                reason = STOP_FILES
+                break
+            size = item[2].st_size
+            if bytes_left is not None:
+                if size > bytes_left:
+                    reason = STOP_BYTES
+                    continue
+                bytes_left -= size
+            selected.append(item)
+        return selected, reason
+
+
+def risk_score(path, st, history=None, directory_history=None, now=None):
+    """
+    Punteggio di rischio di un file: più è alto, prima il file viene scansionato.
+
+    Combina il peso dell'estensione, quanto è recente l'ultima modifica, la dimensione
+    (i file piccoli e medi costano meno del budget) e i risultati trovati in passato
+    nel file e nella sua directory.
+
+    Args:
+        path (str): Percorso del file
+        st (os.stat_result): Stat del file
+        history (dict): Percorso assoluto -> risultati trovati in passato
+        directory_history (dict): Directory assoluta -> risultati trovati in passato
+        now (float): Istante di riferimento (None = adesso)
+
+    Returns:
+        float: Punteggio (0 per i file vuoti)
+    """
+    if st.st_size == 0:
+        return 0.0
+    name = os.path.basename(path).lower()
+    extension = os.path.splitext(name)[1] or (name if name.startswith(".") else "")
+    score = EXTENSION_RISK.get(extension, DEFAULT_EXTENSION_RISK)
+
+    # Da 2 (appena modificato) a 1 (molto vecchio), dimezzando lo scarto ogni RECENCY_HALF_LIFE_DAYS
+    age_days = max(0.0, ((now if now is not None else time.time()) - st.st_mtime) / 86400)
+    score *= 1 + 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    if st.st_size > SIZE_PIVOT:
+        score /= 1 + math.log2(st.st_size / SIZE_PIVOT)
+
+    if history or directory_history:
+        absolute = os.path.abspath(path)
+        past = history.get(absolute, 0) if history else 0
+        past_directory = directory_history.get(os.path.dirname(absolute), 0) if directory_history else 0
+        score *= 1 + HISTORY_FILE_WEIGHT * math.log2(1 + past) + HISTORY_DIR_WEIGHT * math.log2(1 + past_directory)
+    return score
+
+def _scan_task(entry, use_mmap=False, registry=None, max_size=None):
+    # Task dei processi worker: riceve (percorso, stat) dal piano
+    file_path, st = entry
+    return scan_file(file_path, max_size=max_size, use_mmap=use_mmap, st=st, registry=registry)
+
+def _directory_history(history):
+    # Risultati passati sommati per directory
+    totals = {}
+    for path, count in history.items():
+        directory = os.path.dirname(path)
+        totals[directory] = totals.get(directory, 0) + count
+    return totals
+
+def plan_scan(directory, history=None, done=None, stats=None, walk_options=None, now=None):
+    """
+    Elenca i file di una directory in ordine di priorità (risk_score decrescente).
+
+    Args:
+        directory (str): Directory radice
+        history (dict): Risultati passati per percorso assoluto (vedi recupera_storico_risultati)
+        done (dict): Percorso -> (size, mtime_ns) dei file già scansionati, che vengono esclusi
+            se non sono cambiati (vedi inizia_sweep)
+        stats (dict): Contatori ('skipped': file esclusi, 'resumed': file già scansionati)
+        walk_options (dict): Opzioni dell'attraversamento (vedi walk_files)
+        now (float): Istante di riferimento per la recenza (None = adesso)
+
+    Returns:
+        list: Tuple (punteggio, percorso, stat), a parità di punteggio in ordine di percorso
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault('resumed', 0)
+    if now is None:
+        now = time.time()
+    directory_history = _directory_history(history) if history else None
+    plan = []
+    for path, st in walk_files(directory, stats, **(walk_options or {})):
+        if done:
+            previous = done.get(os.path.abspath(path))
+            if previous is not None and tuple(previous) == (st.st_size, st.st_mtime_ns):
+                stats['resumed'] += 1
+                continue
+        plan.append((risk_score(path, st, history, directory_history, now), path, st))
+    plan.sort(key=lambda item: (-item[0], item[1]))
+    return plan
+
+def iter_scan_scheduled(directory, budget=None, sweep=None, use_history=True, workers=1, chunksize=DEFAULT_CHUNKSIZE,
+                        stats=None, use_mmap=False, walk_options=None, registry=None, scan_id=None, max_size=None):
+    """
+    Scansiona una directory in ordine di rischio, entro un budget di tempo, byte e file.
+
+    Con sweep (un nome) i file scansionati vengono registrati nel database: una
+    scansione interrotta, o fermata dal budget, riprende dal punto in cui era arrivata,
+    e uno sweep completato ricomincia da capo alla scansione successiva.
+
+    Un file viene registrato solo dopo che il chiamante ne ha elaborato i risultati (cioè
+    quando chiede il file successivo). Con scan_id (vedi db.database.inizia_scansione) i
+    risultati vengono salvati nel database insieme al cursore, nella stessa transazione,
+    e lo stato della scansione diventa STATO_COMPLETATO o STATO_INTERROTTO alla fine: uno
+    sweep interrotto non salta mai file i cui risultati non sono stati salvati.
+
+    Args:
+        directory (str): Directory radice
+        budget (ScanBudget): Limiti della scansione (None = nessun limite)
+        sweep (str): Nome dello sweep da riprendere e aggiornare (None = nessun cursore)
+        use_history (bool): Usa i risultati salvati nel database per la priorità
+        workers (int): Processi per la scansione (0 o None = tutti i core)
+        chunksize (int): File inviati in blocco a ogni processo
+        stats (dict): Contatori: 'planned' (file da scansionare), 'scanned', 'remaining',
+            'resumed' (già scansionati dallo sweep), 'skipped' (esclusi) e 'stopped' (motivo di arresto)
+        use_mmap (bool): Scansiona i file mappati in memoria
+        walk_options (dict): Opzioni dell'attraversamento (vedi walk_files)
+        registry (PatternRegistry): Pattern da cercare (None = tutti)
+        scan_id (int): Scansione in cui salvare i risultati insieme al cursore dello sweep
+        max_size (int): Dimensione massima dei file scansionati (None = nessun limite)
+
+    Returns:
+        generator: Tuple (percorso, lista dei risultati), in ordine di priorità
+    """
+    if budget is None:
+        budget = ScanBudget()
+    if stats is None:
+        stats = {}
+    stats.setdefault('scanned', 0)
+    stats['stopped'] = None
+
+    done = None
+    history = None
+    if sweep is not None or use_history:
+        from db.database import (recupera_storico_risultati, inizia_sweep, salva_avanzamento_sweep, completa_sweep,
+                                 aggiorna_stato_scansione, STATO_COMPLETATO, STATO_INTERROTTO)
+        if use_history:
+            history = recupera_storico_risultati()
+        if sweep is not None:
+            done = inizia_sweep(sweep, os.path.abspath(directory))
+
+    plan = plan_scan(directory, history, done, stats, walk_options)
+    selected, stopped = budget.select(plan)
+    stats['planned'] = len(plan)
+    stats['remaining'] = len(plan)
+
+    task = functools.partial(_scan_task, use_mmap=use_mmap, registry=registry, max_size=max_size)
+    if not workers:
+        workers = os.cpu_count() or 1
+    # Blocchi di file inviati insieme: la durata viene controllata tra un blocco e l'altro
+    batch = 1 if workers == 1 else workers * chunksize
+
+    pending = []   # Voci del cursore ancora da scrivere
+    findings = []  # Risultati dei file in pending, salvati con il cursore se c'è scan_id
+    pool = None
+    try:
+        if workers > 1:
+            pool = multiprocessing.Pool(processes=workers)
+        for start in range(0, len(selected), batch):
+            if budget.expired():
+                stopped = STOP_TIME
+                break
+            entries = [(path, st) for _, path, st in selected[start:start + batch]]
+            outcomes = map(task, entries) if pool is None else pool.imap(task, entries, chunksize=chunksize)
+            for (file_path, st), file_results in zip(entries, outcomes):
+                yield file_path, file_results
+                # Il chiamante ha elaborato i risultati: il file può entrare nel cursore
+                stats['scanned'] += 1
+                stats['remaining'] -= 1
+                if sweep is not None:
+                    pending.append((os.path.abspath(file_path), st.st_size, st.st_mtime_ns, len(file_results)))
+                    findings.extend(file_results)
+                    if len(pending) >= CURSOR_BATCH_SIZE:
+                        salva_avanzamento_sweep(sweep, pending, scan_id, findings)
+                        pending, findings = [], []
+        stats['stopped'] = stopped or STOP_COMPLETED
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if sweep is not None:
+            salva_avanzamento_sweep(sweep, pending, scan_id, findings)
+            if stats['remaining'] == 0:
+                completa_sweep(sweep)
+            if scan_id is not None:
+                aggiorna_stato_scansione(scan_id, STATO_COMPLETATO if stats['stopped'] else STATO_INTERROTTO)
@@ -0,0 +1,153 @@
+import os
+import threading
+from collections import OrderedDict
+
+# Byte letti dall'inizio del file per decidere se è testo
+SNIFF_SIZE = 4096
+
+# Verdetti mantenuti in cache, indicizzati per (dispositivo, inode, mtime, dimensione)
+SNIFF_CACHE_SIZE = 65536
+
+# Verdetto per i file di testo; tutti gli altri verdetti indicano contenuto da non scansionare come testo
+TEXT = "text"
+BINARY = "binary"
+
+# Firme (magic number) dei formati più comuni: (offset, byte iniziali, tipo).
+# Le firme troppo corte per non comparire all'inizio di un testo (es. "MZ") sono escluse:
+# quei formati contengono comunque byte NUL nei primi KB
+MAGIC_NUMBERS = (
+    (0, b"PK\x03\x04", "zip"),
+    (0, b"PK\x05\x06", "zip"),  # Archivio zip vuoto
+    (0, b"\x1f\x8b", "gzip"),
+    *((0, b"BZh" + bytes([livello]), "bzip2") for livello in b"123456789"),
+    (0, b"\xfd7zXZ\x00", "xz"),
+    (0, b"7z\xbc\xaf\x27\x1c", "7z"),
+    (0, b"Rar!\x1a\x07", "rar"),
+    (0, b"\x28\xb5\x2f\xfd", "zstd"),
+    (257, b"ustar", "tar"),
+    (0, b"SQLite format 3\x00", "sqlite"),
+    (0, b"%PDF-", "pdf"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "ole"),  # Documenti Office 97-2003
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"\x7fELF", "elf"),
+    (0, b"\xca\xfe\xba\xbe", "java-class"),
+    (0, b"\xff\xfe", "utf-16"),  # BOM UTF-16: testo che lo scanner (UTF-8) non sa leggere
+    (0, b"\xfe\xff", "utf-16"),
+)
+
+# Byte di controllo che non compaiono nel testo (tab, a capo, form feed, backspace ed ESC sono ammessi)
+_CONTROLLO = bytes(c for c in range(32) if c not in b"\t\n\r\f\b\x1b") + b"\x7f"
+_TOGLI_CONTROLLO = bytes.maketrans(b"", b"")
+
+# Quota massima di byte di controllo ammessa in un campione di testo
+MAX_CONTROL_RATIO = 0.10
+
+# Quota massima di byte non ASCII ammessa se il campione non è UTF-8 valido (es. latin-1)
+MAX_HIGH_RATIO = 0.30
+
+
+def _magic(data):
+    """Tipo del formato riconosciuto dalla firma iniziale, o None."""
+    for offset, firma, tipo in MAGIC_NUMBERS:
+        if data.startswith(firma, offset):
+            return tipo
+    return None
+
+def sniff_bytes(data, truncated=True):
+    """
+    Classifica un campione di byte preso dall'inizio di un file.
+
+    Args:
+        data (bytes): Campione da classificare
+        truncated (bool): True se il campione non arriva alla fine del file
+            (l'ultimo carattere UTF-8 può essere tagliato a metà)
+
+    Returns:
+        str: TEXT, il tipo riconosciuto dalla firma (es. "zip", "png") o BINARY
+    """
+    tipo = _magic(data)
+    if tipo is not None:
+        return tipo
+    if not data:
+        return TEXT
+
+    # Il byte NUL non compare mai nel testo UTF-8 o latin-1
+    if b"\x00" in data:
+        return BINARY
+
+    # Troppi caratteri di controllo: dati binari senza firma nota
+    controllo = len(data) - len(data.translate(_TOGLI_CONTROLLO, _CONTROLLO))
+    if controllo > len(data) * MAX_CONTROL_RATIO:
+        return BINARY
+
+    if data.isascii():
+        return TEXT
+
+    # Testo UTF-8 (es. italiano con lettere accentate); un carattere tagliato dal campione è ammesso
+    try:
+        data.decode("utf-8")
+        return TEXT
+    except UnicodeDecodeError as e:
+        if truncated and e.reason == "unexpected end of data" and e.end == len(data):
+            return TEXT
+
+    # Non UTF-8: accettato come testo a 8 bit solo se i byte non ASCII sono una minoranza
+    alti = len(data) - len(data.translate(_TOGLI_CONTROLLO, bytes(range(128, 256))))
+    return TEXT if alti <= len(data) * MAX_HIGH_RATIO else BINARY
+
+
+# Cache LRU dei verdetti, condivisa tra i thread dello stesso processo
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def sniff_file(file_path, st=None):
+    """
+    Classifica un file leggendone solo i primi SNIFF_SIZE byte.
+
+    Il verdetto è memorizzato per (dispositivo, inode, mtime, dimensione): finché il file
+    non cambia, le chiamate successive non lo riaprono.
+
+    Args:
+        file_path (str): Percorso del file
+        st (os.stat_result): Risultato di stat già disponibile (evita una seconda stat)
+
+    Returns:
+        str: TEXT, il tipo riconosciuto dalla firma o BINARY
+
+    Raises:
+        OSError: Se il file non può essere letto
+    """
+    if st is None:
+        st = os.stat(file_path)
+    chiave = (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    # Senza inode (alcuni filesystem restituiscono 0) la chiave non identifica il file
+    if st.st_ino:
+        with _cache_lock:
+            verdetto = _cache.get(chiave)
+            if verdetto is not None:
+                _cache.move_to_end(chiave)
+                return verdetto
+
+    with open(file_path, "rb") as f:
+        data = f.read(SNIFF_SIZE)
+    verdetto = sniff_bytes(data, truncated=st.st_size > len(data))
+
+    if st.st_ino:
+        with _cache_lock:
+            _cache[chiave] = verdetto
+            if len(_cache) > SNIFF_CACHE_SIZE:
+                _cache.popitem(last=False)
+    return verdetto
+
+def is_text_file(file_path, st=None):
+    """True se sniff_file classifica il file come testo."""
+    return sniff_file(file_path, st) == TEXT
+
+def clear_sniff_cache():
+    """Svuota la cache dei verdetti."""
+    with _cache_lock:
+        _cache.clear()
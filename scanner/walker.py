@@ -0,0 +1,396 @@
+import os
+import re
+import stat
+import threading
+
+# Directory e suffissi esclusi dalla scansione ricorsiva
+EXCLUDED_DIRS = {'.git', '__pycache__', '.svn', 'node_modules', '.idea', '.vscode'}
+EXCLUDED_SUFFIXES = ('.tmp', '.temp', '.bak', '.swp')
+
+# File di regole di esclusione (sintassi di .gitignore) letto in ogni directory attraversata
+IGNORE_FILENAME = ".privacywatcherignore"
+
+# Regole predefinite, equivalenti alle esclusioni storiche: file nascosti (ma non le
+# directory nascoste), directory di strumenti e cache, file temporanei
+DEFAULT_IGNORE_RULES = (
+    [".*", "!.*/"]
+    + [f"{d}/" for d in sorted(EXCLUDED_DIRS)]
+    + [f"*{suffix}" for suffix in EXCLUDED_SUFFIXES]
+)
+
+# Politiche per i collegamenti simbolici: ignorarli, seguire solo quelli a file
+# (comportamento storico) o seguire anche quelli a directory
+SYMLINKS_SKIP = "skip"
+SYMLINKS_FILES = "files"
+SYMLINKS_FOLLOW = "follow"
+SYMLINK_POLICIES = (SYMLINKS_SKIP, SYMLINKS_FILES, SYMLINKS_FOLLOW)
+
+
+def _traduci_glob(pattern):
+    """Traduce un glob in stile .gitignore (*, ?, [...], **) in una regex sui percorsi con '/'."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            # '**' come componente intero: qualsiasi numero di directory
+            if pattern.startswith("**", i) and (i == 0 or pattern[i - 1] == "/"):
+                fine = i + 2
+                if fine == n:
+                    out.append(".*")
+                    i = fine
+                    continue
+                if pattern[fine] == "/":
+                    out.append("(?:.*/)?")
+                    i = fine + 1
+                    continue
+            out.append("[^/]*")
+            while i < n and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = i + 1
+            if j < n and pattern[j] in "!^":
+                j += 1
+            if j < n and pattern[j] == "]":
+                j += 1
+            while j < n and pattern[j] != "]":
+                j += 1
+            if j >= n:
+                out.append(re.escape(c))  # Parentesi non chiusa: carattere letterale
+            else:
+                classe = pattern[i + 1:j].replace("\\", "\\\\")
+                if classe[0] in "!^":
+                    classe = "^" + classe[1:]
+                out.append(f"[{classe}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    Regole di esclusione con la sintassi di .gitignore, relative a una directory base.
+
+    Sono supportati commenti (#), negazioni (!), regole solo per directory (barra finale),
+    regole ancorate alla base (barra iniziale o interna) e i glob *, ?, [...] e **.
+    Come in git, vale l'ultima regola che corrisponde.
+
+    Args:
+        lines (iterable): Righe delle regole
+        base (str): Percorso della directory base relativo alla radice della scansione ('' = radice)
+    """
+
+    def __init__(self, lines=(), base=""):
+        self.base = base
+        self.rules = []  # Tuple (regex compilata, negata, solo directory)
+        for line in lines:
+            self.add(line)
+
+    @classmethod
+    def from_file(cls, file_path, base=""):
+        """Legge le regole da un file; un file illeggibile non aggiunge regole."""
+        try:
+            with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+                return cls(f.read().splitlines(), base)
+        except OSError:
+            return cls((), base)
+
+    def add(self, line):
+        """Aggiunge una regola (le righe vuote e i commenti vengono ignorati)."""
+        line = line.rstrip("\n\r")
+        # Spazi finali ignorati, salvo se protetti da '\'
+        if not line.endswith("\\ "):
+            line = line.rstrip(" ")
+        if not line or line.startswith("#"):
+            return
+        negated = line.startswith("!")
+        if negated:
+            line = line[1:]
+        elif line.startswith("\\!") or line.startswith("\\#"):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return
+        # Con una barra all'inizio o in mezzo la regola è relativa alla base, altrimenti vale a ogni livello
+        if "/" in line:
+            regex = _traduci_glob(line.lstrip("/"))
+        else:
+            regex = "(?:.*/)?" + _traduci_glob(line)
+        self.rules.append((re.compile(regex + r"\Z", re.DOTALL), negated, dir_only))
+
+    def match(self, rel_path, is_dir=False):
+        """
+        Verifica un percorso relativo alla base (con separatori '/').
+
+        Returns:
+            bool | None: True se escluso, False se reincluso da una negazione, None se nessuna regola corrisponde
+        """
+        esito = None
+        for regex, negated, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                esito = not negated
+        return esito
+
+    def __bool__(self):
+        return bool(self.rules)
+
+
+def _is_ignored(rules, rel_path, is_dir):
+    # Le regole delle directory più interne, applicate per ultime, prevalgono
+    esito = None
+    for r in rules:
+        percorso = rel_path[len(r.base) + 1:] if r.base else rel_path
+        risultato = r.match(percorso, is_dir)
+        if risultato is not None:
+            esito = risultato
+    return bool(esito)
+
+class WalkState:
+    """
+    Stato di un attraversamento: opzioni, directory già visitate e contatori.
+
+    Divide il lavoro di walk_files in passi indipendenti (lettura di una directory,
+    stat di un file) che possono essere eseguiti anche da più thread, ad esempio
+    dalla pipeline asincrona su filesystem di rete. Gli argomenti sono quelli di walk_files.
+    """
+
+    def __init__(self, directory, stats=None, max_depth=None, same_filesystem=False, symlinks=SYMLINKS_FILES,
+                 ignore_rules=DEFAULT_IGNORE_RULES, ignore_files=(IGNORE_FILENAME,)):
+        if symlinks not in SYMLINK_POLICIES:
+            raise ValueError(f"Politica per i collegamenti simbolici non valida: {symlinks}")
+        if stats is None:
+            stats = {}
+        stats.setdefault('skipped', 0)
+        self.directory = directory
+        self.stats = stats
+        self.max_depth = max_depth
+        self.same_filesystem = same_filesystem
+        self.symlinks = symlinks
+        self.follow_dirs = symlinks == SYMLINKS_FOLLOW
+        self.ignore_files = ignore_files
+        self.base_rules = [IgnoreRules(ignore_rules)] if ignore_rules else []
+        self.root_dev = None
+        self.visited = set()  # Directory già attraversate (dispositivo, inode), contro i cicli di collegamenti
+        self._lock = threading.Lock()
+
+    def root(self):
+        """
+        Prima directory da leggere, come tupla (percorso, percorso relativo, profondità, regole attive).
+
+        Returns:
+            tuple | None: None se la radice non è accessibile (solo quando serve la sua stat)
+        """
+        if self.same_filesystem or self.follow_dirs:
+            try:
+                st = os.stat(self.directory)
+            except OSError:
+                return None
+            self.root_dev = st.st_dev
+            self.visited.add((st.st_dev, st.st_ino))
+        return (self.directory, "", 0, self.base_rules)
+
+    def directory_rules(self, path, rel_dir, rules, names=None):
+        """
+        Regole attive in una directory: quelle ereditate più quelle dei suoi file di esclusione.
+
+        Args:
+            path (str): Directory
+            rel_dir (str): Suo percorso relativo alla radice ('' = radice)
+            rules (list): Regole ereditate dalle directory superiori
+            names (set): Nomi dei file di esclusione presenti, se già letti (None = cercati su disco)
+        """
+        for name in self.ignore_files:
+            file_path = os.path.join(path, name)
+            if name in names if names is not None else os.path.isfile(file_path):
+                nuove = IgnoreRules.from_file(file_path, rel_dir)
+                if nuove:
+                    rules = rules + [nuove]
+        return rules
+
+    def accept_directory(self, path, rel_path, depth, rules, entry=None, check_cycles=True):
+        """
+        Indica se una sottodirectory di una directory a profondità depth va attraversata:
+        profondità massima, regole di esclusione, filesystem e cicli di collegamenti.
+        entry è la sua voce os.DirEntry, se disponibile (evita una stat).
+        """
+        if (self.max_depth is not None and depth >= self.max_depth) or _is_ignored(rules, rel_path, True):
+            return False
+        if self.root_dev is not None:
+            try:
+                st = entry.stat(follow_symlinks=self.follow_dirs) if entry is not None else os.stat(path, follow_symlinks=self.follow_dirs)
+            except OSError:
+                return False
+            if self.same_filesystem and st.st_dev != self.root_dev:
+                return False
+            if self.follow_dirs and check_cycles:
+                key = (st.st_dev, st.st_ino)
+                with self._lock:
+                    if key in self.visited:
+                        return False
+                    self.visited.add(key)
+        return True
+
+    def locate(self, directory):
+        """
+        Ripercorre dalla radice il cammino fino a una directory, con le stesse regole
+        dell'attraversamento, senza leggere le altre directory (es. per il monitor, che
+        riceve i percorsi dagli eventi del filesystem).
+
+        Returns:
+            tuple | None: Tupla da passare a read_directory, None se l'attraversamento non ci entrerebbe
+        """
+        rel = os.path.relpath(directory, self.directory)
+        if rel == os.curdir:
+            return self.root()
+        if rel == os.pardir or rel.startswith(os.pardir + os.sep):
+            return None
+        node = self.root()
+        if node is None:
+            return None
+        path, rel_dir, depth, rules = node
+        for name in rel.split(os.sep):
+            rules = self.directory_rules(path, rel_dir, rules)
+            child = os.path.join(path, name)
+            rel_path = f"{rel_dir}/{name}" if rel_dir else name
+            if not os.path.isdir(child) or not self.accept_directory(child, rel_path, depth, rules, check_cycles=False):
+                return None
+            path, rel_dir, depth = child, rel_path, depth + 1
+        return (path, rel_dir, depth, rules)
+
+    def stat_path(self, path):
+        """
+        Applica a un singolo file le regole dell'attraversamento (esclusioni delle directory
+        che lo contengono, collegamenti simbolici, filesystem) e ne restituisce la stat.
+
+        Returns:
+            os.stat_result | None: None se il file non verrebbe scansionato o non è accessibile
+        """
+        node = self.locate(os.path.dirname(path))
+        if node is None:
+            return None
+        directory, rel_dir, _, rules = node
+        rules = self.directory_rules(directory, rel_dir, rules)
+        name = os.path.basename(path)
+        try:
+            if self.symlinks == SYMLINKS_SKIP and os.path.islink(path):
+                return None
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode) or _is_ignored(rules, f"{rel_dir}/{name}" if rel_dir else name, False):
+            return None
+        if self.same_filesystem and st.st_dev != self.root_dev:
+            return None
+        return st
+
+    def read_directory(self, path, rel_dir, depth, rules):
+        """
+        Legge una directory con os.scandir e la divide in file da scansionare e sottodirectory.
+
+        Returns:
+            tuple: (voci os.DirEntry dei file non esclusi, ancora senza stat,
+                    sottodirectory come tuple da passare di nuovo a read_directory)
+        """
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            return [], []  # Directory illeggibile: saltata, come fa os.walk
+
+        # Le regole dei file di esclusione valgono per la directory che li contiene e per quelle interne
+        if self.ignore_files:
+            rules = self.directory_rules(path, rel_dir, rules,
+                                         {entry.name for entry in entries if entry.name in self.ignore_files and entry.is_file()})
+
+        files = []
+        subdirs = []
+        skipped = 0
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            try:
+                is_link = entry.is_symlink()
+                is_dir = entry.is_dir(follow_symlinks=self.follow_dirs)
+            except OSError:
+                continue
+
+            if is_dir:
+                if self.accept_directory(entry.path, rel_path, depth, rules, entry):
+                    subdirs.append((entry.path, rel_path, depth + 1, rules))
+                continue
+
+            if is_link and self.symlinks == SYMLINKS_SKIP:
+                skipped += 1
+                continue
+            try:
+                if not entry.is_file():
+                    continue  # Socket, FIFO, dispositivi, collegamenti interrotti o a directory
+            except OSError:
+                continue
+            if _is_ignored(rules, rel_path, False):
+                skipped += 1
+                continue
+            files.append(entry)
+
+        if skipped:
+            with self._lock:
+                self.stats['skipped'] += skipped
+        return files, subdirs
+
+    def stat_file(self, entry):
+        """Stat di un file restituito da read_directory (None se non accessibile o su un altro filesystem)."""
+        try:
+            st = entry.stat()
+        except OSError:
+            return None
+        if self.same_filesystem and st.st_dev != self.root_dev:
+            return None
+        return st
+
+
+def walk_files(directory, stats=None, max_depth=None, same_filesystem=False, symlinks=SYMLINKS_FILES,
+               ignore_rules=DEFAULT_IGNORE_RULES, ignore_files=(IGNORE_FILENAME,)):
+    """
+    Attraversa una directory con os.scandir e genera (percorso, stat) per ogni file da scansionare.
+
+    Il tipo delle voci arriva da scandir senza chiamate aggiuntive e ogni file viene
+    sottoposto a una sola stat, il cui risultato viene restituito per essere riusato.
+    I percorsi sono generati durante l'attraversamento, in profondità e con i file di
+    ogni directory prima delle sue sottodirectory, come os.walk.
+
+    Args:
+        directory (str): Directory radice
+        stats (dict): Contatori aggiornati durante l'attraversamento ('skipped': file esclusi)
+        max_depth (int): Livelli di sottodirectory da attraversare (None = nessun limite, 0 = solo la radice)
+        same_filesystem (bool): Non entra nelle directory montate da altri filesystem
+        symlinks (str): Politica per i collegamenti simbolici (uno di SYMLINK_POLICIES)
+        ignore_rules (iterable): Regole di esclusione relative alla radice (sintassi .gitignore)
+        ignore_files (tuple): Nomi dei file di regole letti in ogni directory (es. ".gitignore")
+
+    Returns:
+        generator: Tuple (percorso, os.stat_result)
+    """
+    walk = WalkState(directory, stats, max_depth, same_filesystem, symlinks, ignore_rules, ignore_files)
+    root = walk.root()
+    if root is None:
+        return
+    # Pila delle directory da leggere
+    stack = [root]
+    while stack:
+        files, subdirs = walk.read_directory(*stack.pop())
+        for entry in files:
+            st = walk.stat_file(entry)
+            if st is not None:
+                yield entry.path, st
+        # In ordine inverso sulla pila, per attraversarle nell'ordine di scandir
+        stack.extend(reversed(subdirs))
@@ -0,0 +1,27 @@
+import pytest
+
+from db import database
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # Database di prova: mai data/logs.db
+    monkeypatch.setattr(database, "DB_PATH", str(tmp_path / "test.db"))
+    yield database
+    database.chiudi_connessione()
+
+@pytest.fixture
+def make_tree(tmp_path):
+    # Crea la directory tmp_path/dati con i file clienti_<i>.txt e ne restituisce il percorso.
+    # Il file i contiene riga (formattata con i) ripetuta i + 1 volte; con sottocartella=True
+    # i file dispari vanno in dati/sotto.
+    def make(files, riga="cliente{i}@example.com\n", sottocartella=False):
+        root = tmp_path / "dati"
+        root.mkdir()
+        if sottocartella:
+            (root / "sotto").mkdir()
+        for i in range(files):
+            cartella = root / "sotto" if sottocartella and i % 2 else root
+            (cartella / f"clienti_{i}.txt").write_text(riga.format(i=i) * (i + 1))
+        return str(root)
+    return make
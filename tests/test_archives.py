@@ -0,0 +1,38 @@
+import os
+import sys
+import gzip
+import subprocess
+
+# Radice del repository, per eseguire lo scanner in un processo separato
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lunghezza della riga senza a capo contenuta nell'archivio
+LINE_MB = 100
+
+# Memoria massima (picco RSS) ammessa per la scansione: dipende dalle finestre di
+# iter_lines, non dalla lunghezza della riga (tenerla in memoria supererebbe il limite)
+MAX_RSS_MB = 80
+
+# Scansiona il file indicato e stampa i risultati trovati e il picco RSS del processo in MB
+_SCAN = """
+import sys, resource
+from scanner.scanner import iter_scan_file
+found = sum(1 for _ in iter_scan_file(sys.argv[1], max_size=None))
+print(found, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024)
+"""
+
+
+def test_gzip_member_without_newlines_has_bounded_memory(tmp_path):
+    # Un .gz di circa 100 KB che contiene una sola riga di 100 MB, con un'email alla fine
+    path = tmp_path / "bomb.gz"
+    block = b"A" * (1024 * 1024)
+    with gzip.open(path, "wb", compresslevel=9) as f:
+        for _ in range(LINE_MB):
+            f.write(block)
+        f.write(b" mario.rossi@example.com")
+    assert path.stat().st_size < 1024 * 1024
+
+    output = subprocess.run([sys.executable, "-c", _SCAN, str(path)], cwd=ROOT, capture_output=True, text=True, check=True)
+    found, rss_mb = map(int, output.stdout.split())
+    assert found == 1
+    assert rss_mb < MAX_RSS_MB
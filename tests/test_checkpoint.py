@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from scanner.scanner import iter_scan_directory
+from scanner.checkpoint import start_scan, iter_scan_checkpointed
+
+FILES = 8
+
+
+@pytest.fixture
+def tree(make_tree):
+    return make_tree(FILES, riga="cliente{i}@example.com, tel. +39 333 123456{i}\n", sottocartella=True)
+
+def _chiave(finding):
+    return finding["file"], finding["line"], finding["data_type"], finding["match"]
+
+
+def test_checkpointed_scan_resumes_by_scan_id(db, tree):
+    atteso = sorted(_chiave(f) for _, results in iter_scan_directory(tree) for f in results)
+    scan_id = start_scan(tree, "Report_checkpoint.txt", {"workers": 1})
+
+    # Interrotta dopo tre file: quelli ricevuti dal chiamante sono salvati con i loro risultati
+    scan = iter_scan_checkpointed(scan_id, tree, checkpoint_files=2)
+    first = [next(scan)[0] for _ in range(3)]
+    scan.close()
+    saved = db.recupera_scansione(scan_id)
+    assert saved["stato"] == db.STATO_INTERROTTO
+    assert saved["file_elaborati"] == 3
+    assert db.recupera_file_elaborati(scan_id) == set(first)
+
+    # La ripresa salta i file già elaborati e completa la stessa scansione:
+    # cinque file, due checkpoint da due più l'ultimo con il file rimasto
+    stats = {}
+    rest = [path for path, _ in iter_scan_checkpointed(scan_id, tree, stats=stats, checkpoint_files=2)]
+    assert stats['resumed'] == 3 and stats['checkpoints'] == 3
+    assert sorted(first + rest) == sorted(os.path.join(dirpath, name) for dirpath, _, names in os.walk(tree) for name in names)
+
+    saved = db.recupera_scansione(scan_id)
+    assert saved["stato"] == db.STATO_COMPLETATO
+    assert saved["file_elaborati"] == FILES
+    assert sorted(_chiave(f) for f in db.recupera_risultati_scansione(scan_id)) == atteso
+
+def test_resuming_a_completed_scan_finds_nothing_new(db, tree):
+    scan_id = start_scan(tree, "Report_completo.txt")
+    stats = {}
+    assert len(list(iter_scan_checkpointed(scan_id, tree, stats=stats))) == FILES
+    assert stats['checkpoints'] == 1
+    # Nessun file in sospeso: nessun checkpoint da scrivere
+    stats = {}
+    assert list(iter_scan_checkpointed(scan_id, tree, stats=stats)) == []
+    assert stats['checkpoints'] == 0
+    assert db.recupera_scansione(scan_id)["risultati"] == sum(len(results) for _, results in iter_scan_directory(tree))
+
+@pytest.mark.parametrize("ogni, checkpoint", [(3, 3), (4, 2), (500, 1)])
+def test_cli_reports_every_checkpoint_written(db, tree, capsys, ogni, checkpoint):
+    import main
+
+    assert main.main(["scan", tree, "--checkpoint", "--checkpoint-every", str(ogni), "--format", "jsonl"]) == main.EXIT_OK
+    output = capsys.readouterr()
+    assert f"completata: {checkpoint} checkpoint salvati" in output.err
+    assert "[INFO]" not in output.out
@@ -0,0 +1,50 @@
+import os
+import sys
+import subprocess
+
+import pytest
+
+# Radice del repository, per eseguire la riga di comando in un processo separato
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Righe con dati sensibili: abbastanza da superare il buffer della pipe più volte
+LINES = 20000
+
+
+@pytest.mark.parametrize("format", ["txt", "jsonl", "csv", "sarif"])
+def test_closed_pipe_exits_quietly(tmp_path, format):
+    path = tmp_path / "clienti.txt"
+    path.write_text("".join(f"cliente{i}@example.com\n" for i in range(LINES)))
+
+    # Come "privacywatcher scan ... | head -1": il lettore chiude la pipe dopo la prima riga
+    process = subprocess.Popen([sys.executable, "main.py", "scan", str(path), "--format", format], cwd=ROOT,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    assert process.stdout.readline()
+    process.stdout.close()
+    stderr = process.stderr.read().decode()
+    assert process.wait() == 0
+    assert "Traceback" not in stderr and "BrokenPipeError" not in stderr
+
+
+@pytest.mark.parametrize("riferimento, esito, righe", [
+    ("{primo}", 0, 1),
+    ("{secondo}", 0, 2),
+    ("unico.txt", 0, 2),
+    ("doppio.txt", 2, 0),
+    ("mancante.txt", 2, 0),
+], ids=["id", "altro-id", "nome", "nome-ambiguo", "mancante"])
+def test_report_resolves_scan_by_id_or_name(db, capsys, riferimento, esito, righe):
+    import main
+
+    risultato = {"file": "clienti.txt", "line": 1, "content": "mario.rossi@example.com", "data_type": "Email",
+                 "match": "mario.rossi@example.com"}
+    primo = db.salva_scansione("/dati", [risultato], "doppio.txt", db.STATO_COMPLETATO)
+    secondo = db.salva_scansione("/dati", [risultato, dict(risultato, line=2)], "doppio.txt", db.STATO_COMPLETATO)
+    db.salva_scansione("/dati", [risultato, dict(risultato, line=2)], "unico.txt", db.STATO_COMPLETATO)
+
+    assert main.main(["report", riferimento.format(primo=primo, secondo=secondo), "--format", "jsonl"]) == esito
+    output = capsys.readouterr()
+    # Una riga per risultato, più il riepilogo finale
+    assert len([riga for riga in output.out.splitlines() if '"summary"' not in riga]) == righe
+    if riferimento == "doppio.txt":
+        assert f"id {secondo}, {primo}" in output.err
@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+
+_RISULTATO = {"file": "clienti.txt", "line": 1, "content": "mario.rossi@example.com", "data_type": "Email",
+              "match": "mario.rossi@example.com"}
+
+
+def _salva_il(db, timestamp, nome):
+    # Salva una scansione con il timestamp indicato ("YYYY-MM-DD HH:MM:SS")
+    scan_id = db.salva_scansione("/dati", [_RISULTATO], nome, db.STATO_COMPLETATO)
+    with db.get_connessione() as conn:
+        conn.execute("UPDATE scansioni SET timestamp = ? WHERE id = ?", (timestamp, scan_id))
+    return scan_id
+
+def _nomi(db, **filtri):
+    return [riga[2] for riga in db.recupera_report_pagina(**filtri)]
+
+
+@pytest.mark.parametrize("filtri, attesi", [
+    ({"data_fine": "2026-10-18"}, ["mattina", "sera", "ieri"]),
+    ({"data_fine": datetime.date(2026, 10, 18)}, ["mattina", "sera", "ieri"]),
+    ({"data_inizio": "2026-10-18"}, ["domani", "mattina", "sera"]),
+    ({"data_inizio": "2026-10-18", "data_fine": "2026-10-18"}, ["mattina", "sera"]),
+    ({"data_fine": "2026-10-18 12:00:00"}, ["mattina", "ieri"]),
+    ({"data_inizio": "2026-10-18T12:00"}, ["domani", "sera"]),
+], ids=["fine-giornata", "fine-giornata-date", "inizio-giornata", "stesso-giorno", "fine-con-ora", "inizio-con-ora"])
+def test_date_filters_include_whole_days(db, filtri, attesi):
+    for timestamp, nome in [("2026-10-17 20:00:00", "ieri"), ("2026-10-18 09:00:00", "mattina"),
+                            ("2026-10-18 23:30:00", "sera"), ("2026-10-19 08:00:00", "domani")]:
+        _salva_il(db, timestamp, nome)
+    assert sorted(_nomi(db, **filtri)) == sorted(attesi)
+
+def test_invalid_date_string_is_rejected(db):
+    with pytest.raises(ValueError):
+        db.recupera_report_pagina(data_fine="18/10/2026")
+
+def test_report_content_is_streamed_by_scan_id(db):
+    primo = db.salva_scansione("/dati", [_RISULTATO], "clienti.txt", db.STATO_COMPLETATO)
+    secondo = db.salva_scansione("/dati", [_RISULTATO, dict(_RISULTATO, line=2)], "clienti.txt", db.STATO_COMPLETATO)
+    assert db.recupera_id_scansioni("clienti.txt") == [secondo, primo]
+    risultati = db.recupera_contenuto_report(secondo)
+    assert iter(risultati) is risultati
+    assert [r["line"] for r in risultati] == [1, 2]
+    assert db.recupera_contenuto_report(secondo + 1) is None
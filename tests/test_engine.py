@@ -0,0 +1,66 @@
+import random
+
+from utils.patterns import patterns, versione_bytes
+from scanner.scanner import get_engine, _ascii_safe
+
+# Righe del corpus casuale e seme del generatore (il corpus è sempre lo stesso)
+LINES = 20000
+SEED = 1234
+
+# Frammenti che fanno scattare (o quasi) i pattern: cifre, separatori, '@', parole chiave
+# e i caratteri non ASCII che con IGNORECASE corrispondono a lettere ASCII
+_FRAMMENTI = (
+    "mario.rossi@example.com", "a@b", "@", "x@y.it", "user_1+tag@mail.test", "rossi@", "@example.org",
+    "IT60X0542811101000000123456", "DE89370400440532013000", "it60 x054", "RSSMRA85T10A562S", "rssmra85t10a562s",
+    "4111 1111 1111 1111", "4111-1111-1111-1111", "5500000000000004", "3782 822463 10005", "1234 5678",
+    "+39 333 1234567", "+39 06 1234567", "3331234567", "02-12345678", "+44 20 7946 0958",
+    "P.IVA 12345678901", "P IVA: 12345678901", "partita iva 1234567890", "12345678901 CF", "codice fiscale",
+    "password: s3gr3t0", "pwd=abcd", "PASS = 'qwerty'", "passwd:", "parola_chiave=xyzw", "chiave : 1234",
+    "ABC 123 D45", "carta d'identità n. AB1234567", "passaporto numero: YA1234567", "patente AB1234567C",
+    "via Roma 12", "Viale dei Mille, 3 - 00185 Roma", "piazza  Duomo", "corso", "strada statale 7",
+    "00186", "20121", "99999", "192.168.1.254", "10.0.0.1", "256.1.1.1", "1.2.3", "1.2.3.4.5",
+    "ABI: 03069", "CAB = 01600", "CIN:X", "SWIFT: BCITITMM", "BIC=UNCRITMMXXX",
+    "inps: 123456789", "codice inail = 12345678", "numero previdenziale: 123456789012",
+    "İstanbul", "ıd", "ſtrada", "\u212aelvin", "١٢٣٤٥", "\x1c", "\x1f", "è", "—", "\t", "  ",
+)
+_PAROLE = ("log", "utente", "ordine", "the", "value", "id", "x", "ok", "via", "ci", "iva", ":", "=", ",", "-", ".")
+
+
+def _corpus(rng):
+    for _ in range(LINES):
+        parti = []
+        for _ in range(rng.randint(0, 12)):
+            r = rng.random()
+            if r < 0.45:
+                parti.append(rng.choice(_FRAMMENTI))
+            elif r < 0.8:
+                parti.append(rng.choice(_PAROLE))
+            else:
+                parti.append("".join(rng.choice("0123456789 -.@:abcXYZ") for _ in range(rng.randint(1, 20))))
+        yield rng.choice((" ", "", ", ", "  ")).join(parti) + rng.choice(("", "\n"))
+
+def _expected(line, compiled):
+    # Il ciclo su tutti i pattern sostituito dal motore, limitato ai tipi con almeno un match
+    return [(label, found) for label, found in ((label, p.findall(line)) for label, p in compiled.items()) if found]
+
+
+def test_engine_findall_matches_pattern_loop():
+    engine = get_engine()
+    for line in _corpus(random.Random(SEED)):
+        assert engine.findall(line) == _expected(line, patterns), line
+
+def test_bytes_engine_matches_pattern_loop_on_ascii():
+    engine = get_engine(binario=True)
+    compiled = {label: versione_bytes(p) for label, p in patterns.items()}
+    checked = 0
+    for line in _corpus(random.Random(SEED)):
+        data = line.encode("utf-8")
+        if not _ascii_safe(data):
+            continue
+        checked += 1
+        assert engine.findall(data) == _expected(data, compiled), line
+        # Sul testo ASCII i match sui byte sono quelli dei pattern su str
+        decoded = [(label, [m.decode() if isinstance(m, bytes) else tuple(g.decode() for g in m) for m in found])
+                   for label, found in engine.findall(data)]
+        assert decoded == _expected(line, patterns), line
+    assert checked > LINES // 2
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+from scanner.walker import WalkState, walk_files
+from monitor.monitor import InotifyWatcher, PollingWatcher
+
+# Albero di prova: file inclusi ed esclusi dalle regole predefinite e da .privacywatcherignore
+_FILES = (
+    "a.txt", ".nascosto.txt", "b.bak", "c.skip",
+    "dati/d.log", "dati/segreti/e.txt", "dati/.privacywatcherignore",
+    ".git/config", "node_modules/f.js", "profondo/1/2/g.txt",
+)
+_IGNORE = {
+    ".privacywatcherignore": "*.skip\n",
+    "dati/.privacywatcherignore": "segreti/\n",
+}
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for rel in _FILES:
+        path = tmp_path / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("mario.rossi@example.com\n")
+    for rel, rules in _IGNORE.items():
+        (tmp_path / rel).write_text(rules)
+    return str(tmp_path)
+
+def _all_files(root):
+    return {os.path.join(current, name) for current, _, names in os.walk(root) for name in names}
+
+
+@pytest.mark.parametrize("walk_options", [{}, {"max_depth": 1}])
+def test_stat_path_agrees_with_walk_files(tree, walk_options):
+    expected = {path for path, _ in walk_files(tree, **walk_options)}
+    assert os.path.join(tree, "a.txt") in expected
+    assert os.path.join(tree, "dati", "segreti", "e.txt") not in expected
+    walk = WalkState(tree, **walk_options)
+    assert {path for path in _all_files(tree) if walk.stat_path(path) is not None} == expected
+
+def test_polling_watcher_snapshot_is_walk_files(tree):
+    watcher = PollingWatcher([tree], walk_options={"max_depth": 2})
+    assert set(watcher.snapshot) == {path for path, _ in walk_files(tree, max_depth=2)}
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify è disponibile solo su Linux")
+def test_inotify_watches_the_directories_of_walk_files(tree):
+    watcher = InotifyWatcher([tree])
+    try:
+        watched = set(watcher._watches.values())
+    finally:
+        watcher.close()
+    # Non .git, node_modules e dati/segreti, escluse dalle regole
+    assert watched == {tree} | {os.path.join(tree, rel) for rel in ("dati", "profondo", "profondo/1", "profondo/1/2")}
@@ -0,0 +1,100 @@
+import re
+import random
+
+import pytest
+
+from utils.patterns import patterns, versione_bytes
+from benchmark.corpus import genera_email, genera_telefono
+from benchmark.regex_timing import cronometra, SOGLIA_ESPONENTE
+
+SEED = 1234
+RIGHE = 3000
+
+# Pattern originali, prima della riscrittura in tempo lineare: i nuovi devono trovare gli stessi match
+_ORIGINALI = {
+    "Email": re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", re.IGNORECASE),
+    "Telefono": re.compile(r"""
+        (?:
+            (?:\+39\s?)?(?:0\d{1,4}[\s\-]?)?\d{6,11}
+            |
+            (?:\+39\s?)?3\d{2}[\s\-]?\d{6,7}
+            |
+            (?:\+\d{1,3}[\s\-]?)?\d{6,15}
+        )
+    """, re.VERBOSE),
+    "Codice Fiscale Azienda": re.compile(r"\b\d{11}\b(?=.*(?:codice\s+fiscale|CF|P\.?\s*IVA))", re.IGNORECASE),
+}
+
+# Frammenti da cui comporre le righe: quasi-match, separatori, parole chiave, a capo
+# e caratteri non ASCII che con IGNORECASE corrispondono a lettere ASCII (İ, ı, ſ, K)
+_FRAMMENTI = [
+    "a@", "@", ".", "a.b", "x", "_", "%", "-", "+", "+39", "+39 ", "+1-", "+44", "0", "3", "333", "02",
+    "12345678901", "1234567", "123456789012345678", " ", "  ", "\t", "\n", "\x1c",
+    "codice fiscale", "Codice  Fiscale", "CF", "cf", "P.IVA", "p iva", "PIVA",
+    "\u00e9", "\u0130", "\u0131", "\u017f", "\u212a", "mario.rossi@example.com", "info@dominio.it",
+]
+
+
+def _righe():
+    # Righe casuali riproducibili composte da frammenti, email e telefoni generati
+    rng = random.Random(SEED)
+    righe = []
+    for _ in range(RIGHE):
+        pezzi = []
+        for _ in range(rng.randrange(1, 13)):
+            scelta = rng.random()
+            if scelta < 0.1:
+                pezzi.append(genera_email(rng))
+            elif scelta < 0.2:
+                pezzi.append(genera_telefono(rng))
+            else:
+                pezzi.append(rng.choice(_FRAMMENTI))
+        righe.append(rng.choice(["", " "]).join(pezzi))
+    return righe
+
+def _match(pattern, testo):
+    return [(m.span(), m.group()) for m in pattern.finditer(testo)]
+
+
+@pytest.mark.parametrize("label", sorted(_ORIGINALI))
+def test_linear_pattern_matches_original(label):
+    originale, pattern = _ORIGINALI[label], patterns[label]
+    righe = _righe()
+    assert any(_match(originale, riga) for riga in righe)
+    for riga in righe:
+        assert _match(pattern, riga) == _match(originale, riga), riga
+        assert pattern.findall(riga) == originale.findall(riga), riga
+
+@pytest.mark.parametrize("label", sorted(_ORIGINALI))
+def test_linear_pattern_bytes_version_matches_original(label):
+    # Sui byte l'equivalenza vale per il testo ASCII senza i separatori \x1c-\x1f (vedi versione_bytes)
+    originale = versione_bytes(_ORIGINALI[label])
+    pattern = versione_bytes(patterns[label])
+    for riga in _righe():
+        if not riga.isascii() or "\x1c" in riga:
+            continue
+        riga = riga.encode("ascii")
+        assert _match(pattern, riga) == _match(originale, riga), riga
+
+
+# Righe ostili per i pattern riscritti: con le regex originali alcune sono quadratiche
+# (frammento ripetuto, fine della riga)
+@pytest.mark.parametrize("label, frammento, fine", [
+    ("Email", "a@", ""),
+    ("Email", "a.", ""),
+    ("Email", "a", "@"),
+    ("Telefono", "1", ""),
+    ("Telefono", "1 ", ""),
+    ("Telefono", "+39 1-", ""),
+    ("Codice Fiscale Azienda", "12345678901 ", ""),
+    ("Codice Fiscale Azienda", "12345678901 ", "cf"),
+], ids=["email-a@", "email-punti", "email-lettere", "telefono-cifre", "telefono-cifre-spazi", "telefono-prefissi",
+        "cfa-senza-parola", "cfa-parola-finale"])
+def test_linear_pattern_cost_grows_linearly(label, frammento, fine):
+    pattern = patterns[label]
+    corta = frammento * (20000 // len(frammento)) + fine
+    lunga = frammento * (160000 // len(frammento)) + fine
+    tempi = [cronometra(pattern, corta), cronometra(pattern, lunga)]
+    # Otto volte più lunga: costo lineare circa 8 volte, quadratico circa 64
+    assert tempi[1] < 1.0
+    assert tempi[1] <= max(tempi[0], 1e-3) * 8 ** SOGLIA_ESPONENTE
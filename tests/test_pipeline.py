@@ -0,0 +1,46 @@
+import gzip
+import zipfile
+
+import pytest
+
+from scanner import pipeline
+from scanner.scanner import iter_scan_directory
+from scanner.pipeline import iter_scan_directory_pipeline
+
+_RIGA = "Cliente {0}: cliente{0}@example.com, IBAN IT60X0542811101000000123456, tel. +39 333 1234567\n"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    testo = "".join(_RIGA.format(i) for i in range(50))
+    (tmp_path / "a.txt").write_text(testo)
+    (tmp_path / "vuoto.txt").write_text("")
+    (tmp_path / "nessun_dato.md").write_text("niente da segnalare\n" * 10)
+    (tmp_path / "sotto" / "profondo").mkdir(parents=True)
+    (tmp_path / "sotto" / "b.csv").write_text(testo.replace(",", ";"))
+    (tmp_path / "sotto" / "profondo" / "c.log").write_text(testo * 40)  # Oltre PREFETCH_SIZE ridotto
+    (tmp_path / "sotto" / "dati.gz").write_bytes(gzip.compress(testo.encode()))
+    with zipfile.ZipFile(tmp_path / "sotto" / "archivio.zip", "w") as archivio:
+        archivio.writestr("dentro.txt", testo)
+    (tmp_path / "immagine.png").write_bytes(b"\x89PNG\r\n\x1a\n" + bytes(100))
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "node_modules" / "escluso.txt").write_text(testo)
+    return str(tmp_path)
+
+def _ordinati(outcomes):
+    return sorted((path, results) for path, results in outcomes)
+
+
+@pytest.mark.parametrize("options", [
+    {},
+    {"max_size": 10000},
+    {"use_mmap": True},
+    {"walk_options": {"max_depth": 1}},
+], ids=["predefinite", "max_size", "mmap", "max_depth"])
+@pytest.mark.parametrize("io_workers", [1, 4])
+def test_pipeline_matches_iter_scan_directory(tree, monkeypatch, options, io_workers):
+    # I file oltre PREFETCH_SIZE vengono letti dalla fase di scansione: li include entrambi i percorsi
+    monkeypatch.setattr(pipeline, "PREFETCH_SIZE", 16 * 1024)
+    atteso = _ordinati(iter_scan_directory(tree, **options))
+    assert any(results for _, results in atteso)
+    assert _ordinati(iter_scan_directory_pipeline(tree, io_workers=io_workers, queue_size=2, **options)) == atteso
@@ -0,0 +1,64 @@
+import csv
+import json
+import os
+
+import pytest
+
+from scanner.results import ResultStore
+from report.report_generator import write_report, SARIF_VERSION, SARIF_SCHEMA
+
+# Testi con virgole, virgolette, a capo e caratteri non ASCII; un percorso assoluto con spazi
+_RISULTATI = [
+    {"file": "dati/clienti.csv", "line": 1, "content": 'mario@example.com, "Mario"', "data_type": "Email", "match": "mario@example.com"},
+    {"file": "dati/clienti.csv", "line": 1, "content": 'mario@example.com, "Mario"', "data_type": "Telefono", "match": "3331234567"},
+    {"file": os.path.abspath("note utente/città.txt"), "line": 42, "content": "riga\r\ncon a capo;\t",
+     "data_type": "Codice fiscale", "match": "RSSMRA85T10A562S"},
+]
+
+
+def _scrivi(tmp_path, filename, risultati):
+    writer = write_report(risultati, str(tmp_path), filename, output_dir=str(tmp_path))
+    with open(writer.filepath, encoding="utf-8", newline="") as f:
+        return writer, f.read()
+
+
+@pytest.mark.parametrize("risultati", [_RISULTATI, ResultStore(_RISULTATI)], ids=["dizionari", "ResultStore"])
+def test_csv_round_trips(tmp_path, risultati):
+    writer, testo = _scrivi(tmp_path, "report.csv", risultati)
+    righe = list(csv.DictReader(testo.splitlines(keepends=True)))
+    assert writer.count == len(_RISULTATI)
+    assert righe == [
+        {"file": r["file"], "line": str(r["line"]), "data_type": r["data_type"], "match": r["match"], "content": r["content"]}
+        for r in _RISULTATI
+    ]
+
+@pytest.mark.parametrize("risultati", [_RISULTATI, ResultStore(_RISULTATI)], ids=["dizionari", "ResultStore"])
+def test_sarif_is_valid(tmp_path, risultati):
+    writer, testo = _scrivi(tmp_path, "report.sarif", risultati)
+    sarif = json.loads(testo)
+    assert sarif["version"] == SARIF_VERSION and sarif["$schema"] == SARIF_SCHEMA
+    (run,) = sarif["runs"]
+    regole = [rule["id"] for rule in run["tool"]["driver"]["rules"]]
+    assert sorted(regole) == sorted({r["data_type"] for r in _RISULTATI})
+    assert run["properties"]["total"] == writer.count == len(run["results"]) == len(_RISULTATI)
+
+    for atteso, result in zip(_RISULTATI, run["results"]):
+        assert result["ruleId"] in regole and result["level"] == "warning"
+        assert result["message"]["text"]
+        (location,) = result["locations"]
+        region = location["physicalLocation"]["region"]
+        assert region["startLine"] == atteso["line"] >= 1
+        assert region["snippet"]["text"] == atteso["content"]
+    uri_assoluto = run["results"][2]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"]
+    assert uri_assoluto.startswith("file:///") and " " not in uri_assoluto
+    assert run["results"][0]["locations"][0]["physicalLocation"]["artifactLocation"]["uri"] == "dati/clienti.csv"
+
+@pytest.mark.parametrize("filename", ["vuoto.csv", "vuoto.sarif"])
+def test_empty_reports_are_valid(tmp_path, filename):
+    writer, testo = _scrivi(tmp_path, filename, iter(()))
+    assert writer.count == 0
+    if filename.endswith(".sarif"):
+        run = json.loads(testo)["runs"][0]
+        assert run["results"] == [] and run["tool"]["driver"]["rules"] == []
+    else:
+        assert testo.splitlines() == ["file,line,data_type,match,content"]
@@ -0,0 +1,51 @@
+import pytest
+
+from scanner.results import ResultStore, FIELDS
+
+# Due match sulla stessa riga, un altro file, un numero di riga grande e un testo non ASCII
+_RISULTATI = [
+    {"file": "a.txt", "line": 1, "content": "mario@example.com 3331234567", "data_type": "Email", "match": "mario@example.com"},
+    {"file": "a.txt", "line": 1, "content": "mario@example.com 3331234567", "data_type": "Telefono", "match": "3331234567"},
+    {"file": "b.log", "line": 2 ** 31, "content": "città: RSSMRA85T10A562S", "data_type": "Codice fiscale", "match": "RSSMRA85T10A562S"},
+    {"file": "a.txt", "line": 7, "content": "", "data_type": "Email", "match": "x@y.it"},
+]
+
+
+def test_behaves_like_a_list_of_dicts():
+    store = ResultStore(_RISULTATI)
+    assert len(store) == len(_RISULTATI)
+    assert store and not ResultStore()
+    assert store.to_dicts() == _RISULTATI
+    assert [dict(finding) for finding in store] == _RISULTATI
+    assert dict(store[-1]) == _RISULTATI[-1]
+    with pytest.raises(IndexError):
+        store[len(_RISULTATI)]
+    with pytest.raises(IndexError):
+        store[-len(_RISULTATI) - 1]
+
+def test_append_and_extend_match_the_constructor():
+    store = ResultStore()
+    store.append(_RISULTATI[0])
+    store.extend(_RISULTATI[1:])
+    assert store.to_dicts() == ResultStore(_RISULTATI).to_dicts()
+    # Le viste Finding di un altro contenitore si aggiungono come i dizionari
+    assert ResultStore(store).to_dicts() == _RISULTATI
+
+def test_finding_is_a_read_only_mapping():
+    finding = ResultStore(_RISULTATI)[2]
+    assert finding == _RISULTATI[2]
+    assert list(finding) == list(FIELDS) and len(finding) == len(FIELDS)
+    assert finding["line"] == 2 ** 31 and finding.get("content") == "città: RSSMRA85T10A562S"
+    assert "match" in finding and "altro" not in finding
+    assert finding.get("altro") is None
+    with pytest.raises(KeyError):
+        finding["altro"]
+    with pytest.raises(TypeError):
+        finding["match"] = "modificato"
+
+def test_shared_values_are_stored_once():
+    store = ResultStore(_RISULTATI)
+    assert store._paths == ["a.txt", "b.log"]
+    assert store._labels == ["Email", "Telefono", "Codice fiscale"]
+    # I due match della stessa riga condividono il testo
+    assert len(store._texts) == 3
@@ -0,0 +1,87 @@
+import io
+import gzip
+import time
+
+import pytest
+
+from scanner.scanner import (iter_scan_file, iter_lines, _scan_lines, LineWindow, LINE_OVERLAP,
+                             CONTENT_CONTEXT)
+from benchmark.regex_timing import SOGLIA_ESPONENTE
+
+CHUNK = 4096
+
+# Molte righe senza dati sensibili e un'email solo alla fine del file
+_TESTO = "riga di log senza dati sensibili\n" * 2000 + "mario.rossi@example.com\n"
+
+
+def _scrivi(tmp_path, compresso):
+    if compresso:
+        path = tmp_path / "app.log.gz"
+        path.write_bytes(gzip.compress(_TESTO.encode()))
+    else:
+        path = tmp_path / "app.log"
+        path.write_text(_TESTO)
+    return str(path)
+
+def _annulla_dopo(controlli, fatti):
+    # Funzione di annullamento che diventa vera dopo il numero di controlli indicato;
+    # ogni controllo viene aggiunto alla lista fatti
+    def cancel():
+        fatti.append(None)
+        return len(fatti) > controlli
+    return cancel
+
+
+@pytest.mark.parametrize("compresso, use_mmap", [(False, False), (False, True), (True, False)],
+                         ids=["testo", "mmap", "gzip"])
+def test_cancel_stops_a_file_without_findings_so_far(tmp_path, compresso, use_mmap):
+    path = _scrivi(tmp_path, compresso)
+    assert len(list(iter_scan_file(path, chunk_size=CHUNK, use_mmap=use_mmap))) == 1
+    # Annullata al secondo blocco: l'email alla fine del file non viene mai letta
+    fatti = []
+    assert list(iter_scan_file(path, chunk_size=CHUNK, use_mmap=use_mmap, cancel=_annulla_dopo(1, fatti))) == []
+    assert len(fatti) == 2
+
+
+# Finestre piccole per dividere in più parti una riga di qualche decina di KB
+WINDOW = 8192
+
+def _scansiona_riga(testo, window_size):
+    return list(_scan_lines(iter_lines(io.StringIO(testo), chunk_size=CHUNK, window_size=window_size), "riga.txt"))
+
+def _cronometra_riga(testo, ripetizioni=3):
+    migliore = float("inf")
+    for _ in range(ripetizioni):
+        inizio = time.perf_counter()
+        _scansiona_riga(testo, 65536)
+        migliore = min(migliore, time.perf_counter() - inizio)
+    return migliore
+
+
+def test_long_line_windows_report_every_match_once():
+    # Email a cavallo dei confini delle finestre e sparse nella riga
+    posizioni = sorted({k * WINDOW + d for k in range(1, 5) for d in (-20, 0, 20)} | set(range(1000, 40000, 3777)))
+    testo = ""
+    for i, pos in enumerate(posizioni):
+        testo += "x" * (pos - len(testo)) + f" c{i}@example.com "
+    testo += "\n"
+
+    finestre = [line for _, line in iter_lines(io.StringIO(testo), chunk_size=CHUNK, window_size=WINDOW)]
+    assert sum(isinstance(line, LineWindow) for line in finestre) > 3
+    assert max(len(line.text) for line in finestre if isinstance(line, LineWindow)) <= WINDOW + 2 * LINE_OVERLAP
+
+    risultati = _scansiona_riga(testo, WINDOW)
+    assert [(r["line"], r["match"]) for r in risultati] == [(r["line"], r["match"]) for r in _scansiona_riga(testo, 10 ** 9)]
+    assert [r["match"] for r in risultati] == [f"c{i}@example.com" for i in range(len(posizioni))]
+    # Riga lunga: il contenuto salvato è un estratto attorno al match, non la riga intera
+    assert all(len(r["content"]) <= len(r["match"]) + 2 * CONTENT_CONTEXT + 2 for r in risultati)
+
+@pytest.mark.parametrize("frammento", ["a@", "a.", "12345678901 ", "+39 1-", "1"],
+                         ids=["email-a@", "email-punti", "undici-cifre", "prefissi", "cifre"])
+def test_long_line_cost_grows_linearly(frammento):
+    corta = frammento * (50000 // len(frammento)) + " mario.rossi@example.com cf\n"
+    lunga = frammento * (400000 // len(frammento)) + " mario.rossi@example.com cf\n"
+    tempi = [_cronometra_riga(corta), _cronometra_riga(lunga)]
+    # Otto volte più lunga: costo lineare circa 8 volte, quadratico circa 64
+    assert tempi[1] < 5.0
+    assert tempi[1] <= max(tempi[0], 1e-3) * 8 ** SOGLIA_ESPONENTE
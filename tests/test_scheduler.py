@@ -0,0 +1,56 @@
+import pytest
+
+from scanner.scheduler import (iter_scan_scheduled, ScanBudget, STOP_COMPLETED, STOP_TIME, STOP_BYTES, STOP_FILES)
+
+FILES = 6
+
+
+@pytest.fixture
+def tree(make_tree):
+    return make_tree(FILES)
+
+def _scan(tree, **options):
+    stats = {}
+    scanned = [path for path, _ in iter_scan_scheduled(tree, stats=stats, **options)]
+    return scanned, stats
+
+
+@pytest.mark.parametrize("budget, stopped, scanned", [
+    (ScanBudget(max_files=2), STOP_FILES, 2),
+    (ScanBudget(max_bytes=30), STOP_BYTES, 1),  # Entra solo clienti_0.txt (21 byte)
+    (ScanBudget(max_seconds=0), STOP_TIME, 0),
+    (ScanBudget(), STOP_COMPLETED, FILES),
+], ids=["file", "byte", "tempo", "nessun-limite"])
+def test_budget_stops_the_scan(db, tree, budget, stopped, scanned):
+    paths, stats = _scan(tree, budget=budget, use_history=False)
+    assert stats['stopped'] == stopped
+    assert len(paths) == stats['scanned'] == scanned
+    assert stats['remaining'] == FILES - scanned
+
+def test_sweep_resumes_from_its_cursor(db, tree):
+    first, stats = _scan(tree, budget=ScanBudget(max_files=2), sweep="notte", use_history=False)
+    assert stats['stopped'] == STOP_FILES and len(first) == 2
+
+    # Un file ricevuto ma non ancora elaborato dal chiamante non entra nel cursore
+    scan = iter_scan_scheduled(tree, sweep="notte", use_history=False)
+    second = [next(scan)[0], next(scan)[0]]
+    scan.close()
+    assert not set(first) & set(second)
+
+    rest, stats = _scan(tree, sweep="notte", use_history=False)
+    assert stats['resumed'] == 3 and stats['stopped'] == STOP_COMPLETED
+    assert second[1] in rest and second[0] not in rest
+    assert sorted(first + second[:1] + rest) == sorted(_scan(tree, use_history=False)[0])
+
+    # Uno sweep completato ricomincia da capo
+    again, stats = _scan(tree, sweep="notte", use_history=False)
+    assert len(again) == FILES and stats['resumed'] == 0
+
+def test_sweep_saves_findings_with_the_cursor(db, tree):
+    scan_id = db.inizia_scansione(tree, "Sweep.txt", {"sweep": "giorno"})
+    _scan(tree, budget=ScanBudget(max_files=2), sweep="giorno", scan_id=scan_id, use_history=False)
+    scan = db.recupera_scansione(scan_id)
+    assert scan["stato"] == db.STATO_COMPLETATO
+    assert scan["risultati"] > 0
+    # I risultati salvati nella scansione non sono contati due volte nello storico
+    assert sum(db.recupera_storico_risultati().values()) == scan["risultati"]
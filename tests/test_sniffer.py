@@ -0,0 +1,79 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import random
+import tarfile
+import zipfile
+
+import pytest
+
+from scanner.sniffer import sniff_bytes, sniff_file, is_text_file, clear_sniff_cache, TEXT, BINARY, SNIFF_SIZE
+
+_TESTO = "Cliente: Mario Rossi, mario.rossi@example.com, tel. +39 333 1234567\n" * 200
+
+
+def _zip():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archivio:
+        archivio.writestr("clienti.txt", _TESTO)
+    return buffer.getvalue()
+
+def _tar():
+    buffer = io.BytesIO()
+    dati = _TESTO.encode()
+    with tarfile.open(fileobj=buffer, mode="w") as archivio:
+        info = tarfile.TarInfo("clienti.txt")
+        info.size = len(dati)
+        archivio.addfile(info, io.BytesIO(dati))
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize("data", [
+    b"",
+    _TESTO.encode("ascii"),
+    ("Città: Forlì, perché è così\n" * 300).encode("utf-8"),
+    ("è" * SNIFF_SIZE).encode("utf-8")[:SNIFF_SIZE - 1],  # Carattere UTF-8 tagliato dal campione
+    ("Città di Forlì, caffè\n" * 50).encode("latin-1"),
+    b"colonna\tvalore\r\n\x1b[31mrosso\x1b[0m\f\n" * 50,
+], ids=["vuoto", "ascii", "utf8", "utf8-tagliato", "latin1", "controlli-ammessi"])
+def test_text(data):
+    assert sniff_bytes(data) == TEXT
+
+@pytest.mark.parametrize("data, atteso", [
+    (gzip.compress(_TESTO.encode()), "gzip"),
+    (bz2.compress(_TESTO.encode()), "bzip2"),
+    (lzma.compress(_TESTO.encode()), "xz"),
+    (_zip(), "zip"),
+    (_tar(), "tar"),
+    (b"\x89PNG\r\n\x1a\n" + bytes(64), "png"),
+    (b"%PDF-1.7\n" + _TESTO.encode(), "pdf"),
+    ("Città: Forlì\n".encode("utf-16"), "utf-16"),
+], ids=["gzip", "bzip2", "xz", "zip", "tar", "png", "pdf", "utf16"])
+def test_compressed_and_known_formats(data, atteso):
+    assert sniff_bytes(data) == atteso
+
+@pytest.mark.parametrize("data", [
+    b"testo\x00con un NUL" * 100,
+    bytes(random.Random(1234).randrange(256) for _ in range(SNIFF_SIZE)),
+    bytes(range(1, 32)) * 100,
+    ("è" * 100).encode("utf-8")[:-1],  # Carattere tagliato a fine file: non è un campione troncato
+], ids=["nul", "casuale", "controlli", "utf8-non-valido"])
+def test_binary(data):
+    assert sniff_bytes(data, truncated=False) == BINARY
+
+def test_truncated_utf8_is_text_only_when_the_sample_is_truncated():
+    data = ("è" * 100).encode("utf-8")[:-1]
+    assert sniff_bytes(data, truncated=True) == TEXT
+
+def test_sniff_file_reads_the_file_and_caches_until_it_changes(tmp_path):
+    clear_sniff_cache()
+    path = tmp_path / "dati.txt"
+    path.write_text(_TESTO)
+    assert is_text_file(str(path))
+
+    path.write_bytes(gzip.compress(_TESTO.encode()))
+    os.utime(path, ns=(0, 10 ** 9))  # mtime diverso anche su filesystem a bassa risoluzione
+    assert sniff_file(str(path)) == "gzip"
+    assert not is_text_file(str(path), os.stat(path))
@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from utils import validator
+from benchmark.corpus import genera_carta, genera_codice_fiscale, genera_iban
+
+SEED = 1234
+CAMPIONI = 3000
+
+# Casi limite: spazi, minuscole, cifre non ASCII, '\n' finale, lunghezze fuori intervallo
+_CASI_LIMITE = {
+    "validate_luhn": ["4111 1111 1111 1111", "4111-1111-1111-1111", "٤١١١١١١١١١١١١١١١", "4111", "", "abc",
+                      "4111111111111111\n", "1" * 20],
+    "validate_italian_cf": ["RSSMRA85T10A562S", "rssmra85t10a562s", "RSSMRA85T10A562", "RSSMRA85T10A562S\n", ""],
+    "validate_iban": ["IT60X0542811101000000123456", "it60 x054 2811 1010 0000 0123 456",
+                      "DE89370400440532013000", "GB82WEST12345698765432", "IT60", "", "IT60X05428111010000001234567" * 2],
+}
+_SORGENTI = {
+    "validate_luhn": lambda rng: genera_carta(rng).replace(" ", ""),
+    "validate_italian_cf": genera_codice_fiscale,
+    "validate_iban": genera_iban,
+}
+
+
+def _campioni(nome):
+    # Metà validi e metà con un carattere alterato, più i casi limite, in ordine casuale
+    rng = random.Random(SEED)
+    valori = []
+    for i in range(CAMPIONI):
+        valore = _SORGENTI[nome](rng)
+        if i % 2:
+            j = rng.randrange(len(valore))
+            valore = valore[:j] + rng.choice("0123456789AZ") + valore[j + 1:]
+        valori.append(valore)
+    valori.extend(_CASI_LIMITE[nome])
+    rng.shuffle(valori)
+    return valori
+
+
+@pytest.mark.parametrize("numpy", [True, False], ids=["numpy", "senza-numpy"])
+@pytest.mark.parametrize("nome", sorted(_SORGENTI))
+def test_batch_matches_scalar(nome, numpy, monkeypatch):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(validator, "_carica_numpy", lambda: None)
+    valori = _campioni(nome)
+    atteso = [getattr(validator, nome)(valore) for valore in valori]
+    assert True in atteso and False in atteso
+    assert getattr(validator, nome + "_batch")(valori) == atteso
+
+@pytest.mark.parametrize("nome", sorted(_SORGENTI))
+def test_batch_of_nothing(nome):
+    assert getattr(validator, nome + "_batch")([]) == []
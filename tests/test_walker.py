@@ -0,0 +1,101 @@
+import os
+
+import pytest
+
+from scanner.walker import IgnoreRules, walk_files, IGNORE_FILENAME
+
+
+def _crea(root, files):
+    # Crea i file indicati (percorsi relativi con '/' -> contenuto) sotto root
+    for rel_path, contenuto in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(contenuto)
+    return str(root)
+
+def _percorsi(root, **opzioni):
+    # Percorsi relativi (con '/') dei file restituiti da walk_files, in ordine
+    return sorted(os.path.relpath(path, root).replace(os.sep, "/") for path, _ in walk_files(root, **opzioni))
+
+
+@pytest.mark.parametrize("regole, percorso, is_dir, atteso", [
+    # Negazione: vale l'ultima regola che corrisponde
+    (["*.log", "!keep.log"], "app.log", False, True),
+    (["*.log", "!keep.log"], "keep.log", False, False),
+    (["*.log", "!keep.log"], "dati/keep.log", False, False),
+    (["!keep.log", "*.log"], "keep.log", False, True),
+    (["!keep.log"], "altro.txt", False, None),
+    # Solo directory (barra finale)
+    (["build/"], "build", True, True),
+    (["build/"], "build", False, None),
+    (["build/"], "src/build", True, True),
+    # Ancorata alla base (barra iniziale o interna) o valida a ogni livello
+    (["/segreto.txt"], "segreto.txt", False, True),
+    (["/segreto.txt"], "dati/segreto.txt", False, None),
+    (["segreto.txt"], "dati/segreto.txt", False, True),
+    (["docs/*.txt"], "docs/a.txt", False, True),
+    (["docs/*.txt"], "altro/docs/a.txt", False, None),
+    (["docs/*.txt"], "docs/sotto/a.txt", False, None),
+    # '**' attraversa qualsiasi numero di directory
+    (["**/tmp/*.txt"], "tmp/a.txt", False, True),
+    (["**/tmp/*.txt"], "a/b/tmp/a.txt", False, True),
+    (["logs/**"], "logs/a/b.txt", False, True),
+    (["a/**/b"], "a/b", True, True),
+    (["a/**/b"], "a/x/y/b", True, True),
+    # Glob, commenti, caratteri protetti e spazi finali
+    (["file?.[ct]sv"], "file1.csv", False, True),
+    (["file?.[!ct]sv"], "file1.csv", False, None),
+    (["# commento"], "# commento", False, None),
+    (["\\#file"], "#file", False, True),
+    (["\\!importante"], "!importante", False, True),
+    (["spazio.txt   "], "spazio.txt", False, True),
+], ids=["negazione-esclude", "negazione-reinclude", "negazione-in-sottocartella", "negazione-prima",
+        "negazione-senza-esclusione", "directory", "directory-non-file", "directory-annidata",
+        "ancorata", "ancorata-non-annidata", "non-ancorata", "barra-interna", "barra-interna-altrove",
+        "barra-interna-un-livello", "doppio-asterisco-inizio", "doppio-asterisco-profondo",
+        "doppio-asterisco-fine", "doppio-asterisco-mezzo", "doppio-asterisco-mezzo-profondo",
+        "glob", "glob-classe-negata", "commento", "cancelletto-protetto", "esclamativo-protetto", "spazi-finali"])
+def test_ignore_rules_match(regole, percorso, is_dir, atteso):
+    assert IgnoreRules(regole).match(percorso, is_dir) is atteso
+
+
+def test_nested_ignore_files_apply_to_their_directory(tmp_path):
+    root = _crea(tmp_path, {
+        IGNORE_FILENAME: "*.log\n",
+        "app.log": "", "keep.log": "", "locale.txt": "",
+        # Regole della sottocartella: reincludono keep.log ed escludono solo il proprio locale.txt
+        f"sotto/{IGNORE_FILENAME}": "!keep.log\n/locale.txt\n",
+        "sotto/app.log": "", "sotto/keep.log": "", "sotto/locale.txt": "",
+        "sotto/interna/locale.txt": "", "sotto/interna/keep.log": "",
+        "altra/keep.log": "",
+    })
+    assert _percorsi(root) == ["locale.txt", "sotto/interna/keep.log", "sotto/interna/locale.txt", "sotto/keep.log"]
+
+def test_ignored_directory_is_not_traversed(tmp_path):
+    # Come in git, una negazione non reinclude i file di una directory esclusa;
+    # la regola solo per directory non esclude un file con lo stesso nome
+    root = _crea(tmp_path, {
+        IGNORE_FILENAME: "cache/\n!cache/tieni.txt\n",
+        "cache/tieni.txt": "", "sotto/cache/x.txt": "", "sotto/cache.txt": "", "cache2/cache": "",
+    })
+    assert _percorsi(root) == ["cache2/cache", "sotto/cache.txt"]
+
+def test_ignore_rules_argument_and_default_rules(tmp_path):
+    root = _crea(tmp_path, {
+        "a.txt": "", ".nascosto.txt": "", ".config/b.txt": "", "node_modules/c.txt": "", "d.tmp": "", "e.csv": "",
+    })
+    # Predefinite: file nascosti esclusi ma directory nascoste attraversate, directory di strumenti e file temporanei esclusi
+    assert _percorsi(root) == [".config/b.txt", "a.txt", "e.csv"]
+    assert _percorsi(root, ignore_rules=["*.csv"]) == sorted([".config/b.txt", ".nascosto.txt", "a.txt", "d.tmp",
+                                                              "node_modules/c.txt"])
+    assert len(_percorsi(root, ignore_rules=())) == 6
+
+@pytest.mark.parametrize("max_depth, attesi", [
+    (0, ["a.txt"]),
+    (1, ["a.txt", "uno/b.txt"]),
+    (2, ["a.txt", "uno/b.txt", "uno/due/c.txt"]),
+    (None, ["a.txt", "uno/b.txt", "uno/due/c.txt", "uno/due/tre/d.txt"]),
+])
+def test_max_depth(tmp_path, max_depth, attesi):
+    root = _crea(tmp_path, {"a.txt": "", "uno/b.txt": "", "uno/due/c.txt": "", "uno/due/tre/d.txt": ""})
+    assert _percorsi(root, max_depth=max_depth) == attesi
@@ -1,34 +1,210 @@
 import re
+import json
+import hashlib
+import threading
+from bisect import bisect_left
+from collections.abc import Mapping
 
-# Dizionario contenente i pattern regex per identificare diversi tipi di dati sensibili
-patterns = {
+# Caratteri non ASCII che con re.IGNORECASE corrispondono a lettere ASCII:
+# İ (I con punto), ı (i senza punto), ſ (s lunga) e il simbolo del kelvin
+_CARATTERI_IGNORECASE = "\u0130\u0131\u017f\u212a"
+
+
+def valore_findall(match):
+    """Restituisce per un match lo stesso valore che produrrebbe re.findall."""
+    gruppi = match.re.groups
+    if gruppi == 0:
+        return match.group()
+    vuoto = match.string[:0]  # "" o b"" a seconda del testo
+    if gruppi == 1:
+        return match.group(1) or vuoto
+    return tuple(g or vuoto for g in match.groups())
+
+def versione_bytes(pattern):
+    """
+    Restituisce la versione per testo ``bytes`` di un pattern (regex compilata,
+    RegexSeguita o RegexAncorata), con gli stessi flag.
+
+    Sui byte le classi \\d, \\s, \\w e \\b seguono le regole ASCII: il risultato
+    coincide con quello del pattern originale solo su testo ASCII senza i separatori
+    \\x1c-\\x1f, che le regex su str considerano spazi.
+
+    Args:
+        pattern: Pattern del dizionario patterns
+
+    Returns:
+        Pattern equivalente che accetta bytes
+    """
+    if isinstance(pattern, re.Pattern):
+        return re.compile(pattern.pattern.encode("utf-8"), pattern.flags & ~re.UNICODE)
+    return pattern.versione_bytes()
+
+
+class RegexSeguita:
+    """
+    Equivalente di ``re.compile(pattern + "(?=.*" + seguito + ")", flags)`` in tempo lineare.
+
+    Con la lookahead ``(?=.*...)`` il motore regex ripercorre il resto della riga per
+    ogni match del pattern: su una riga lunga con molti match il costo è quadratico.
+    Qui le posizioni in cui ``seguito`` può iniziare vengono cercate una sola volta
+    e ogni match viene tenuto se una di esse cade dopo la sua fine, sulla stessa riga.
+    Espone ``pattern``, ``flags``, ``findall`` e ``finditer`` come una regex compilata.
+
+    Args:
+        pattern (str): Regex dei valori cercati (senza lookahead), str o bytes
+        seguito (str): Regex che deve comparire più avanti sulla stessa riga, dello stesso tipo
+        flags (int): Flag del modulo re
+    """
+
+    def __init__(self, pattern, seguito, flags=0):
+        self._argomenti = (pattern, seguito, flags)
+        if isinstance(pattern, str):
+            self.pattern = pattern + "(?=.*" + seguito + ")"
+            self._a_capo = "\n"
+        else:
+            self.pattern = pattern + b"(?=.*" + seguito + b")"
+            self._a_capo = b"\n"
+        self.flags = re.compile(self.pattern, flags).flags
+        self._regex = re.compile(pattern, flags)
+        self._seguito = re.compile(seguito, flags)
+
+    def versione_bytes(self):
+        """Stesso pattern, per testo bytes."""
+        pattern, seguito, flags = self._argomenti
+        return RegexSeguita(pattern.encode("utf-8"), seguito.encode("utf-8"), flags & ~re.UNICODE)
+
+    def findall(self, string):
+        return [valore_findall(m) for m in self.finditer(string)]
+
+    def finditer(self, string):
+        candidati = list(self._regex.finditer(string))
+        if not candidati:
+            return []
+
+        # Tutte le posizioni (dopo il primo candidato) in cui inizia un match di seguito
+        inizi = []
+        pos = candidati[0].end()
+        while True:
+            m = self._seguito.search(string, pos)
+            if m is None:
+                break
+            inizi.append(m.start())
+            pos = m.start() + 1
+        if not inizi:
+            return []
+
+        # '.' non attraversa gli a capo: seguito deve iniziare prima del prossimo '\n'
+        a_capo = [m.start() for m in re.finditer(self._a_capo, string)] if self._a_capo in string else []
+
+        risultati = []
+        for m in candidati:
+            i = bisect_left(inizi, m.end())
+            if i == len(inizi):
+                break  # Nessun seguito dopo questo candidato né dopo i successivi
+            j = bisect_left(a_capo, m.end())
+            if j == len(a_capo) or inizi[i] < a_capo[j]:
+                risultati.append(m)
+        return risultati
+
+
+class RegexAncorata:
+    """
+    Equivalente in tempo lineare di una regex che inizia con ``\\b`` e una sequenza di
+    caratteri di ``classe`` terminata dal carattere fisso ``ancora`` (come '@' nelle email).
+
+    Su una lunga sequenza di caratteri della classe non seguita dall'ancora, il motore
+    regex riprova da ogni posizione e rilegge tutta la sequenza: costo quadratico.
+    Qui si parte dalle ancore: per ognuna si risale all'inizio della sequenza che la
+    precede e si prova la regex solo dal primo confine di parola, l'unica posizione
+    da cui può iniziare il match più a sinistra. Espone ``pattern``, ``flags``,
+    ``findall`` e ``finditer`` come una regex compilata.
+
+    Args:
+        pattern (str): Regex completa (deve iniziare con \\b, la classe e l'ancora), str o bytes
+        classe (str): Classe di caratteri ASCII che precede l'ancora, es. "[a-z0-9._%+-]",
+            dello stesso tipo di pattern
+        ancora (str): Carattere che chiude la sequenza, dello stesso tipo di pattern
+        flags (int): Flag del modulo re
+    """
+
+    def __init__(self, pattern, classe, ancora, flags=0):
+        self._argomenti = (pattern, classe, ancora, flags)
+        self.pattern = pattern
+        self._regex = re.compile(pattern, flags)
+        self.flags = self._regex.flags
+        self._ancora = ancora
+        if isinstance(pattern, str):
+            self._confine = re.compile(r"\b")
+            # Caratteri della classe, compresi quelli non ASCII ammessi da IGNORECASE
+            classe = re.compile(classe, flags)
+            candidati = "".join(map(chr, range(128))) + _CARATTERI_IGNORECASE
+            self._caratteri = "".join(c for c in candidati if classe.fullmatch(c))
+        else:
+            self._confine = re.compile(rb"\b")
+            classe = re.compile(classe, flags)
+            self._caratteri = bytes(c for c in range(128) if classe.fullmatch(bytes((c,))))
+
+    def versione_bytes(self):
+        """Stesso pattern, per testo bytes."""
+        pattern, classe, ancora, flags = self._argomenti
+        return RegexAncorata(pattern.encode("utf-8"), classe.encode("utf-8"), ancora.encode("utf-8"), flags & ~re.UNICODE)
+
+    def findall(self, string):
+        return [valore_findall(m) for m in self.finditer(string)]
+
+    def finditer(self, string):
+        pos = 0
+        while True:
+            k = string.find(self._ancora, pos)
+            if k == -1:
+                break
+            # Inizio della sequenza di caratteri della classe che termina sull'ancora
+            inizio = pos + len(string[pos:k].rstrip(self._caratteri))
+            confine = self._confine.search(string, inizio, k)
+            m = None
+            if confine is not None and confine.start() < k:
+                m = self._regex.match(string, confine.start())
+            if m is not None:
+                yield m
+                pos = m.end()
+            else:
+                pos = k + 1
+
+
+# Definizioni dei pattern per i diversi tipi di dati sensibili: etichetta -> (costruttore, argomenti).
+# Le regex non vengono compilate all'import: le compila il registro (PatternRegistry) al primo uso
+DEFINIZIONI = {
     # Pattern per identificare indirizzi email
     # Riconosce il formato standard: nome@dominio.estensione
-    "Email": re.compile(r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", re.IGNORECASE),
+    # (ancorato sulla '@': su lunghe sequenze senza '@' il costo resta lineare)
+    "Email": (RegexAncorata, (r"\b[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}\b", r"[a-zA-Z0-9._%+-]", "@", re.IGNORECASE)),
     
     # Pattern per numeri di telefono italiani e internazionali
     # Supporta: prefisso +39, numeri fissi, cellulari, numeri internazionali
-    "Telefono": re.compile(r"""
+    # Il prefisso +39 è in comune tra fisso e cellulare; il numero internazionale senza
+    # prefisso non viene provato perché il numero principale (6-11 cifre) lo precede sempre
+    "Telefono": (re.compile, (r"""
         (?:
             (?:\+39\s?)?                    # Prefisso italiano opzionale
-            (?:0\d{1,4}[\s\-]?)?           # Prefisso urbano opzionale
-            \d{6,11}                        # Numero principale
+            (?:
+                (?:0\d{1,4}[\s\-]?)?       # Prefisso urbano opzionale
+                \d{6,11}                    # Numero principale
+                |
+                3\d{2}[\s\-]?\d{6,7}       # Cellulare italiano
+            )
             |
-            (?:\+39\s?)?                   # Prefisso italiano opzionale
-            3\d{2}[\s\-]?\d{6,7}           # Cellulare italiano
-            |
-            (?:\+\d{1,3}[\s\-]?)?          # Prefisso internazionale generico
+            \+\d{1,3}[\s\-]?               # Prefisso internazionale generico
             \d{6,15}                        # Numero internazionale
         )
-    """, re.VERBOSE),
+    """, re.VERBOSE)),
     
     # Pattern per codice fiscale italiano
     # Formato: 6 lettere + 2 cifre + 1 lettera + 2 cifre + 1 lettera + 3 cifre + 1 lettera
-    "Codice Fiscale": re.compile(r"\b[A-Z]{6}\d{2}[A-Z]\d{2}[A-Z]\d{3}[A-Z]\b", re.IGNORECASE),
+    "Codice Fiscale": (re.compile, (r"\b[A-Z]{6}\d{2}[A-Z]\d{2}[A-Z]\d{3}[A-Z]\b", re.IGNORECASE)),
     
     # Pattern per codici IBAN europei
     # Formato: 2 lettere (paese) + 2 cifre (controllo) + codice bancario specifico per paese
-    "IBAN": re.compile(r"""
+    "IBAN": (re.compile, (r"""
         \b
         (?:IT|DE|FR|ES|GB|US|NL|BE|AT|CH|PT|GR|IE|FI|LU|MT|CY|EE|LV|LT|SI|SK|PL|CZ|HU|HR|RO|BG|DK|SE|NO)
         \d{2}
@@ -36,21 +212,21 @@ patterns = {
         \d{7}
         [A-Z0-9]{12}
         \b
-    """, re.VERBOSE | re.IGNORECASE),
+    """, re.VERBOSE | re.IGNORECASE)),
     
     # Pattern per password
     # Cerca variazioni di "password", "pwd", "pass" seguiti da ":" o "=" e il valore
-    "Password": re.compile(r"""
+    "Password": (re.compile, (r"""
         (?:
             (?:password|pwd|pass|psw|passwd|parola_chiave|chiave)
             \s*[:=]\s*
             (?:["']?)([^\s"']{4,})(?:["']?)
         )
-    """, re.VERBOSE | re.IGNORECASE),
+    """, re.VERBOSE | re.IGNORECASE)),
     
     # Pattern per numeri di carte di credito
     # Supporta: Visa, MasterCard, American Express, Discover e formato generico 16 cifre
-    "Carta di Credito": re.compile(r"""
+    "Carta di Credito": (re.compile, (r"""
         \b
         (?:
             4\d{3}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4} |    # Visa
@@ -60,44 +236,44 @@ patterns = {
             \d{4}[\s\-]?\d{4}[\s\-]?\d{4}[\s\-]?\d{4}        # Generico 16 cifre
         )
         \b
-    """, re.VERBOSE),
+    """, re.VERBOSE)),
     
     # Pattern per Partita IVA italiana
     # Formato: "P.IVA" o "P IVA" seguiti da 11 cifre
-    "Partita IVA": re.compile(r"\bP\.?\s*IVA:?\s*(\d{11})\b", re.IGNORECASE),
+    "Partita IVA": (re.compile, (r"\bP\.?\s*IVA:?\s*(\d{11})\b", re.IGNORECASE)),
     
     # Pattern per codice sanitario (tessera sanitaria)
     # Formato: 3 lettere + 3 cifre + 1 lettera + 2 cifre
-    "Codice Sanitario": re.compile(r"\b[A-Z]{3}\s*\d{3}\s*[A-Z]\d{2}\b", re.IGNORECASE),
+    "Codice Sanitario": (re.compile, (r"\b[A-Z]{3}\s*\d{3}\s*[A-Z]\d{2}\b", re.IGNORECASE)),
     
     # Pattern per documenti di identità
     # Supporta: carta d'identità, passaporto, patente
-    "Numero Documento": re.compile(r"""
+    "Numero Documento": (re.compile, (r"""
         (?:
             (?:carta\s+(?:d')?identità|CI|documento)\s*(?:n\.?|numero)?\s*:?\s*([A-Z]{2}\d{7}) |
             (?:passaporto|passport)\s*(?:n\.?|numero)?\s*:?\s*([A-Z]{2}\d{7}) |
             (?:patente)\s*(?:n\.?|numero)?\s*:?\s*([A-Z]{2}\d{7}[A-Z])
         )
-    """, re.VERBOSE | re.IGNORECASE),
+    """, re.VERBOSE | re.IGNORECASE)),
     
     # Pattern per indirizzi stradali italiani
     # Riconosce: via, viale, piazza, corso, ecc. seguiti da nome e numero civico
-    "Indirizzo": re.compile(r"""
+    "Indirizzo": (re.compile, (r"""
         (?:
             (?:via|viale|piazza|corso|largo|vicolo|strada)\s+
             [A-Za-z\s]{2,30}\s*
             (?:,?\s*\d{1,4})?
             (?:\s*[-–]\s*\d{5}\s+[A-Za-z\s]+)?
         )
-    """, re.VERBOSE | re.IGNORECASE),
+    """, re.VERBOSE | re.IGNORECASE)),
     
     # Pattern per Codice di Avviamento Postale (CAP)
     # Formato: 5 cifre
-    "CAP": re.compile(r"\b\d{5}\b"),
+    "CAP": (re.compile, (r"\b\d{5}\b",)),
     
     # Pattern per coordinate bancarie
     # Supporta: ABI, CAB, CIN, SWIFT, BIC
-    "Coordinate Bancarie": re.compile(r"""
+    "Coordinate Bancarie": (re.compile, (r"""
         (?:
             ABI\s*[:=]\s*\d{5} |
             CAB\s*[:=]\s*\d{5} |
@@ -105,11 +281,11 @@ patterns = {
             SWIFT\s*[:=]\s*[A-Z]{8,11} |
             BIC\s*[:=]\s*[A-Z]{8,11}
         )
-    """, re.VERBOSE | re.IGNORECASE),
+    """, re.VERBOSE | re.IGNORECASE)),
     
     # Pattern per indirizzi IP
     # Formato IPv4: 4 gruppi di 1-3 cifre (0-255) separati da punti
-    "IP Address": re.compile(r"""
+    "IP Address": (re.compile, (r"""
         \b
         (?:
             (?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.
@@ -118,18 +294,250 @@ patterns = {
             (?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)
         )
         \b
-    """, re.VERBOSE),
+    """, re.VERBOSE)),
     
     # Pattern per numeri previdenziali
     # Supporta: INPS, INAIL, numeri pensionistici
-    "Numero Previdenziale": re.compile(r"""
+    "Numero Previdenziale": (re.compile, (r"""
         (?:
             (?:codice\s+)?(?:inps|inail|pensione)\s*[:=]\s*\d{8,12} |
             (?:numero\s+)?(?:previdenziale|pensionistico)\s*[:=]\s*\d{8,12}
         )
-    """, re.VERBOSE | re.IGNORECASE),
+    """, re.VERBOSE | re.IGNORECASE)),
     
     # Pattern per codice fiscale aziendale
-    # Formato: 11 cifre (uguale alla partita IVA per le aziende)
-    "Codice Fiscale Azienda": re.compile(r"\b\d{11}\b(?=.*(?:codice\s+fiscale|CF|P\.?\s*IVA))", re.IGNORECASE),
+    # Formato: 11 cifre (uguale alla partita IVA per le aziende), seguite sulla stessa riga
+    # da "codice fiscale", "CF" o "P.IVA" (senza lookahead, che sarebbe quadratica)
+    "Codice Fiscale Azienda": (RegexSeguita, (r"\b\d{11}\b", r"(?:codice\s+fiscale|CF|P\.?\s*IVA)", re.IGNORECASE)),
+}
+
+# Condizioni necessarie (non sufficienti) perché un pattern possa trovare un match in una riga.
+# Usate dal motore di scansione per decidere, con una sola passata sulla riga, quali pattern
+# vale la pena eseguire. Chiavi supportate:
+#   "cifre":      lunghezza minima della sequenza di cifre consecutive più lunga
+#   "blocco":     numero minimo di cifre in un blocco separato solo da spazi o trattini singoli
+#   "lettera":    una sequenza di cifre deve essere preceduta direttamente da una lettera
+#   "chiocciola": la riga deve contenere '@'
+#   "punto":      la riga deve contenere cifre separate da due punti (come "1.2.3" in un IP)
+#   "parole":     almeno una delle parole chiave (case-insensitive) deve comparire nella riga
+#   "dopo":       regex che deve corrispondere subito dopo la parola chiave (es. r"\s*[:=]")
+# Le etichette senza requisiti vengono sempre eseguite.
+requisiti = {
+    "Email": {"chiocciola": True},
+    "Telefono": {"cifre": 6},
+    "Codice Fiscale": {"cifre": 3, "lettera": True},
+    "IBAN": {"cifre": 7, "lettera": True},
+    "Password": {"parole": ("password", "pwd", "pass", "psw", "passwd", "parola_chiave", "chiave"), "dopo": r"\s*[:=]"},
+    "Carta di Credito": {"cifre": 3, "blocco": 14},
+    "Partita IVA": {"cifre": 11, "parole": ("iva",), "dopo": r":?\s*\d"},
+    "Codice Sanitario": {"cifre": 3, "lettera": True},
+    "Numero Documento": {"cifre": 7, "lettera": True, "parole": ("carta", "ci", "documento", "passaporto", "passport", "patente")},
+    "Indirizzo": {"parole": ("via", "viale", "piazza", "corso", "largo", "vicolo", "strada"), "dopo": r"\s"},
+    "CAP": {"cifre": 5},
+    "Coordinate Bancarie": {"parole": ("abi", "cab", "cin", "swift", "bic"), "dopo": r"\s*[:=]"},
+    "IP Address": {"cifre": 1, "punto": True},
+    "Numero Previdenziale": {"cifre": 8, "parole": ("inps", "inail", "pensione", "previdenziale", "pensionistico"), "dopo": r"\s*[:=]"},
+    "Codice Fiscale Azienda": {"cifre": 11, "parole": ("codice", "cf", "iva")},
 }
+
+
+# Chiavi ammesse nei requisiti (vedi sopra) e flag del modulo re accettati nei file di configurazione
+CHIAVI_REQUISITI = ("cifre", "blocco", "lettera", "chiocciola", "punto", "parole", "dopo")
+FLAG_AMMESSI = ("IGNORECASE", "MULTILINE", "DOTALL", "VERBOSE", "ASCII")
+
+# Regex già compilate, condivise tra i registri: definizione (costruttore, argomenti) -> pattern
+_compilati = {}
+_compilati_lock = threading.Lock()
+
+def _compila(definizione):
+    """Compila una definizione (costruttore, argomenti) una sola volta per processo."""
+    pattern = _compilati.get(definizione)
+    if pattern is None:
+        costruttore, argomenti = definizione
+        pattern = costruttore(*argomenti)
+        with _compilati_lock:
+            pattern = _compilati.setdefault(definizione, pattern)
+    return pattern
+
+
+class PatternRegistry(Mapping):
+    """
+    Registro dei pattern attivi per una scansione: etichetta -> regex compilata.
+
+    Le regex vengono compilate solo al primo accesso, quindi importare il modulo o
+    creare un registro non costa nulla, e le etichette escluse con ``select`` non
+    vengono mai compilate né eseguite. Il registro contiene solo le definizioni
+    (non le regex compilate): si può passare ai processi worker, che compilano a
+    loro volta solo i pattern selezionati.
+
+    Args:
+        definizioni (dict): Etichetta -> (costruttore, argomenti), come DEFINIZIONI
+        requisiti (dict): Etichetta -> condizioni necessarie (vedi requisiti)
+    """
+
+    def __init__(self, definizioni, requisiti=None):
+        self._definizioni = dict(definizioni)
+        requisiti = requisiti or {}
+        # Solo i requisiti delle etichette del registro: il motore indicizza tutte le parole chiave
+        self.requisiti = {label: requisiti[label] for label in self._definizioni if label in requisiti}
+        self._firma = None
+
+    def __getitem__(self, label):
+        return _compila(self._definizioni[label])
+
+    def __contains__(self, label):
+        return label in self._definizioni
+
+    def __iter__(self):
+        return iter(self._definizioni)
+
+    def __len__(self):
+        return len(self._definizioni)
+
+    def __repr__(self):
+        return f"PatternRegistry({list(self._definizioni)})"
+
+    def _verifica(self, labels):
+        # Insieme delle etichette indicate, che devono essere tutte definite
+        labels = set(labels)
+        sconosciute = labels - set(self._definizioni)
+        if sconosciute:
+            raise ValueError(f"Tipi di dato sconosciuti: {', '.join(sorted(sconosciute))} (disponibili: {', '.join(self._definizioni)})")
+        return labels
+
+    def select(self, labels):
+        """
+        Restituisce un nuovo registro con le sole etichette indicate, nell'ordine originale.
+
+        Raises:
+            ValueError: Se un'etichetta non è definita
+        """
+        labels = self._verifica(labels)
+        return PatternRegistry({label: d for label, d in self._definizioni.items() if label in labels}, self.requisiti)
+
+    def exclude(self, labels):
+        """
+        Restituisce un nuovo registro senza le etichette indicate.
+
+        Raises:
+            ValueError: Se un'etichetta non è definita
+        """
+        labels = self._verifica(labels)
+        return PatternRegistry({label: d for label, d in self._definizioni.items() if label not in labels}, self.requisiti)
+
+    def register(self, label, regex, flags=0, requisiti=None):
+        """
+        Aggiunge (o sostituisce) un pattern personalizzato, compilato con re.compile al primo uso.
+
+        Args:
+            label (str): Tipo di dato riportato nei risultati
+            regex (str): Sorgente della regex
+            flags (int): Flag del modulo re
+            requisiti (dict): Condizioni necessarie per il motore (None = pattern eseguito su ogni riga)
+
+        Raises:
+            ValueError: Se la regex o i requisiti non sono validi
+        """
+        try:
+            re.compile(regex, flags)
+        except re.error as e:
+            raise ValueError(f"Regex non valida per '{label}': {e}") from None
+        if requisiti:
+            sconosciute = set(requisiti) - set(CHIAVI_REQUISITI)
+            if sconosciute:
+                raise ValueError(f"Requisiti sconosciuti per '{label}': {', '.join(sorted(sconosciute))}")
+            if "parole" in requisiti:
+                requisiti = {**requisiti, "parole": tuple(requisiti["parole"])}
+        self._definizioni[label] = (re.compile, (regex, flags))
+        self.requisiti.pop(label, None)
+        if requisiti:
+            self.requisiti[label] = dict(requisiti)
+        self._firma = None
+
+    def definition(self, label):
+        """Definizione (costruttore, argomenti) di un'etichetta, senza compilarla."""
+        return self._definizioni[label]
+
+    def signature(self):
+        """
+        Firma dei pattern e dei requisiti del registro, calcolata senza compilare le regex:
+        cambia se cambia un qualsiasi pattern, flag o requisito, o l'insieme delle etichette.
+        """
+        if self._firma is None:
+            descrizione = [
+                (label, costruttore.__name__, argomenti, sorted(self.requisiti.get(label, {}).items()))
+                for label, (costruttore, argomenti) in self._definizioni.items()
+            ]
+            self._firma = hashlib.sha1(repr(descrizione).encode("utf-8")).hexdigest()
+        return self._firma
+
+    def compile_all(self):
+        """Compila subito tutti i pattern (es. per misurare o per fallire all'avvio)."""
+        for label in self._definizioni:
+            self[label]
+        return self
+
+
+# Registro predefinito con tutti i pattern: si usa come il vecchio dizionario (patterns[label], patterns.items())
+patterns = PatternRegistry(DEFINIZIONI, requisiti)
+
+def load_patterns_config(file_path, base=None):
+    """
+    Costruisce un registro a partire da un file di configurazione JSON, ad esempio:
+
+        {
+            "enabled": ["IBAN", "Carta di Credito"],
+            "disabled": ["CAP"],
+            "patterns": {
+                "Matricola": {"regex": "\\bMAT-\\d{6}\\b", "flags": ["IGNORECASE"],
+                              "requisiti": {"cifre": 6}}
+            }
+        }
+
+    "enabled" limita i pattern predefiniti a quelli elencati, "disabled" ne esclude
+    alcuni, "patterns" aggiunge pattern personalizzati, sempre attivi (o sostituisce
+    quelli con la stessa etichetta). Tutte le chiavi sono facoltative.
+
+    Args:
+        file_path (str): Percorso del file JSON
+        base (PatternRegistry): Registro di partenza (None = patterns)
+
+    Returns:
+        PatternRegistry: Nuovo registro
+
+    Raises:
+        ValueError: Se il file non è valido (JSON, etichette, regex, flag o requisiti)
+        OSError: Se il file non può essere letto
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        try:
+            config = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"{file_path}: JSON non valido: {e}") from None
+    if not isinstance(config, dict):
+        raise ValueError(f"{file_path}: atteso un oggetto JSON")
+    sconosciute = set(config) - {"enabled", "disabled", "patterns"}
+    if sconosciute:
+        raise ValueError(f"{file_path}: chiavi sconosciute: {', '.join(sorted(sconosciute))}")
+
+    personalizzati = config.get("patterns", {})
+    if not isinstance(personalizzati, dict):
+        raise ValueError(f"{file_path}: \"patterns\" deve essere un oggetto")
+    registro = patterns if base is None else base
+    if "enabled" in config:
+        registro = registro.select(label for label in config["enabled"] if label not in personalizzati)
+    # exclude restituisce sempre un nuovo registro: register non modifica quello di partenza
+    registro = registro.exclude(config.get("disabled", ()))
+
+    for label, spec in personalizzati.items():
+        if isinstance(spec, str):
+            spec = {"regex": spec}
+        if not isinstance(spec, dict) or not isinstance(spec.get("regex"), str):
+            raise ValueError(f"{file_path}: il pattern '{label}' deve avere una \"regex\"")
+        flags = 0
+        for nome in spec.get("flags", ()):
+            if nome not in FLAG_AMMESSI:
+                raise ValueError(f"{file_path}: flag sconosciuto per '{label}': {nome} (ammessi: {', '.join(FLAG_AMMESSI)})")
+            flags |= getattr(re, nome)
+        registro.register(label, spec["regex"], flags, spec.get("requisiti"))
+    return registro
@@ -1,5 +1,77 @@
 import re
 
+# NumPy è opzionale: se disponibile le funzioni *_batch validano i candidati in blocco
+# con operazioni vettoriali, altrimenti li validano uno alla volta. Viene importato alla
+# prima validazione in blocco (vedi _carica_numpy): l'import costa decine di millisecondi
+# all'avvio anche a chi non valida mai in blocco (es. la scansione di un solo file)
+np = None
+_numpy_caricato = False
+
+# Formati controllati prima del calcolo delle cifre di controllo
+_CF_FORMATO = re.compile(r'^[A-Z]{6}[0-9]{2}[A-Z][0-9]{2}[A-Z][0-9]{3}[A-Z]$')
+_IBAN_FORMATO = re.compile(r'^[A-Z]{2}[0-9]{2}[A-Z0-9]+$')
+_NON_CIFRE = re.compile(r'[^0-9]')
+
+# Valori del codice fiscale per le posizioni dispari (1, 3, 5, ...)
+_CF_DISPARI = {
+    'A': 1, 'B': 0, 'C': 5, 'D': 7, 'E': 9, 'F': 13, 'G': 15, 'H': 17, 'I': 19,
+    'J': 21, 'K': 2, 'L': 4, 'M': 18, 'N': 20, 'O': 11, 'P': 3, 'Q': 6, 'R': 8,
+    'S': 12, 'T': 14, 'U': 16, 'V': 10, 'W': 22, 'X': 25, 'Y': 24, 'Z': 23,
+    '0': 1, '1': 0, '2': 5, '3': 7, '4': 9, '5': 13, '6': 15, '7': 17, '8': 19,
+    '9': 21
+}
+
+# Valori del codice fiscale per le posizioni pari (2, 4, 6, ...)
+_CF_PARI = {
+    'A': 0, 'B': 1, 'C': 2, 'D': 3, 'E': 4, 'F': 5, 'G': 6, 'H': 7, 'I': 8,
+    'J': 9, 'K': 10, 'L': 11, 'M': 12, 'N': 13, 'O': 14, 'P': 15, 'Q': 16, 'R': 17,
+    'S': 18, 'T': 19, 'U': 20, 'V': 21, 'W': 22, 'X': 23, 'Y': 24, 'Z': 25,
+    '0': 0, '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9
+}
+
+# Sostituzione delle lettere dell'IBAN con i numeri corrispondenti (A=10, B=11, ..., Z=35)
+_IBAN_LETTERE = {char: str(ord(char) - ord('A') + 10) for char in 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'}
+
+# Caratteri elaborati a ogni passo della riduzione modulo 97 in blocco: un blocco di 4
+# caratteri vale meno di 10^8 e il resto (< 97) per 10^8 sta comodamente in 64 bit
+_IBAN_CARATTERI_PER_BLOCCO = 4
+
+# Valore di una cifra raddoppiata nell'algoritmo di Luhn (sottraendo 9 se supera 9)
+_LUHN_DOPPIO = (0, 2, 4, 6, 8, 1, 3, 5, 7, 9)
+
+def _carica_numpy():
+    """
+    Importa NumPy (una sola volta) e prepara le tabelle di lookup delle funzioni *_batch.
+
+    Returns:
+        module: Il modulo numpy, o None se non è installato
+    """
+    global np, _numpy_caricato, _CF_DISPARI_NP, _CF_PARI_NP, _LUHN_DOPPIO_NP, _IBAN_VALORI_NP, _IBAN_FATTORI_NP
+    if _numpy_caricato:
+        return np
+    _numpy_caricato = True
+    try:
+        import numpy
+    except ImportError:
+        return None
+
+    # Tabelle del codice fiscale come array di lookup indicizzati dal codice ASCII del carattere
+    _CF_DISPARI_NP = numpy.zeros(128, dtype=numpy.int64)
+    _CF_PARI_NP = numpy.zeros(128, dtype=numpy.int64)
+    for char in _CF_DISPARI:
+        _CF_DISPARI_NP[ord(char)] = _CF_DISPARI[char]
+        _CF_PARI_NP[ord(char)] = _CF_PARI[char]
+    _LUHN_DOPPIO_NP = numpy.array(_LUHN_DOPPIO, dtype=numpy.int64)
+    # Valore di ogni carattere dell'IBAN (cifre 0-9, lettere 10-35) e fattore per cui
+    # moltiplicare il numero che lo precede: 10 per una cifra, 100 per una lettera
+    _IBAN_VALORI_NP = numpy.zeros(128, dtype=numpy.int64)
+    _IBAN_FATTORI_NP = numpy.ones(128, dtype=numpy.int64)
+    for char in '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ':
+        _IBAN_VALORI_NP[ord(char)] = int(char, 36)
+        _IBAN_FATTORI_NP[ord(char)] = 10 if char.isdigit() else 100
+    np = numpy
+    return np
+
 def validate_luhn(card_number):
     """
     Valida un numero di carta di credito usando l'algoritmo di Luhn.
@@ -53,35 +125,17 @@ def validate_italian_cf(codice_fiscale):
         return False
     
     # Controllo formato: 6 lettere + 2 cifre + 1 lettera + 2 cifre + 1 lettera + 3 cifre + 1 lettera
-    if not re.match(r'^[A-Z]{6}[0-9]{2}[A-Z][0-9]{2}[A-Z][0-9]{3}[A-Z]$', codice_fiscale):
+    if not _CF_FORMATO.match(codice_fiscale):
         return False
     
-    # Tabelle per il calcolo del carattere di controllo
-    # Valori per le posizioni dispari (1, 3, 5, ...)
-    controllo_dispari = {
-        'A': 1, 'B': 0, 'C': 5, 'D': 7, 'E': 9, 'F': 13, 'G': 15, 'H': 17, 'I': 19,
-        'J': 21, 'K': 2, 'L': 4, 'M': 18, 'N': 20, 'O': 11, 'P': 3, 'Q': 6, 'R': 8,
-        'S': 12, 'T': 14, 'U': 16, 'V': 10, 'W': 22, 'X': 25, 'Y': 24, 'Z': 23,
-        '0': 1, '1': 0, '2': 5, '3': 7, '4': 9, '5': 13, '6': 15, '7': 17, '8': 19,
-        '9': 21
-    }
-    
-    # Valori per le posizioni pari (2, 4, 6, ...)
-    controllo_pari = {
-        'A': 0, 'B': 1, 'C': 2, 'D': 3, 'E': 4, 'F': 5, 'G': 6, 'H': 7, 'I': 8,
-        'J': 9, 'K': 10, 'L': 11, 'M': 12, 'N': 13, 'O': 14, 'P': 15, 'Q': 16, 'R': 17,
-        'S': 18, 'T': 19, 'U': 20, 'V': 21, 'W': 22, 'X': 23, 'Y': 24, 'Z': 25,
-        '0': 0, '1': 1, '2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9
-    }
-    
-    # Calcola la somma secondo l'algoritmo
+    # Calcola la somma secondo l'algoritmo, con le tabelle precalcolate
     somma = 0
     for i in range(15):
         char = codice_fiscale[i]
         if i % 2 == 0:  # Posizione dispari (1-based)
-            somma += controllo_dispari.get(char, 0)
+            somma += _CF_DISPARI[char]
         else:  # Posizione pari (1-based)
-            somma += controllo_pari.get(char, 0)
+            somma += _CF_PARI[char]
     
     # Calcola il carattere di controllo
     carattere_controllo = chr(65 + (somma % 26))
@@ -104,23 +158,147 @@ def validate_iban(iban):
     iban = iban.replace(' ', '').upper()
     
     # Controllo formato base: 2 lettere + 2 cifre + caratteri alfanumerici
-    if not re.match(r'^[A-Z]{2}[0-9]{2}[A-Z0-9]+$', iban):
+    if not _IBAN_FORMATO.match(iban):
         return False
     
     # Sposta le prime 4 caratteri alla fine per il controllo
     rearranged = iban[4:] + iban[:4]
     
     # Sostituisci le lettere con i numeri corrispondenti (A=10, B=11, ..., Z=35)
-    numeric_string = ''
-    for char in rearranged:
-        if char.isdigit():
-            numeric_string += char
-        else:
-            numeric_string += str(ord(char) - ord('A') + 10)
+    numeric_string = ''.join([_IBAN_LETTERE.get(char, char) for char in rearranged])
     
     # Verifica usando il modulo 97 (deve essere 1 per IBAN validi)
     return int(numeric_string) % 97 == 1
 
+def validate_luhn_batch(card_numbers):
+    """
+    Valida in blocco una sequenza di numeri di carta con l'algoritmo di Luhn.
+    
+    Con NumPy i numeri con lo stesso numero di cifre diventano una matrice di cifre
+    controllata con poche operazioni vettoriali; senza NumPy si usa validate_luhn.
+    
+    Args:
+        card_numbers (list): Numeri di carta di credito da validare
+        
+    Returns:
+        list: Maschera di bool nello stesso ordine dell'input, True per i numeri validi
+    """
+    if _carica_numpy() is None:
+        return [validate_luhn(card_number) for card_number in card_numbers]
+    
+    mask = [False] * len(card_numbers)
+    gruppi = {}  # Numero di cifre -> (indici, cifre dei numeri)
+    for i, card_number in enumerate(card_numbers):
+        # Cifre non ASCII (es. arabo-indiche): le gestisce la versione singola
+        if not card_number.isascii():
+            mask[i] = validate_luhn(card_number)
+            continue
+        digits = _NON_CIFRE.sub('', card_number)
+        if 13 <= len(digits) <= 19:
+            indici, cifre = gruppi.setdefault(len(digits), ([], []))
+            indici.append(i)
+            cifre.append(digits)
+    
+    for lunghezza, (indici, cifre) in gruppi.items():
+        matrice = np.frombuffer(''.join(cifre).encode('ascii'), dtype=np.uint8).reshape(-1, lunghezza) - 48
+        # Cifre raddoppiate: una sì e una no, partendo dalla penultima da destra
+        doppie = matrice[:, lunghezza - 2::-2]
+        checksum = matrice.sum(axis=1, dtype=np.int64) - doppie.sum(axis=1, dtype=np.int64) + _LUHN_DOPPIO_NP[doppie].sum(axis=1)
+        for i, valido in zip(indici, (checksum % 10 == 0).tolist()):
+            mask[i] = valido
+    return mask
+
+def validate_italian_cf_batch(codici_fiscali):
+    """
+    Valida in blocco una sequenza di codici fiscali italiani.
+    
+    Con NumPy i codici ben formati diventano una matrice di caratteri e le tabelle
+    del carattere di controllo vengono applicate come array di lookup.
+    
+    Args:
+        codici_fiscali (list): Codici fiscali da validare
+        
+    Returns:
+        list: Maschera di bool nello stesso ordine dell'input, True per i codici validi
+    """
+    if _carica_numpy() is None:
+        return [validate_italian_cf(codice_fiscale) for codice_fiscale in codici_fiscali]
+    
+    mask = [False] * len(codici_fiscali)
+    indici = []
+    codici = []
+    for i, codice_fiscale in enumerate(codici_fiscali):
+        if codice_fiscale and len(codice_fiscale) == 16 and _CF_FORMATO.match(codice_fiscale):
+            indici.append(i)
+            codici.append(codice_fiscale)
+    
+    if codici:
+        caratteri = np.frombuffer(''.join(codici).encode('ascii'), dtype=np.uint8).reshape(-1, 16)
+        # Posizioni dispari (1-based) agli indici pari e viceversa, sui primi 15 caratteri
+        somma = _CF_DISPARI_NP[caratteri[:, 0:15:2]].sum(axis=1) + _CF_PARI_NP[caratteri[:, 1:15:2]].sum(axis=1)
+        validi = (somma % 26 + 65) == caratteri[:, 15]
+        for i, valido in zip(indici, validi.tolist()):
+            mask[i] = valido
+    return mask
+
+def validate_iban_batch(ibans):
+    """
+    Valida in blocco una sequenza di IBAN con l'algoritmo di controllo modulo 97.
+    
+    Con NumPy gli IBAN riordinati diventano una matrice di caratteri ridotta modulo 97
+    a blocchi, senza costruire la stringa numerica né interi grandi.
+    
+    Args:
+        ibans (list): Codici IBAN da validare
+        
+    Returns:
+        list: Maschera di bool nello stesso ordine dell'input, True per gli IBAN validi
+    """
+    if _carica_numpy() is None:
+        return [validate_iban(iban) for iban in ibans]
+    
+    mask = [False] * len(ibans)
+    indici = []
+    riordinati = []
+    for i, iban in enumerate(ibans):
+        # Stessi controlli preliminari di validate_iban
+        if not iban or len(iban) < 15 or len(iban) > 34:
+            continue
+        iban = iban.replace(' ', '').upper()
+        if not _IBAN_FORMATO.match(iban):
+            continue
+        # '\n' finale ammesso dal formato: lo gestisce (con lo stesso esito) la versione singola
+        if iban.endswith('\n'):
+            mask[i] = validate_iban(ibans[i])
+            continue
+        indici.append(i)
+        riordinati.append(iban[4:] + iban[:4])
+    
+    if riordinati:
+        # Allinea a destra con zeri, che non cambiano il resto, a un multiplo del blocco
+        blocco = _IBAN_CARATTERI_PER_BLOCCO
+        lunghezza = -(-max(map(len, riordinati)) // blocco) * blocco
+        caratteri = np.frombuffer(''.join(r.zfill(lunghezza) for r in riordinati).encode('ascii'), dtype=np.uint8)
+        caratteri = caratteri.reshape(len(riordinati), -1, blocco)
+        valori = _IBAN_VALORI_NP[caratteri]
+        fattori = _IBAN_FATTORI_NP[caratteri]
+        
+        # Valore di ogni blocco, come se le lettere fossero già state sostituite dai numeri,
+        # e fattore per cui moltiplicare il resto accumulato prima del blocco
+        valore_blocco = valori[:, :, 0]
+        fattore_blocco = fattori[:, :, 0]
+        for j in range(1, blocco):
+            valore_blocco = valore_blocco * fattori[:, :, j] + valori[:, :, j]
+            fattore_blocco = fattore_blocco * fattori[:, :, j]
+        
+        # Riduzione modulo 97 da sinistra a destra, un blocco alla volta
+        resto = np.zeros(len(riordinati), dtype=np.int64)
+        for colonna in range(valore_blocco.shape[1]):
+            resto = (resto * fattore_blocco[:, colonna] + valore_blocco[:, colonna]) % 97
+        for i, valido in zip(indici, (resto == 1).tolist()):
+            mask[i] = valido
+    return mask
+
 def validate_italian_phone(phone):
     """
     Valida un numero di telefono italiano.